@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Benchmark build.py against synthetic sites of increasing size.
+
+Generates trees that mirror the real markup (post-header, post-nav,
+post-content, benedict-rating/fellow, Leaflet setView) and times the full
+build plus each generator in isolation. Every run is a fresh subprocess, so
+the reported peak RSS belongs to that run alone. I/O counts come from the
+build profiler.
+
+--memory compares peak RSS of a normal build against --stream on the same
+trees (both without the search index, which --stream skips).
+
+Usage:
+    python3 bench_build.py --sizes 52,500,5000 --output bench-results.json
+    python3 bench_build.py --sizes 500 --compare bench-results.json
+    python3 bench_build.py --memory --sizes 200,1000,4000 --paragraphs 20
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import date, datetime, timedelta, timezone
+
+BUILD_DIR = Path(__file__).resolve().parent
+BUILD_SCRIPT = BUILD_DIR / 'build.py'
+
+RESULTS_SCHEMA = 1
+
+STAGES = (
+    'parse_sources',
+    'generate_benedict_reviews',
+    'generate_blog_posts',
+    'update_blog_post_files',
+    'update_homepage',
+    'generate_book_chapters',
+    'generate_search_index'
+)
+
+WORDS = (
+    'coffee eggs benedict hollandaise muffin toast morning river road chapter '
+    'window station letter garden quiet winter summer light shadow table '
+    'street mother father friend stranger promise silence journey harbour '
+    'kitchen bread salt evening memory question answer voice careful slowly'
+).split()
+
+FELLOWS = ('Joel Delaney', 'Nicholas Croft', 'Anna Reid', 'Sam Okafor')
+
+def sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+def paragraph(rng, sentences=5):
+    return ' '.join(sentence(rng, rng.randint(6, 18)) for _ in range(sentences))
+
+def page(title, header, content, after_content='', script=''):
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} - joeldelaney</title>
+    <link rel="stylesheet" href="../../style.css">
+    <style>
+        .post-content p {{ line-height: 1.7; }}
+        .post-header h1 a {{ color: inherit; text-decoration: none; }}
+    </style>
+</head>
+<body>
+    <header>
+        <nav class="navbar">
+            <div class="brand">
+                <a href="../../"><h1>joeldelaney</h1></a>
+            </div>
+            <ul class="nav-links">
+                <li><a href="../../">Home</a></li>
+                <li><a href="../../blog/" class="active">Blog</a></li>
+                <li><a href="../../benedict/">Benedict</a></li>
+            </ul>
+        </nav>
+    </header>
+
+    <main>
+        <article class="post">
+            <header class="post-header">
+{header}
+            </header>
+            <div class="post-content">
+{content}
+            </div>
+{after_content}
+        </article>
+    </main>
+{script}
+</body>
+</html>
+'''
+
+def content_html(rng, paragraphs):
+    return '\n\n'.join(f'                <p>{paragraph(rng)}</p>' for _ in range(paragraphs))
+
+def generate_site(root, posts=52, reviews=6, chapters=95, paragraphs=8, seed=0):
+    """Write a synthetic site with the given collection sizes under root"""
+    rng = random.Random(seed)
+    root = Path(root)
+    start_date = date(2020, 1, 1)
+
+    for i in range(posts):
+        slug = f'post-{i:05d}'
+        title = sentence(rng, 3).rstrip('.')
+        stamp = datetime.combine(start_date + timedelta(days=i), datetime.min.time()) + timedelta(hours=rng.randint(6, 22))
+        header = f'''                <h1><a href="../../blog/">{title}</a></h1>
+                <time datetime="{stamp:%Y-%m-%d %H:%M:%S}">{stamp:%B %d, %Y}</time>'''
+        nav = '''        <nav class="post-nav">
+            <span></span>
+            <span></span>
+        </nav>'''
+        write_page(root / 'posts' / slug, page(title, header, content_html(rng, paragraphs), nav))
+
+    for i in range(reviews):
+        slug = f'review-{i:04d}'
+        title = sentence(rng, 3).rstrip('.')
+        stamp = datetime.combine(start_date + timedelta(days=3 * i), datetime.min.time())
+        header = f'''                <h1><a href="../../benedict/">{title}</a></h1>
+                <div class="benedict-rating">{'🍳' * rng.randint(1, 5)}</div>
+                <time datetime="{stamp:%Y-%m-%d %H:%M:%S}">{stamp:%B %d %Y}</time>'''
+        fellow = f'''            <div class="benedict-fellow">
+                <strong>Benedict Fellow:</strong> {rng.choice(FELLOWS)}
+            </div>
+            <div id="map"></div>'''
+        lat, lng = rng.uniform(-60, 60), rng.uniform(-180, 180)
+        script = f'''    <script>
+        const map = L.map('map').setView([{lat:.7f}, {lng:.7f}], 15);
+    </script>'''
+        write_page(root / 'benedict' / slug, page(title, header, content_html(rng, 3), fellow, script))
+
+    for i in range(chapters):
+        slug = f'chapter-{i + 1}'
+        header = f'                <h1>{i + 1}</h1>'
+        write_page(root / 'books' / slug, page(str(i + 1), header, content_html(rng, paragraphs * 3)))
+
+    (root / 'index.html').write_text('''<!DOCTYPE html>
+<html lang="en">
+<body>
+    <main>
+        <section>
+        <article class="latest-post">
+        </article>
+        </section>
+    </main>
+</body>
+</html>
+''', encoding='utf-8')
+
+def write_page(directory, html):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'index.html').write_text(html, encoding='utf-8')
+
+# Runs inside the benchmark subprocess: one generator, cold, with profiling on
+STAGE_DRIVER = '''
+import sys, json, time
+sys.path.insert(0, {build_dir!r})
+import build
+
+stage = {stage!r}
+manifest = None
+build.profiler.enabled = True
+sources = [p for c in build.COLLECTIONS for _, p in build.collection_sources(c)]
+posts = None
+if stage in ('update_blog_post_files', 'update_homepage'):
+    posts = build.generate_blog_posts()
+
+start = time.perf_counter()
+with build.profiler.stage(stage):
+    if stage == 'parse_sources':
+        build.parse_sources(sources, workers={workers})
+    elif stage == 'generate_benedict_reviews':
+        build.generate_benedict_reviews()
+    elif stage == 'generate_blog_posts':
+        build.generate_blog_posts()
+    elif stage == 'update_blog_post_files':
+        build.update_blog_post_files(posts)
+    elif stage == 'update_homepage':
+        build.update_homepage(posts)
+    elif stage == 'generate_book_chapters':
+        build.generate_book_chapters()
+    elif stage == 'generate_search_index':
+        build.generate_search_index(sources)
+elapsed = time.perf_counter() - start
+
+print('BENCH' + json.dumps(dict(build.profiler.stages[stage], wall_ms=elapsed * 1000)))
+'''
+
+def run_measured(command, cwd):
+    """Run command in cwd and return (stdout, wall seconds, peak RSS in KB)"""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    stdout = process.stdout.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f'{" ".join(map(str, command))} failed:\n{stdout[-2000:]}')
+
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    peak_kb = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+    return stdout, elapsed, peak_kb
+
+def bench_full_build(root, workers, extra_args=()):
+    profile_path = Path(root) / 'bench-profile.json'
+    command = [sys.executable, str(BUILD_SCRIPT), '--full', '--profile', str(profile_path),
+               '-j', str(workers), *extra_args]
+    _, elapsed, peak_kb = run_measured(command, root)
+    profile = json.loads(profile_path.read_text(encoding='utf-8'))
+    profile_path.unlink()
+
+    stages = profile['stages'].values()
+    return {
+        'wall_ms': round(elapsed * 1000, 3),
+        'peak_rss_kb': peak_kb,
+        'bytes_read': sum(stats['bytes_read'] for stats in stages),
+        'bytes_written': sum(stats['bytes_written'] for stats in stages),
+        'files_read': sum(stats['files_read'] for stats in stages),
+        'files_written': sum(stats['files_written'] for stats in stages)
+    }
+
+def bench_stage(root, stage, workers):
+    driver = STAGE_DRIVER.format(build_dir=str(BUILD_DIR), stage=stage, workers=workers)
+    stdout, _, peak_kb = run_measured([sys.executable, '-c', driver], root)
+    stats = json.loads(stdout[stdout.rindex('BENCH') + len('BENCH'):])
+    return {
+        'wall_ms': round(stats['wall_ms'], 3),
+        'peak_rss_kb': peak_kb,
+        'bytes_read': stats['bytes_read'],
+        'bytes_written': stats['bytes_written'],
+        'files_read': stats['files_read'],
+        'files_written': stats['files_written']
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BUILD_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Whole-build variants compared by --memory
+MEMORY_TARGETS = {
+    'build_no_search': ('--no-search',),
+    'build_stream': ('--stream',)
+}
+
+def run_benchmarks(sizes, workers, keep=None, paragraphs=8, memory=False):
+    results = []
+    for size in sizes:
+        counts = {'posts': size, 'reviews': max(6, size // 10), 'chapters': size}
+        with tempfile.TemporaryDirectory(prefix=f'bench-{size}-') as tmp:
+            root = Path(keep) / f'site-{size}' if keep else Path(tmp)
+            generate_site(root, paragraphs=paragraphs, **counts)
+            print(f'Scenario {size}: {counts["posts"]} posts, {counts["reviews"]} reviews, '
+                  f'{counts["chapters"]} chapters')
+
+            targets = tuple(MEMORY_TARGETS) if memory else ('full_build',) + STAGES
+            for target in targets:
+                if target in MEMORY_TARGETS:
+                    metrics = bench_full_build(root, 1, MEMORY_TARGETS[target])
+                elif target == 'full_build':
+                    metrics = bench_full_build(root, workers)
+                else:
+                    metrics = bench_stage(root, target, workers)
+                results.append(dict(size=size, target=target, **counts, **metrics))
+                print(f'  {target:<26} {metrics["wall_ms"]:>10.1f} ms {metrics["peak_rss_kb"] / 1024:>8.1f} MB '
+                      f'{metrics["files_read"]:>7} reads {metrics["files_written"]:>7} writes')
+            print()
+    return results
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['size'], r['target']): r for r in json.load(f)['results']}
+
+    print(f'Compared with {baseline_path}:')
+    print(f'  {"size":>6} {"target":<26} {"wall":>9} {"peak RSS":>9}')
+    for result in results:
+        before = baseline.get((result['size'], result['target']))
+        if not before:
+            continue
+        wall = (result['wall_ms'] / before['wall_ms'] - 1) * 100 if before['wall_ms'] else 0
+        rss = (result['peak_rss_kb'] / before['peak_rss_kb'] - 1) * 100 if before['peak_rss_kb'] else 0
+        print(f'  {result["size"]:>6} {result["target"]:<26} {wall:>+8.1f}% {rss:>+8.1f}%')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark build.py on synthetic sites')
+    parser.add_argument('--sizes', default='52,500,5000',
+                        help='comma-separated post/chapter counts, one scenario each')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--compare', metavar='JSON', help='print deltas against an earlier results file')
+    parser.add_argument('--keep', metavar='DIR', help='generate trees under DIR and keep them')
+    parser.add_argument('--paragraphs', type=int, default=8,
+                        help='paragraphs per post (chapters get three times as many)')
+    parser.add_argument('--memory', action='store_true',
+                        help='compare peak RSS of a normal build against --stream')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = run_benchmarks(sizes, args.workers, args.keep, args.paragraphs, args.memory)
+
+    report = {
+        'schema': RESULTS_SCHEMA,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'workers': args.workers,
+        'paragraphs': args.paragraphs,
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f'📊 Wrote {len(results)} results to {args.output}')
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
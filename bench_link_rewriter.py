@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Compare the single-pass LinkRewriter against the old one-pass-per-link rewrites.
+
+Runs every rewriter table over every HTML file in the tree, checks that both
+approaches produce identical output, then times each. Each document also gets
+a block of pre-migration links appended so every rule actually fires.
+
+Usage: python3 bench_link_rewriter.py [--repeat 10]
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from link_rewriter import (HOMEPAGE_REWRITER, PUBLISH_FORM_REWRITER, ROOT_PAGE_REWRITER,
+                           SUBDIRECTORY_REWRITERS)
+
+LEGACY_LINKS = '\n'.join(f'<a href="{href}">x</a>' for href in (
+    'index.html', 'blog.html', 'work.html', 'benedict.html', 'style.css',
+    'posts/first-post.html', 'benedict/cafe.html', 'work/report.html',
+    '../style.css', '../index.html', '../blog.html', '../work.html', '../benedict.html'
+))
+
+def legacy_root_page(content):
+    content = re.sub(r'href="index\.html"', 'href="/"', content)
+    content = re.sub(r'href="blog\.html"', 'href="/blog/"', content)
+    content = re.sub(r'href="work\.html"', 'href="/work/"', content)
+    content = re.sub(r'href="benedict\.html"', 'href="/benedict/"', content)
+    content = re.sub(r'href="style\.css"', 'href="/style.css"', content)
+    content = re.sub(r'href="posts/([^"]+)\.html"', r'href="/posts/\1/"', content)
+    content = re.sub(r'href="benedict/([^"]+)\.html"', r'href="/benedict/\1/"', content)
+    # work/ pages keep their .html URLs, so links to them are left as they are
+    return content
+
+def legacy_homepage(content):
+    content = re.sub(r'href="index\.html"', 'href="/"', content)
+    content = re.sub(r'href="blog\.html"', 'href="/blog/"', content)
+    content = re.sub(r'href="work\.html"', 'href="/work/"', content)
+    content = re.sub(r'href="benedict\.html"', 'href="/benedict/"', content)
+    content = re.sub(r'href="posts/([^"]+)\.html"', r'href="/posts/\1/"', content)
+    return content
+
+def legacy_publish_form(content):
+    content = re.sub(r'href="index\.html"', 'href="/"', content)
+    content = re.sub(r'href="blog\.html"', 'href="/blog/"', content)
+    content = re.sub(r'href="work\.html"', 'href="/work/"', content)
+    content = re.sub(r'href="benedict\.html"', 'href="/benedict/"', content)
+    return content
+
+def legacy_posts(content):
+    content = content.replace('href="../style.css"', 'href="../../style.css"')
+    content = content.replace('href="../index.html"', 'href="../../"')
+    content = content.replace('href="../blog.html"', 'href="../../blog/"')
+    content = content.replace('href="../work.html"', 'href="../../work/"')
+    content = content.replace('href="../benedict.html"', 'href="../../benedict/"')
+    return content
+
+def legacy_nested(content):
+    content = legacy_posts(content)
+    content = content.replace('href="benedict.html"', 'href="../../benedict/"')
+    return content
+
+TABLES = {
+    'root pages': (legacy_root_page, ROOT_PAGE_REWRITER),
+    'homepage': (legacy_homepage, HOMEPAGE_REWRITER),
+    'publish forms': (legacy_publish_form, PUBLISH_FORM_REWRITER),
+    'posts': (legacy_posts, SUBDIRECTORY_REWRITERS['posts']),
+    'benedict': (legacy_nested, SUBDIRECTORY_REWRITERS['benedict']),
+    'work': (legacy_nested, SUBDIRECTORY_REWRITERS['work'])
+}
+
+def load_documents():
+    documents = []
+    for path in sorted(Path('.').rglob('*.html')):
+        if '.git' in path.parts:
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            documents.append((str(path), f.read() + LEGACY_LINKS))
+    return documents
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    documents = load_documents()
+    total_bytes = sum(len(content.encode('utf-8')) for _, content in documents)
+    print(f'Loaded {len(documents)} files ({total_bytes / 1024:.0f} KB)\n')
+
+    mismatches = 0
+    for name, (legacy, rewriter) in TABLES.items():
+        for path, content in documents:
+            if legacy(content) != rewriter.rewrite(content)[0]:
+                mismatches += 1
+                print(f'  ✗ {name}: {path} differs')
+    if mismatches:
+        print(f'\n✗ {mismatches} rewrites produced different output')
+        sys.exit(1)
+    print(f'✓ Identical output for all {len(TABLES)} tables over {len(documents)} files\n')
+
+    print(f'  {"table":14} {"passes":>10} {"single":>10} {"speedup":>8} {"MB/s":>7}')
+    for name, (legacy, rewriter) in TABLES.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for _, content in documents:
+                legacy(content)
+        passes = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for _, content in documents:
+                rewriter.rewrite(content)
+        single = (time.perf_counter() - start) / args.repeat
+
+        print(f'  {name:14} {passes * 1000:8.2f}ms {single * 1000:8.2f}ms {passes / single:7.2f}x '
+              f'{total_bytes / single / 2**20:7.0f}')
+
+if __name__ == '__main__':
+    main()
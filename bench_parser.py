@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Compare the early-exit metadata extractor against a full SimpleHTMLParser feed.
+
+Checks that both produce identical metadata for every source file, then times
+each over the real tree. Exits non-zero if any file differs.
+
+Usage: python3 bench_parser.py [--collection books] [--repeat 20]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from build import COLLECTIONS, collection_sources, parse_html, source_fields
+
+def metadata_view(data, fields):
+    """Reduce parser output to the values the generators read"""
+    view = {}
+    for field in fields:
+        if field == 'excerpt':
+            paragraphs = data.get('paragraphs', [])
+            view['excerpt'] = paragraphs[0] if paragraphs else ''
+        elif field == 'coordinates':
+            view['lat'] = data.get('lat', 0)
+            view['lng'] = data.get('lng', 0)
+        else:
+            view[field] = data.get(field)
+    return view
+
+def load_documents(collections):
+    documents = []
+    for collection in collections:
+        if not Path(collection).exists():
+            continue
+        for _, index_path in collection_sources(collection):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                documents.append((index_path, f.read()))
+    return documents
+
+def check_equivalence(documents):
+    mismatches = 0
+    for index_path, html_content in documents:
+        fields = source_fields(index_path)
+        full = metadata_view(parse_html(html_content), fields)
+        early = metadata_view(parse_html(html_content, fields), fields)
+        if full != early:
+            mismatches += 1
+            print(f'  ✗ {index_path}: {full} != {early}')
+    return mismatches
+
+def time_parser(documents, repeat, early):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for index_path, html_content in documents:
+            parse_html(html_content, source_fields(index_path) if early else None)
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--collection', choices=COLLECTIONS, action='append',
+                        help='collection to benchmark (default: books); repeatable')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    collections = args.collection or ['books']
+    documents = load_documents(collections)
+    total_bytes = sum(len(html_content.encode('utf-8')) for _, html_content in documents)
+    print(f'Loaded {len(documents)} files ({total_bytes / 1024:.0f} KB) from {", ".join(collections)}\n')
+
+    mismatches = check_equivalence(documents)
+    if mismatches:
+        print(f'\n✗ {mismatches} files produced different metadata')
+        sys.exit(1)
+    print(f'✓ Identical metadata for all {len(documents)} files\n')
+
+    full = time_parser(documents, args.repeat, early=False)
+    early = time_parser(documents, args.repeat, early=True)
+    print(f'  full feed:   {full * 1000:8.2f} ms per pass')
+    print(f'  early exit:  {early * 1000:8.2f} ms per pass')
+    print(f'  speedup:     {full / early:8.2f}x')
+
+if __name__ == '__main__':
+    main()
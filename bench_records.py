@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Compare __slots__ records against the plain dicts build.py used to emit.
+
+Builds a synthetic collection of each record type both ways, checks that
+sorting and serialisation produce identical JSON, then reports the memory
+held by each list and the time to construct, sort and serialise it.
+
+Usage: python3 bench_records.py [--items 10000] [--repeat 5]
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+from build import BenedictReview, BookChapter, Post, dump_compact_json, records_json, sort_key
+
+def synthetic_rows(count, seed=1):
+    """Yield raw field values shared by both representations"""
+    rng = random.Random(seed)
+    words = ['eggs', 'hollandaise', 'muffin', 'toast', 'chapter', 'river', 'lantern', 'morning']
+    for i in range(count):
+        date = f'20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+        yield {
+            'title': ' '.join(rng.choice(words) for _ in range(4)).title(),
+            'slug': f'item-{i:05d}',
+            'date': date,
+            'number': rng.randint(1, count),
+            'excerpt': ' '.join(rng.choice(words) for _ in range(30)),
+            'lat': round(rng.uniform(-90, 90), 6),
+            'lng': round(rng.uniform(-180, 180), 6)
+        }
+
+# Each kind: (dict builder, record builder, dict sort key, reverse, index keys)
+KINDS = {
+    'Post': (
+        lambda row: {
+            'title': row['title'],
+            'url': f'/posts/{row["slug"]}/',
+            'date': row['date'],
+            'dateDisplay': row['date'],
+            'excerpt': row['excerpt']
+        },
+        lambda row: Post(
+            title=row['title'],
+            url=f'/posts/{row["slug"]}/',
+            date=row['date'],
+            date_display=row['date'],
+            excerpt=row['excerpt']
+        ),
+        lambda x: (x['date'], x['url']),
+        True,
+        ('title', 'url', 'date')
+    ),
+    'BenedictReview': (
+        lambda row: {
+            'title': row['title'],
+            'date': row['date'],
+            'dateDisplay': row['date'],
+            'rating': row['number'] % 5,
+            'ratingDisplay': '🍳',
+            'summary': row['excerpt'],
+            'url': f'/benedict/{row["slug"]}/',
+            'lat': row['lat'],
+            'lng': row['lng'],
+            'fellow': 'Joel Delaney'
+        },
+        lambda row: BenedictReview(
+            title=row['title'],
+            date=row['date'],
+            date_display=row['date'],
+            rating=row['number'] % 5,
+            summary=row['excerpt'],
+            url=f'/benedict/{row["slug"]}/',
+            lat=row['lat'],
+            lng=row['lng'],
+            fellow='Joel Delaney'
+        ),
+        lambda x: (x['date'], x['url']),
+        True,
+        ('title', 'date', 'url')
+    ),
+    'BookChapter': (
+        lambda row: {
+            'title': row['title'],
+            'chapterNumber': row['number'],
+            'url': f'/books/{row["slug"]}/',
+            'excerpt': row['excerpt'][:150]
+        },
+        lambda row: BookChapter(
+            title=row['title'],
+            chapter_number=row['number'],
+            url=f'/books/{row["slug"]}/',
+            excerpt=row['excerpt'][:150]
+        ),
+        lambda x: (x['chapterNumber'], x['url']),
+        False,
+        ('title', 'chapterNumber', 'url')
+    )
+}
+
+def serialise(records, index_keys, as_records):
+    """The JSON build.py writes for a collection: JS data, index shard and pages"""
+    if as_records:
+        items = [record.to_json(index_keys) for record in records]
+        return (records_json(records, pretty=True), dump_compact_json(items), records_json(records))
+    items = [{key: record[key] for key in index_keys} for record in records]
+    return (json.dumps(records, indent=4, ensure_ascii=False), dump_compact_json(items),
+            dump_compact_json(records))
+
+def retained_bytes(build, rows):
+    """Bytes still allocated after building the list from pre-built rows"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [build(row) for row in rows]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return after - before
+
+def time_pipeline(build, rows, key, reverse, index_keys, as_records, repeat):
+    timings = {'construct': 0.0, 'sort': 0.0, 'serialise': 0.0}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = [build(row) for row in rows]
+        built = time.perf_counter()
+        records.sort(key=key, reverse=reverse)
+        ordered = time.perf_counter()
+        serialise(records, index_keys, as_records)
+        done = time.perf_counter()
+        timings['construct'] += built - start
+        timings['sort'] += ordered - built
+        timings['serialise'] += done - ordered
+    return {stage: seconds / repeat for stage, seconds in timings.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = list(synthetic_rows(args.items))
+    failures = 0
+
+    for name, (build_dict, build_record, dict_key, reverse, index_keys) in KINDS.items():
+        dicts = sorted((build_dict(row) for row in rows), key=dict_key, reverse=reverse)
+        records = sorted((build_record(row) for row in rows), key=sort_key, reverse=reverse)
+        if serialise(dicts, index_keys, False) != serialise(records, index_keys, True):
+            failures += 1
+            print(f'✗ {name}: serialised output differs')
+            continue
+
+        dict_bytes = retained_bytes(build_dict, rows)
+        record_bytes = retained_bytes(build_record, rows)
+        before = time_pipeline(build_dict, rows, dict_key, reverse, index_keys, False, args.repeat)
+        after = time_pipeline(build_record, rows, sort_key, reverse, index_keys, True, args.repeat)
+
+        print(f'{name} x {args.items} (identical JSON ✓)')
+        print(f'  {"":12} {"dict":>10} {"slots":>10} {"ratio":>7}')
+        print(f'  {"memory MB":12} {dict_bytes / 2**20:10.2f} {record_bytes / 2**20:10.2f} '
+              f'{dict_bytes / record_bytes:6.2f}x')
+        for stage in before:
+            print(f'  {stage + " ms":12} {before[stage] * 1000:10.1f} {after[stage] * 1000:10.1f} '
+                  f'{before[stage] / after[stage]:6.2f}x')
+        total_before = sum(before.values())
+        total_after = sum(after.values())
+        print(f'  {"total ms":12} {total_before * 1000:10.1f} {total_after * 1000:10.1f} '
+              f'{total_before / total_after:6.2f}x\n')
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,20 @@
 import os
 import re
 import json
-from datetime import datetime
+import math
+import time
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from operator import attrgetter
+from json.encoder import encode_basestring as encode_json_string
+from itertools import chain
+from contextlib import contextmanager
 from html.parser import HTMLParser
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import search_index
 
 class SimpleHTMLParser(HTMLParser):
     def __init__(self):
@@ -87,23 +98,796 @@ def format_date_display(date_str):
     except:
         return date_str
 
-def parse_html_file(file_path):
+HEADER_FIELDS = ('title', 'datetime', 'rating_text')
+METADATA_FIELDS = HEADER_FIELDS + ('excerpt', 'fellow_text', 'coordinates')
+
+# Metadata each collection's generator actually reads
+COLLECTION_FIELDS = {
+    'benedict': METADATA_FIELDS,
+    'posts': ('title', 'datetime', 'excerpt'),
+    'books': ('title', 'excerpt')
+}
+
+FEED_CHUNK_SIZE = 2048
+
+SETVIEW_PATTERN = re.compile(r'setView\(\[(-?\d+\.\d+),\s*(-?\d+\.\d+)\]')
+
+class MetadataParser(SimpleHTMLParser):
+    """SimpleHTMLParser that stops once the requested fields have been found.
+
+    Header fields (title, datetime, rating_text) are treated as settled once
+    the post-content div opens, 'excerpt' once the first content paragraph
+    closes and 'fellow_text' as soon as it is captured. Everything after that
+    point is ignored, so long chapters are only parsed up to their first
+    paragraph.
+    """
+
+    def __init__(self, fields):
+        super().__init__()
+        self.header_fields = [f for f in fields if f in HEADER_FIELDS]
+        self.need_excerpt = 'excerpt' in fields
+        self.need_fellow = 'fellow_text' in fields
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if not self.done:
+            super().handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if not self.done:
+            super().handle_endtag(tag)
+            self.done = self.is_complete()
+
+    def handle_data(self, data):
+        if not self.done:
+            super().handle_data(data)
+
+    def is_complete(self):
+        paragraphs = self.data.get('paragraphs')
+        if paragraphs is None:
+            return False
+        if self.need_excerpt and not paragraphs:
+            return False
+        if self.need_fellow and 'fellow_text' not in self.data:
+            return False
+        return all(field in self.data for field in self.header_fields)
+
+def source_fields(file_path):
+    """Return the metadata fields needed for a source file, or None for all of them"""
+    return COLLECTION_FIELDS.get(Path(file_path).parts[0])
+
+class BuildProfiler:
+    """Per-stage wall/CPU time, I/O and per-file timings for --profile.
+
+    Stages are entered with `with profiler.stage(name):`. Reads and writes
+    made through read_text() and OutputWriter are attributed to the active
+    stage. CPU time includes child processes, so pooled parsing is counted
+    once the pool has shut down.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}
+        self.current = None
+        self.files = []
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        stats = self.stages.setdefault(name, {
+            'wall_ms': 0.0, 'cpu_ms': 0.0,
+            'bytes_read': 0, 'bytes_written': 0,
+            'files_read': 0, 'files_written': 0
+        })
+        previous, self.current = self.current, stats
+        wall_start, cpu_start = time.perf_counter(), cpu_time()
+        try:
+            yield
+        finally:
+            stats['wall_ms'] += (time.perf_counter() - wall_start) * 1000
+            stats['cpu_ms'] += (cpu_time() - cpu_start) * 1000
+            self.current = previous
+
+    def record_read(self, nbytes):
+        if self.current is not None:
+            self.current['bytes_read'] += nbytes
+            self.current['files_read'] += 1
+
+    def record_write(self, nbytes):
+        if self.current is not None:
+            self.current['bytes_written'] += nbytes
+            self.current['files_written'] += 1
+
+    def record_file(self, path, stage, seconds):
+        if self.enabled:
+            self.files.append({'path': Path(path).as_posix(), 'stage': stage, 'ms': seconds * 1000})
+
+    def slowest_files(self, top):
+        return sorted(self.files, key=lambda f: f['ms'], reverse=True)[:top]
+
+    def report(self, top=10):
+        print('⏱️  Build profile\n')
+        print(f'  {"Stage":<26} {"Wall ms":>9} {"CPU ms":>9} {"Read KB":>9} {"Write KB":>9} {"Reads":>6} {"Writes":>6}')
+        for name, stats in self.stages.items():
+            print(f'  {name:<26} {stats["wall_ms"]:>9.1f} {stats["cpu_ms"]:>9.1f} '
+                  f'{stats["bytes_read"] / 1024:>9.1f} {stats["bytes_written"] / 1024:>9.1f} '
+                  f'{stats["files_read"]:>6} {stats["files_written"]:>6}')
+
+        slowest = self.slowest_files(top)
+        if slowest:
+            print(f'\n  Slowest {len(slowest)} files:')
+            for f in slowest:
+                print(f'  {f["ms"]:>9.2f} ms  {f["stage"]:<14} {f["path"]}')
+        print()
+
+    def to_json(self, top=10):
+        stages = {name: {key: round(value, 3) for key, value in stats.items()}
+                  for name, stats in self.stages.items()}
+        return {
+            'commit': os.environ.get('GITHUB_SHA'),
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'stages': stages,
+            'total_wall_ms': round(sum(stats['wall_ms'] for stats in self.stages.values()), 3),
+            'slowest_files': [dict(f, ms=round(f['ms'], 3)) for f in self.slowest_files(top)]
+        }
+
+def cpu_time():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+profiler = BuildProfiler()
+
+def read_text(path):
+    """Read a UTF-8 text file, counting the bytes against the profiled stage"""
+    with open(path, 'r', encoding='utf-8') as f:
+        profiler.record_read(os.fstat(f.fileno()).st_size)
+        return f.read()
+
+def parse_html_file(file_path, fields=None):
     """Parse HTML file and extract metadata"""
+    html_content = read_text(file_path)
+
+    return parse_html(html_content, fields)
+
+def parse_html(html_content, fields=None):
+    """Extract metadata from an HTML document already read into memory.
+
+    With fields=None the whole document is fed to SimpleHTMLParser. Otherwise
+    the document is fed in chunks to a MetadataParser that stops once the
+    requested fields are found, and the setView scan only runs when
+    'coordinates' is requested.
+    """
+    if fields is None:
+        parser = SimpleHTMLParser()
+        parser.feed(html_content)
+    else:
+        parser = MetadataParser(fields)
+        for start in range(0, len(html_content), FEED_CHUNK_SIZE):
+            parser.feed(html_content[start:start + FEED_CHUNK_SIZE])
+            if parser.done:
+                break
+
+    if fields is None or 'coordinates' in fields:
+        find_coordinates(html_content, parser.data)
+
+    return parser.data
+
+def find_coordinates(html_content, data):
+    """Store the first Leaflet setView([lat, lng]) in data as lat/lng.
+
+    Jumps between 'setView(' occurrences with str.find and only runs the
+    regex at those positions, rather than searching the whole document.
+    """
+    pos = html_content.find('setView(')
+    while pos != -1:
+        script_match = SETVIEW_PATTERN.match(html_content, pos)
+        if script_match:
+            data['lat'] = float(script_match.group(1))
+            data['lng'] = float(script_match.group(2))
+            return
+        pos = html_content.find('setView(', pos + 1)
+
+# Longest setView([lat, lng] prefix kept between chunks when scanning a stream
+SETVIEW_OVERLAP = 128
+
+def stream_metadata(file_path, fields=None, chunk_size=FEED_CHUNK_SIZE):
+    """Extract metadata reading file_path in chunks, never holding it whole.
+
+    Returns (data, sha256 hexdigest). The whole file is still read for the
+    hash, but chunks stop being fed to the parser once it has the requested
+    fields, and setView is found by scanning each chunk with a small overlap.
+    """
+    parser = SimpleHTMLParser() if fields is None else MetadataParser(fields)
+    want_coordinates = fields is None or 'coordinates' in fields
+    hasher = hashlib.sha256()
+    tail = ''
+
     with open(file_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+        profiler.record_read(os.fstat(f.fileno()).st_size)
+        for chunk in iter(lambda: f.read(chunk_size), ''):
+            hasher.update(chunk.encode('utf-8'))
+
+            if not getattr(parser, 'done', False):
+                parser.feed(chunk)
+
+            if want_coordinates:
+                window = tail + chunk
+                find_coordinates(window, parser.data)
+                if 'lat' in parser.data:
+                    want_coordinates = False
+                tail = window[-SETVIEW_OVERLAP:]
+
+    return parser.data, hasher.hexdigest()
+
+MANIFEST_PATH = Path('.build-cache') / 'manifest.json'
+MANIFEST_VERSION = 1
+
+class BuildManifest:
+    """Persistent record of parsed source files, keyed on path and content hash.
+
+    Each entry stores the file's mtime, size, sha256 and the metadata that
+    parse_html_file extracted from it. Files whose mtime and size are
+    unchanged are trusted without reading; otherwise the content is hashed and
+    only re-parsed when the hash differs. Only the first paragraph is kept,
+    since that is all the generators use.
+
+    The manifest also keeps each post's prev/next neighbours from the last
+    build, so navigation is only rewritten for posts whose neighbours changed.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, full=False):
+        self.path = Path(path)
+        self.full = full
+        self.entries = {}
+        self.seen = {}
+        self.changed = set()
+        self.post_nav = None
+        self.reused = 0
+        self.parsed = 0
+        if not full:
+            self.load()
+
+    def load(self):
+        try:
+            manifest = json.loads(read_text(self.path))
+        except (OSError, ValueError):
+            return
+
+        if manifest.get('version') == MANIFEST_VERSION:
+            self.entries = manifest.get('files', {})
+            self.post_nav = manifest.get('post_nav')
+
+    def lookup(self, file_path):
+        """Return (data, html_content) for file_path.
+
+        data is the cached metadata when the file is unchanged, otherwise None
+        and the file needs parsing before record(). html_content is the text
+        if the file had to be read, or None when mtime and size matched.
+        """
+        key = Path(file_path).as_posix()
+        stat = os.stat(file_path)
+        entry = self.entries.get(key)
+
+        if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.seen[key] = entry
+            self.reused += 1
+            return entry['data'], None
+
+        html_content = read_text(file_path)
+        digest = hashlib.sha256(html_content.encode('utf-8')).hexdigest()
+
+        self.seen[key] = {
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'data': None
+        }
+
+        if entry and entry['sha256'] == digest:
+            self.seen[key]['data'] = entry['data']
+            self.reused += 1
+            return entry['data'], html_content
+
+        self.changed.add(key)
+        return None, html_content
+
+    def record(self, file_path, data):
+        """Store freshly parsed metadata for a file returned by lookup()"""
+        if 'paragraphs' in data:
+            data['paragraphs'] = data['paragraphs'][:1]
+        self.seen[Path(file_path).as_posix()]['data'] = data
+        self.parsed += 1
+
+    def stream(self, file_path):
+        """Like parse(), but reads changed files in chunks via stream_metadata()"""
+        key = Path(file_path).as_posix()
+        stat = os.stat(file_path)
+        entry = self.entries.get(key)
+
+        if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.seen[key] = entry
+            self.reused += 1
+            return entry['data']
+
+        data, digest = stream_metadata(file_path, source_fields(file_path))
+        self.seen[key] = {
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'data': None
+        }
+
+        if entry and entry['sha256'] == digest:
+            self.seen[key]['data'] = entry['data']
+            self.reused += 1
+            return entry['data']
+
+        self.changed.add(key)
+        self.record(file_path, data)
+        return data
+
+    def parse(self, file_path):
+        """Return metadata for file_path, re-parsing only if its content changed"""
+        data, html_content = self.lookup(file_path)
+        if data is None:
+            data = parse_html(html_content, source_fields(file_path))
+            self.record(file_path, data)
+        return data
+
+    def refresh(self, file_path, html_content):
+        """Update a seen file's stat and hash after the build rewrote it.
+
+        The cached metadata is kept: rewrites only touch navigation, which
+        none of the extracted fields come from.
+        """
+        key = Path(file_path).as_posix()
+        entry = self.seen.get(key)
+        if entry is None:
+            return
+
+        stat = os.stat(file_path)
+        self.seen[key] = dict(
+            entry,
+            mtime=stat.st_mtime_ns,
+            size=stat.st_size,
+            sha256=hashlib.sha256(html_content.encode('utf-8')).hexdigest()
+        )
+
+    def entry(self, file_path):
+        """Return the latest entry for file_path from this run or the last one"""
+        key = Path(file_path).as_posix()
+        return self.seen.get(key) or self.entries.get(key)
+
+    def save(self, collections=None, stream=False):
+        """Write entries seen this run, dropping files that no longer exist.
+
+        When only some collections were rebuilt, entries for the others are
+        carried over untouched. Afterwards the manifest is ready for another
+        run, so watch mode can keep one instance across rebuilds. stream=True
+        encodes the JSON incrementally instead of as one string.
+        """
+        files = {}
+        if collections is not None:
+            files = {key: entry for key, entry in self.entries.items()
+                     if Path(key).parts[0] not in collections}
+        files.update((key, entry) for key, entry in self.seen.items() if entry['data'] is not None)
+        files = dict(sorted(files.items()))
+        manifest = {'version': MANIFEST_VERSION, 'files': files, 'post_nav': self.post_nav}
+        if stream:
+            writer.write_chunks(self.path, json.JSONEncoder(ensure_ascii=False).iterencode(manifest))
+        else:
+            writer.write(self.path, json.dumps(manifest, ensure_ascii=False))
+
+        print(f'📦 Build cache: {self.reused} reused, {self.parsed} parsed\n')
+
+        self.entries = files
+        self.seen = {}
+        self.changed = set()
+        self.full = False
+        self.reused = 0
+        self.parsed = 0
+
+def parse_source(file_path, manifest=None):
+    """Parse file_path through the build manifest when one is in use"""
+    if manifest is None:
+        return parse_html_file(file_path, source_fields(file_path))
+    return manifest.parse(file_path)
+
+COLLECTIONS = ('benedict', 'posts', 'books')
+
+# Below this many files the process pool costs more than it saves
+MIN_POOL_FILES = 8
+
+def collection_sources(collection_dir):
+    """Return (item, index_path) pairs for a collection directory, sorted by name"""
+    sources = []
+    for item in sorted(Path(collection_dir).iterdir()):
+        if not item.is_dir():
+            continue
 
-    parser = SimpleHTMLParser()
-    parser.feed(html_content)
+        index_path = item / 'index.html'
+        if index_path.exists():
+            sources.append((item, index_path))
+    return sources
+
+def parse_sources(paths, manifest=None, workers=1, contents=None, stream=False):
+    """Parse every path up front, fanning cache misses out over a process pool.
+
+    Returns a dict mapping each path to its metadata, or to the exception
+    raised while reading or parsing it. Falls back to parsing serially when
+    workers is 1, there is little to parse, or a pool can't be started.
+    If contents is a dict, the text of every file read here is stored in it
+    so later stages don't have to read it again.
+
+    stream=True parses each file in chunks, one at a time, and keeps no
+    document text, so memory use doesn't grow with the size of the tree.
+    """
+    results = {}
+    pending = {}
+
+    if stream:
+        for path in paths:
+            try:
+                if manifest is None:
+                    results[path], _ = stream_metadata(path, source_fields(path))
+                else:
+                    results[path] = manifest.stream(path)
+            except Exception as e:
+                results[path] = e
+        return results
+
+    for path in paths:
+        try:
+            if manifest is None:
+                data, html_content = None, read_text(path)
+            else:
+                data, html_content = manifest.lookup(path)
+        except Exception as e:
+            results[path] = e
+            continue
 
-    # Extract coordinates from script
-    script_match = re.search(r'setView\(\[(-?\d+\.\d+),\s*(-?\d+\.\d+)\]', html_content)
-    if script_match:
-        parser.data['lat'] = float(script_match.group(1))
-        parser.data['lng'] = float(script_match.group(2))
+        if html_content is not None and contents is not None:
+            contents[path] = html_content
 
-    return parser.data
+        if data is None:
+            pending[path] = html_content
+        else:
+            results[path] = data
+
+    if workers > 1 and len(pending) >= MIN_POOL_FILES:
+        try:
+            parsed = _parse_in_pool(pending, workers)
+        except (OSError, NotImplementedError) as e:
+            print(f'Process pool unavailable ({e}), parsing serially...')
+            parsed = _parse_serially(pending)
+    else:
+        parsed = _parse_serially(pending)
+
+    for path, data in parsed.items():
+        if manifest is not None and not isinstance(data, Exception):
+            manifest.record(path, data)
+        results[path] = data
+
+    return results
+
+def _timed_parse(html_content, fields):
+    start = time.perf_counter()
+    data = parse_html(html_content, fields)
+    return data, time.perf_counter() - start
+
+def _parse_serially(pending):
+    parsed = {}
+    for path, html_content in pending.items():
+        try:
+            parsed[path], seconds = _timed_parse(html_content, source_fields(path))
+            profiler.record_file(path, 'parse', seconds)
+        except Exception as e:
+            parsed[path] = e
+    return parsed
+
+def _parse_in_pool(pending, workers):
+    parsed = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {path: executor.submit(_timed_parse, html_content, source_fields(path))
+                   for path, html_content in pending.items()}
+        for path, future in futures.items():
+            try:
+                parsed[path], seconds = future.result()
+                profiler.record_file(path, 'parse', seconds)
+            except Exception as e:
+                parsed[path] = e
+    return parsed
+
+def parsed_source(index_path, parsed=None, manifest=None):
+    """Return metadata from the shared parse stage, parsing on demand if absent"""
+    if parsed is not None and index_path in parsed:
+        data = parsed[index_path]
+        if isinstance(data, Exception):
+            raise data
+        return data
+    return parse_source(index_path, manifest)
+
+class OutputWriter:
+    """Writes generated files atomically, skipping those whose content is unchanged.
+
+    New content goes to a temporary file beside the target which is then
+    renamed over it, so an interrupted build never leaves a truncated file.
+    status maps each path written this run to 'changed' or 'unchanged'.
+    """
+
+    def __init__(self):
+        self.status = {}
+
+    def write(self, path, content, current=None):
+        """Write content to path unless it already matches; returns True if written.
+
+        current is the file's existing text when the caller has already read it.
+        """
+        path = Path(path)
+        if current is None:
+            try:
+                current = read_text(path)
+            except (OSError, UnicodeDecodeError):
+                current = None
+
+        key = path.as_posix()
+        if current == content:
+            self.status[key] = 'unchanged'
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'.{path.name}.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+                profiler.record_write(f.tell())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+        self.status[key] = 'changed'
+        return True
+
+    def write_chunks(self, path, chunks):
+        """Like write(), but streams content from an iterable of strings.
+
+        The chunks go straight to the temp file while being hashed, and the
+        existing file is hashed in chunks too, so neither is held in memory.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'.{path.name}.tmp')
+        hasher = hashlib.sha256()
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    hasher.update(chunk.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+
+            key = path.as_posix()
+            if hash_text_file(path) == hasher.hexdigest():
+                tmp_path.unlink()
+                self.status[key] = 'unchanged'
+                return False
+
+            profiler.record_write(size)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+        self.status[key] = 'changed'
+        return True
+
+    def remove(self, path):
+        """Delete an output that is no longer generated"""
+        path = Path(path)
+        if path.exists():
+            path.unlink()
+            self.status[path.as_posix()] = 'removed'
+
+    def changed(self):
+        return [path for path, status in self.status.items() if status != 'unchanged']
+
+    def report(self):
+        changed = self.changed()
+        print(f'📝 Outputs: {len(changed)} changed, {len(self.status) - len(changed)} unchanged')
+        for path in changed:
+            if self.status[path] == 'removed':
+                print(f'  ✓ Removed: {path}')
+            else:
+                print(f'  ✓ Wrote: {path}')
+        print()
+
+writer = OutputWriter()
+
+def hash_text_file(path, chunk_size=65536):
+    """sha256 of a UTF-8 text file as read in text mode, or None if unreadable"""
+    hasher = hashlib.sha256()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                hasher.update(chunk.encode('utf-8'))
+    except (OSError, UnicodeDecodeError):
+        return None
+    return hasher.hexdigest()
+
+def write_js_data(path, preamble, records, stream=False):
+    """Write a generated JS data file: preamble, records as JSON, then ';'.
+
+    With stream=True each record is written as its own chunk instead of the
+    whole array being built as one string. Both paths produce the same bytes.
+    """
+    if stream:
+        writer.write_chunks(path, chain([preamble], iter_records_json(records, pretty=True), [';\n']))
+    else:
+        writer.write(path, f'{preamble}{records_json(records, pretty=True)};\n')
+
+DEFAULT_PAGE_SIZE = 10
+
+def write_shards(name, records, index_keys, page_size=DEFAULT_PAGE_SIZE):
+    """Write records as a compact index shard plus paginated full-record shards.
+
+    {name}.index.json holds only index_keys for every record, and
+    {name}.page-N.json (1-based) holds page_size full records each, so pages
+    can be fetched on demand. Page shards left over from a longer list are
+    removed.
+    """
+    page_count = (len(records) + page_size - 1) // page_size
+    index = {
+        'total': len(records),
+        'pageSize': page_size,
+        'pages': page_count,
+        'items': [record.to_json(index_keys) for record in records]
+    }
+    writer.write(f'{name}.index.json', dump_compact_json(index) + '\n')
+
+    for page in range(page_count):
+        page_records = records[page * page_size:(page + 1) * page_size]
+        writer.write(f'{name}.page-{page + 1}.json', records_json(page_records) + '\n')
+
+    for page_path in sorted(Path('.').glob(f'{name}.page-*.json')):
+        page_match = re.fullmatch(rf'{re.escape(name)}\.page-(\d+)\.json', page_path.name)
+        if page_match and int(page_match.group(1)) > page_count:
+            writer.remove(page_path)
+
+def dump_compact_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+def json_scalar(value):
+    """Encode a str, int or float exactly as json.dumps(ensure_ascii=False) would"""
+    if type(value) is str:
+        return encode_json_string(value)
+    if type(value) is int:
+        return int.__repr__(value)
+    if type(value) is float and math.isfinite(value):
+        return float.__repr__(value)
+    return json.dumps(value)
+
+class Record:
+    """Base for generated data records, stored in __slots__ rather than dicts.
+
+    Subclasses list their (JSON key, attribute) pairs in FIELDS, in output
+    order, and set sort_key once in __init__ so sorting never rebuilds keys.
+    Records serialise through per-class templates that reproduce json.dumps
+    output byte for byte, compact or as an indent=4 array element.
+    """
+    __slots__ = ('sort_key',)
+    FIELDS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        keys = [json.dumps(key) for key, _ in cls.FIELDS]
+        cls.JSON_KEYS = tuple(key for key, _ in cls.FIELDS)
+        cls.ATTRIBUTES = dict(cls.FIELDS)
+        cls.values = attrgetter(*(attribute for _, attribute in cls.FIELDS))
+        cls.COMPACT_TEMPLATE = '{' + ','.join(f'{key}:%s' for key in keys) + '}'
+        cls.PRETTY_TEMPLATE = '    {\n' + ',\n'.join(f'        {key}: %s' for key in keys) + '\n    }'
+
+    def to_json(self, keys=None):
+        """Return the record as a dict in its JSON shape, optionally limited to keys"""
+        if keys is None:
+            return dict(zip(self.JSON_KEYS, self.values(self)))
+        return {key: getattr(self, self.ATTRIBUTES[key]) for key in keys}
+
+    def encode(self, pretty=False):
+        template = self.PRETTY_TEMPLATE if pretty else self.COMPACT_TEMPLATE
+        return template % tuple(map(json_scalar, self.values(self)))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_json()!r})'
+
+class BenedictReview(Record):
+    __slots__ = ('title', 'date', 'date_display', 'rating', 'summary', 'url', 'lat', 'lng', 'fellow')
+    FIELDS = (
+        ('title', 'title'),
+        ('date', 'date'),
+        ('dateDisplay', 'date_display'),
+        ('rating', 'rating'),
+        ('ratingDisplay', 'rating_display'),
+        ('summary', 'summary'),
+        ('url', 'url'),
+        ('lat', 'lat'),
+        ('lng', 'lng'),
+        ('fellow', 'fellow')
+    )
+    rating_display = '🍳'
+
+    def __init__(self, title, date, date_display, rating, summary, url, lat, lng, fellow):
+        self.title = title
+        self.date = date
+        self.date_display = date_display
+        self.rating = rating
+        self.summary = summary
+        self.url = url
+        self.lat = lat
+        self.lng = lng
+        self.fellow = fellow
+        self.sort_key = (date, url)
+
+class Post(Record):
+    __slots__ = ('title', 'url', 'date', 'date_display', 'excerpt')
+    FIELDS = (
+        ('title', 'title'),
+        ('url', 'url'),
+        ('date', 'date'),
+        ('dateDisplay', 'date_display'),
+        ('excerpt', 'excerpt')
+    )
+
+    def __init__(self, title, url, date, date_display, excerpt):
+        self.title = title
+        self.url = url
+        self.date = date
+        self.date_display = date_display
+        self.excerpt = excerpt
+        self.sort_key = (date, url)
+
+class BookChapter(Record):
+    __slots__ = ('title', 'chapter_number', 'url', 'excerpt')
+    FIELDS = (
+        ('title', 'title'),
+        ('chapterNumber', 'chapter_number'),
+        ('url', 'url'),
+        ('excerpt', 'excerpt')
+    )
+
+    def __init__(self, title, chapter_number, url, excerpt):
+        self.title = title
+        self.chapter_number = chapter_number
+        self.url = url
+        self.excerpt = excerpt
+        self.sort_key = (chapter_number, url)
+
+sort_key = attrgetter('sort_key')
+
+def iter_records_json(records, pretty=False):
+    """Yield a JSON array of records in chunks, one per record"""
+    if not records:
+        yield '[]'
+        return
+    separator = ',\n' if pretty else ','
+    yield '[\n' if pretty else '['
+    for i, record in enumerate(records):
+        yield (separator if i else '') + record.encode(pretty)
+    yield '\n]' if pretty else ']'
 
-def generate_benedict_reviews():
+def records_json(records, pretty=False):
+    """Encode records as json.dumps(..., indent=4 if pretty else compact) would"""
+    return ''.join(iter_records_json(records, pretty))
+
+def generate_benedict_reviews(manifest=None, parsed=None, stream=False):
     """Generate benedict-reviews.js from HTML files"""
     print('Generating benedict-reviews.js...')
 
@@ -114,16 +898,9 @@ def generate_benedict_reviews():
 
     reviews = []
 
-    for item in benedict_dir.iterdir():
-        if not item.is_dir():
-            continue
-
-        index_path = item / 'index.html'
-        if not index_path.exists():
-            continue
-
+    for item, index_path in collection_sources(benedict_dir):
         try:
-            data = parse_html_file(index_path)
+            data = parsed_source(index_path, parsed, manifest)
 
             title = data.get('title', item.name)
             datetime_str = data.get('datetime', '')
@@ -143,18 +920,17 @@ def generate_benedict_reviews():
             fellow_match = re.search(r'Benedict Fellow:\s*(.+)', fellow_text)
             fellow = fellow_match.group(1).strip() if fellow_match else 'Joel Delaney'
 
-            review = {
-                'title': title,
-                'date': date,
-                'dateDisplay': date_display,
-                'rating': rating,
-                'ratingDisplay': '🍳',
-                'summary': summary,
-                'url': f'/benedict/{item.name}/',
-                'lat': data.get('lat', 0),
-                'lng': data.get('lng', 0),
-                'fellow': fellow
-            }
+            review = BenedictReview(
+                title=title,
+                date=date,
+                date_display=date_display,
+                rating=rating,
+                summary=summary,
+                url=f'/benedict/{item.name}/',
+                lat=data.get('lat', 0),
+                lng=data.get('lng', 0),
+                fellow=fellow
+            )
 
             reviews.append(review)
             print(f'  ✓ Processed: {title}')
@@ -163,23 +939,26 @@ def generate_benedict_reviews():
             print(f'  ✗ Error processing {item.name}: {e}')
 
     # Sort by date (newest first), tiebreak on url for deterministic output
-    reviews.sort(key=lambda x: (x['date'], x['url']), reverse=True)
+    reviews.sort(key=sort_key, reverse=True)
 
     # Generate JavaScript file
-    js_content = f"""// Benedict Reviews Data
+    preamble = """// Benedict Reviews Data
 // Add new reviews to this array - they will automatically appear on benedict.html
 // Reviews are automatically sorted by date (newest first)
 
-const benedictReviews = {json.dumps(reviews, indent=4, ensure_ascii=False)};
-"""
+const benedictReviews = """
 
-    with open('benedict-reviews.js', 'w', encoding='utf-8') as f:
-        f.write(js_content)
+    write_js_data('benedict-reviews.js', preamble, reviews, stream)
 
     print(f'✅ Generated benedict-reviews.js with {len(reviews)} reviews\n')
 
-def generate_blog_posts():
-    """Generate blog-posts.js from HTML files"""
+def generate_blog_posts(manifest=None, parsed=None, page_size=DEFAULT_PAGE_SIZE, legacy_js=True, stream=False):
+    """Generate blog-posts.js and its JSON shards from HTML files.
+
+    The index shard carries title, url and date; excerpts only live in the
+    page shards, which blog/index.html fetches a page at a time. The
+    blogPosts global is only its fallback; legacy_js=False skips it.
+    """
     print('Generating blog-posts.js...')
 
     posts_dir = Path('posts')
@@ -189,16 +968,9 @@ def generate_blog_posts():
 
     posts = []
 
-    for item in posts_dir.iterdir():
-        if not item.is_dir():
-            continue
-
-        index_path = item / 'index.html'
-        if not index_path.exists():
-            continue
-
+    for item, index_path in collection_sources(posts_dir):
         try:
-            data = parse_html_file(index_path)
+            data = parsed_source(index_path, parsed, manifest)
 
             title = data.get('title', item.name)
             datetime_str = data.get('datetime', '')
@@ -209,13 +981,13 @@ def generate_blog_posts():
             paragraphs = data.get('paragraphs', [])
             excerpt = paragraphs[0] if paragraphs else ''
 
-            post = {
-                'title': title,
-                'url': f'/posts/{item.name}/',
-                'date': date,
-                'dateDisplay': date_display,
-                'excerpt': excerpt
-            }
+            post = Post(
+                title=title,
+                url=f'/posts/{item.name}/',
+                date=date,
+                date_display=date_display,
+                excerpt=excerpt
+            )
 
             posts.append(post)
             print(f'  ✓ Processed: {title}')
@@ -224,108 +996,158 @@ def generate_blog_posts():
             print(f'  ✗ Error processing {item.name}: {e}')
 
     # Sort by date (newest first), tiebreak on url for deterministic output
-    posts.sort(key=lambda x: (x['date'], x['url']), reverse=True)
+    posts.sort(key=sort_key, reverse=True)
 
-    # Generate JavaScript file
-    js_content = f"""// Blog Posts Data
+    write_shards('blog-posts', posts, ('title', 'url', 'date'), page_size)
+
+    if legacy_js:
+        # Generate JavaScript file
+        preamble = """// Blog Posts Data
 // This file is automatically generated by build.py
 // Do not edit manually - run 'python3 build.py' to regenerate
 
-const blogPosts = {json.dumps(posts, indent=4, ensure_ascii=False)};
-"""
+const blogPosts = """
 
-    with open('blog-posts.js', 'w', encoding='utf-8') as f:
-        f.write(js_content)
+        write_js_data('blog-posts.js', preamble, posts, stream)
 
-    print(f'✅ Generated blog-posts.js with {len(posts)} posts\n')
+    print(f'✅ Generated blog-posts data with {len(posts)} posts\n')
     return posts
 
-def update_blog_post_files(posts):
-    """Update all blog post HTML files with proper navigation and Book link"""
+# Both post rewrites in one alternation so each document is scanned once
+POST_REWRITE_PATTERN = re.compile(
+    r'(?P<nav>[ \t]*<nav class="post-nav">.*?</nav>)'
+    r'|(?P<links_before><ul class="nav-links">.*?<li><a href="../../benedict/">Benedict</a></li>)(?P<links_after>.*?</ul>)',
+    re.DOTALL
+)
+
+def build_post_nav(posts, idx):
+    """Build the prev/next post-nav block for posts[idx]"""
+    prev_post = posts[idx - 1] if idx > 0 else None
+    next_post = posts[idx + 1] if idx < len(posts) - 1 else None
+
+    nav_html = '        <nav class="post-nav">\n'
+    if prev_post:
+        prev_slug = prev_post.url.strip('/').split('/')[-1]
+        nav_html += f'            <a href="../{prev_slug}/">← {prev_post.title}</a>\n'
+    else:
+        nav_html += '            <span></span>\n'
+
+    if next_post:
+        next_slug = next_post.url.strip('/').split('/')[-1]
+        nav_html += f'            <a href="../{next_slug}/">{next_post.title} →</a>\n'
+    else:
+        nav_html += '            <span></span>\n'
+
+    nav_html += '        </nav>'
+    return nav_html
+
+def post_neighbours(posts):
+    """Map each post URL to its [prev, next] neighbours as [url, title] pairs"""
+    neighbours = {}
+    for idx, post in enumerate(posts):
+        prev_post = posts[idx - 1] if idx > 0 else None
+        next_post = posts[idx + 1] if idx < len(posts) - 1 else None
+        neighbours[post.url] = [
+            [prev_post.url, prev_post.title] if prev_post else None,
+            [next_post.url, next_post.title] if next_post else None
+        ]
+    return neighbours
+
+def stale_post_navs(posts, previous_nav, changed_paths=()):
+    """Return URLs of posts whose navigation needs rewriting, or None for all.
+
+    A post is stale if it gained, lost or renamed a neighbour since the
+    previous build, or if its own file changed since the build last saw it.
+    Without a previous build every post is rewritten.
+    """
+    if previous_nav is None:
+        return None
+
+    stale = set()
+    for url, neighbours in post_neighbours(posts).items():
+        index_path = url.strip('/') + '/index.html'
+        if previous_nav.get(url) != neighbours or index_path in changed_paths:
+            stale.add(url)
+    return stale
+
+def rewrite_post_html(html, nav_html):
+    """Replace the post-nav block and add the Books nav link in a single pass"""
+    def replace(match):
+        if match.group('nav') is not None:
+            return nav_html
+
+        # Add Book link to navigation if not present
+        after = match.group('links_after')
+        if 'book' not in after.lower():
+            return match.group('links_before') + '\n                <li><a href="../../books/">Books</a></li>' + after
+        return match.group(0)
+
+    return POST_REWRITE_PATTERN.sub(replace, html)
+
+def update_blog_post_files(posts, contents=None, only=None, manifest=None):
+    """Update all blog post HTML files with proper navigation and Book link.
+
+    contents optionally maps index paths to text already read by the parse
+    stage, and only limits the rewrite to a set of post URLs. Files are only
+    written when the rewrite changes them. Returns the URLs that failed.
+    """
     print('Updating blog post HTML files...')
 
     if not posts:
         print('No posts found, skipping...')
-        return
+        return set()
 
     # Create a mapping of post URLs to indices for navigation
-    post_index = {post['url']: i for i, post in enumerate(posts)}
+    post_index = {post.url: i for i, post in enumerate(posts)}
 
     posts_dir = Path('posts')
     if not posts_dir.exists():
         print('Posts directory not found, skipping...')
-        return
+        return set()
 
+    contents = contents or {}
     updated_count = 0
-
-    for item in posts_dir.iterdir():
-        if not item.is_dir():
+    skipped_count = 0
+    untouched_count = 0
+    failed = set()
+
+    for item, index_path in collection_sources(posts_dir):
+        # Find current post in the sorted list
+        current_url = f'/posts/{item.name}/'
+        if current_url not in post_index:
             continue
 
-        index_path = item / 'index.html'
-        if not index_path.exists():
+        if only is not None and current_url not in only:
+            untouched_count += 1
             continue
 
         try:
-            with open(index_path, 'r', encoding='utf-8') as f:
-                html = f.read()
-
-            # Find current post in the sorted list
-            current_url = f'/posts/{item.name}/'
-            if current_url not in post_index:
-                continue
-
-            idx = post_index[current_url]
-
-            # Determine next and previous posts
-            prev_post = posts[idx - 1] if idx > 0 else None
-            next_post = posts[idx + 1] if idx < len(posts) - 1 else None
-
-            # Build navigation HTML
-            nav_html = '        <nav class="post-nav">\n'
-            if prev_post:
-                prev_slug = prev_post['url'].strip('/').split('/')[-1]
-                nav_html += f'            <a href="../{prev_slug}/">← {prev_post["title"]}</a>\n'
-            else:
-                nav_html += '            <span></span>\n'
-
-            if next_post:
-                next_slug = next_post['url'].strip('/').split('/')[-1]
-                nav_html += f'            <a href="../{next_slug}/">{next_post["title"]} →</a>\n'
-            else:
-                nav_html += '            <span></span>\n'
-
-            nav_html += '        </nav>'
-
-            # Update navigation if it exists
-            nav_pattern = r'<nav class="post-nav">.*?</nav>'
-            if re.search(nav_pattern, html, re.DOTALL):
-                html = re.sub(nav_pattern, nav_html, html, flags=re.DOTALL)
+            html = contents.get(index_path)
+            if html is None:
+                html = read_text(index_path)
 
-            # Add Book link to navigation if not present
-            nav_links_pattern = r'(<ul class="nav-links">.*?<li><a href="../../benedict/">Benedict</a></li>)(.*?</ul>)'
-            if re.search(nav_links_pattern, html, re.DOTALL):
-                def add_book_link(match):
-                    before = match.group(1)
-                    after = match.group(2)
-                    # Check if Book link already exists
-                    if 'book' not in after.lower():
-                        return before + '\n                <li><a href="../../books/">Books</a></li>' + after
-                    return match.group(0)
+            nav_html = build_post_nav(posts, post_index[current_url])
+            new_html = rewrite_post_html(html, nav_html)
 
-                html = re.sub(nav_links_pattern, add_book_link, html, flags=re.DOTALL)
+            if new_html == html:
+                skipped_count += 1
+                continue
 
             # Write updated HTML
-            with open(index_path, 'w', encoding='utf-8') as f:
-                f.write(html)
+            writer.write(index_path, new_html, current=html)
+            if manifest is not None:
+                manifest.refresh(index_path, new_html)
 
             updated_count += 1
             print(f'  ✓ Updated: {item.name}')
 
         except Exception as e:
+            failed.add(current_url)
             print(f'  ✗ Error updating {item.name}: {e}')
 
-    print(f'✅ Updated {updated_count} blog post files\n')
+    print(f'✅ Updated {updated_count} blog post files '
+          f'({skipped_count} unchanged, {untouched_count} with unchanged neighbours skipped)\n')
+    return failed
 
 def update_homepage(posts):
     """Update homepage with latest blog post"""
@@ -342,29 +1164,31 @@ def update_homepage(posts):
 
     latest_post = posts[0]
 
-    with open(index_path, 'r', encoding='utf-8') as f:
-        html = f.read()
+    html = read_text(index_path)
 
     # Find and replace the latest-post article content
     pattern = r'<article class="latest-post">.*?</article>'
     replacement = f'''<article class="latest-post">
-            <h2><a href="{latest_post['url']}">{latest_post['title']}</a></h2>
-            <time datetime="{latest_post['date']}">{latest_post['dateDisplay']}</time>
+            <h2><a href="{latest_post.url}">{latest_post.title}</a></h2>
+            <time datetime="{latest_post.date}">{latest_post.date_display}</time>
             <div class="post-preview-content">
-                <p>{latest_post['excerpt']}</p>
+                <p>{latest_post.excerpt}</p>
             </div>
-            <a href="{latest_post['url']}" class="read-more">Read more →</a>
+            <a href="{latest_post.url}" class="read-more">Read more →</a>
         </article>'''
 
-    html = re.sub(pattern, replacement, html, flags=re.DOTALL)
+    new_html = re.sub(pattern, replacement, html, flags=re.DOTALL)
+
+    writer.write(index_path, new_html, current=html)
 
-    with open(index_path, 'w', encoding='utf-8') as f:
-        f.write(html)
+    print(f'✅ Updated homepage with latest post: {latest_post.title}\n')
 
-    print(f'✅ Updated homepage with latest post: {latest_post["title"]}\n')
+def generate_book_chapters(manifest=None, parsed=None, page_size=DEFAULT_PAGE_SIZE, legacy_js=True, stream=False):
+    """Generate book-chapters.js and its JSON shards from HTML files.
 
-def generate_book_chapters():
-    """Generate book-chapters.js from HTML files"""
+    Sharded the same way as blog posts; the index shard carries title,
+    chapterNumber and url.
+    """
     print('Generating book-chapters.js...')
 
     book_dir = Path('books')
@@ -374,16 +1198,9 @@ def generate_book_chapters():
 
     chapters = []
 
-    for item in book_dir.iterdir():
-        if not item.is_dir():
-            continue
-
-        index_path = item / 'index.html'
-        if not index_path.exists():
-            continue
-
+    for item, index_path in collection_sources(book_dir):
         try:
-            data = parse_html_file(index_path)
+            data = parsed_source(index_path, parsed, manifest)
 
             title = data.get('title', item.name)
 
@@ -398,12 +1215,12 @@ def generate_book_chapters():
             if len(excerpt) > 150:
                 excerpt = excerpt[:150] + '...'
 
-            chapter = {
-                'title': title,
-                'chapterNumber': chapter_number,
-                'url': f'/books/{item.name}/',
-                'excerpt': excerpt
-            }
+            chapter = BookChapter(
+                title=title,
+                chapter_number=chapter_number,
+                url=f'/books/{item.name}/',
+                excerpt=excerpt
+            )
 
             chapters.append(chapter)
             print(f'  ✓ Processed: {title}')
@@ -412,27 +1229,208 @@ def generate_book_chapters():
             print(f'  ✗ Error processing {item.name}: {e}')
 
     # Sort by chapter number, tiebreak on url for deterministic output
-    chapters.sort(key=lambda x: (x['chapterNumber'], x['url']))
+    chapters.sort(key=sort_key)
 
-    # Generate JavaScript file
-    js_content = f"""// Book Chapters Data
+    write_shards('book-chapters', chapters, ('title', 'chapterNumber', 'url'), page_size)
+
+    if legacy_js:
+        # Generate JavaScript file
+        preamble = """// Book Chapters Data
 // This file is automatically generated by build.py
 // Do not edit manually - run 'python3 build.py' to regenerate
 
-const bookChapters = {json.dumps(chapters, indent=4, ensure_ascii=False)};
-"""
+const bookChapters = """
+
+        write_js_data('book-chapters.js', preamble, chapters, stream)
+
+    print(f'✅ Generated book-chapters data with {len(chapters)} chapters\n')
 
-    with open('book-chapters.js', 'w', encoding='utf-8') as f:
-        f.write(js_content)
+SEARCH_CACHE_PATH = Path('.build-cache') / 'search-docs.json'
 
-    print(f'✅ Generated book-chapters.js with {len(chapters)} chapters\n')
+def generate_search_index(sources, manifest=None, contents=None, cache=None):
+    """Generate the search/ index from the full post-content of every source.
+
+    Unlike the generators this needs every paragraph, so each source is fed
+    through the full SimpleHTMLParser. Tokenised documents are cached by
+    content hash alongside the build manifest, so only changed files are
+    re-tokenised. Returns the cache so callers can pass it back in as cache
+    next time instead of reloading it from disk.
+    """
+    print('Generating search index...')
+    start = time.perf_counter()
+
+    if cache is None:
+        cache = {}
+        if manifest is not None and not manifest.full:
+            try:
+                cache = json.loads(read_text(SEARCH_CACHE_PATH))
+            except (OSError, ValueError):
+                pass
+
+    contents = contents or {}
+    documents = []
+    seen = {}
+    tokenised = 0
+
+    for index_path in sources:
+        key = Path(index_path).as_posix()
+        entry = manifest.entry(index_path) if manifest is not None else None
+        digest = entry['sha256'] if entry else None
+        cached = cache.get(key)
+
+        try:
+            if digest is not None and cached and cached['sha256'] == digest:
+                document = cached['document']
+            else:
+                html_content = contents.get(index_path)
+                if html_content is None:
+                    html_content = read_text(index_path)
+
+                file_start = time.perf_counter()
+                data = parse_html(html_content)
+                item = Path(index_path).parent
+                title = data.get('title', item.name)
+                document = {
+                    'url': f'/{item.as_posix()}/',
+                    'title': title,
+                    'collection': item.parts[0],
+                    'terms': search_index.document_terms(title, data.get('paragraphs', []))
+                }
+                profiler.record_file(index_path, 'search', time.perf_counter() - file_start)
+                tokenised += 1
+        except Exception as e:
+            print(f'  ✗ Error indexing {key}: {e}')
+            continue
+
+        documents.append(document)
+        if digest is not None:
+            seen[key] = {'sha256': digest, 'document': document}
+
+    docs, postings = search_index.build_index(documents)
+
+    index_dir = search_index.INDEX_DIR
+    shard_count, total_bytes = search_index.write_index(docs, postings, writer.write, index_dir)
+
+    shard_names = {f'terms-{key}.json' for key in {search_index.shard_key(term) for term in postings}}
+    for shard_path in sorted(index_dir.glob('terms-*.json')):
+        if shard_path.name not in shard_names:
+            writer.remove(shard_path)
+
+    if manifest is not None:
+        writer.write(SEARCH_CACHE_PATH, json.dumps(seen, ensure_ascii=False))
+
+    elapsed = time.perf_counter() - start
+    print(f'✅ Generated search index with {len(docs)} documents, {len(postings)} terms, '
+          f'{shard_count} shards, {total_bytes / 1024:.0f} KB in {elapsed * 1000:.0f} ms '
+          f'({tokenised} tokenised)\n')
+    return seen
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Build generated site data from HTML sources')
+    parser.add_argument('--full', action='store_true',
+                        help='ignore the build cache and re-parse every source file')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='processes used to parse changed files (1 parses serially)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help='records per blog-posts/book-chapters page shard')
+    parser.add_argument('--no-legacy-js', dest='legacy_js', action='store_false',
+                        help='skip blog-posts.js and book-chapters.js, emitting only JSON shards')
+    parser.add_argument('--no-search', dest='search', action='store_false',
+                        help='skip generating the search/ index')
+    parser.add_argument('--stream', action='store_true',
+                        help='bounded-memory build: parse files in chunks one at a time and encode '
+                             'outputs incrementally (implies --no-search)')
+    parser.add_argument('--watch', action='store_true',
+                        help='rebuild on source changes and serve the site with live reload')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='port for the --watch development server')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='address for the --watch development server to bind to '
+                             '(default 127.0.0.1; use 0.0.0.0 to serve on the LAN)')
+    parser.add_argument('--interval', type=float, default=0.2,
+                        help='seconds between --watch polls for changes')
+    parser.add_argument('--profile', nargs='?', const='build-profile.json', metavar='JSON_PATH',
+                        help='report per-stage timings and I/O, and write them to JSON_PATH '
+                             '(default build-profile.json)')
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N',
+                        help='number of slowest files listed by --profile')
+    args = parser.parse_args(argv)
+
+    # The search index holds postings for the whole corpus, so it can't be bounded
+    if args.stream:
+        args.search = False
+    return args
+
+def build_site(args, manifest, collections=COLLECTIONS, search_cache=None):
+    """Run the generators for the given collections and save the manifest.
+
+    The homepage is derived from posts, so it is rebuilt with them. The
+    search index always covers every collection. Returns the search cache
+    for the next call, or None when search is disabled.
+    """
+    all_sources = {collection: [index_path for _, index_path in collection_sources(collection)]
+                   for collection in COLLECTIONS if Path(collection).exists()}
+    sources = [index_path for collection in collections for index_path in all_sources.get(collection, [])]
+    contents = None if args.stream else {}
+    with profiler.stage('parse_sources'):
+        parsed = parse_sources(sources, manifest, workers=max(1, args.workers), contents=contents,
+                               stream=args.stream)
+    page_size = max(1, args.page_size)
+
+    if 'benedict' in collections:
+        with profiler.stage('generate_benedict_reviews'):
+            generate_benedict_reviews(manifest, parsed, args.stream)
+
+    if 'posts' in collections:
+        with profiler.stage('generate_blog_posts'):
+            posts = generate_blog_posts(manifest, parsed, page_size, args.legacy_js, args.stream)
+        with profiler.stage('update_blog_post_files'):
+            stale = stale_post_navs(posts, manifest.post_nav, manifest.changed)
+            failed = update_blog_post_files(posts, contents, only=stale, manifest=manifest)
+            if posts:
+                manifest.post_nav = {url: neighbours for url, neighbours in post_neighbours(posts).items()
+                                     if url not in failed}
+        with profiler.stage('update_homepage'):
+            update_homepage(posts)
+
+    if 'books' in collections:
+        with profiler.stage('generate_book_chapters'):
+            generate_book_chapters(manifest, parsed, page_size, args.legacy_js, args.stream)
+
+    if args.search:
+        search_sources = [index_path for paths in all_sources.values() for index_path in paths]
+        with profiler.stage('generate_search_index'):
+            search_cache = generate_search_index(search_sources, manifest, contents, search_cache)
+
+    with profiler.stage('save_manifest'):
+        manifest.save(None if tuple(collections) == COLLECTIONS else collections, args.stream)
+    return search_cache if args.search else None
 
 # Run all generators
 if __name__ == '__main__':
+    args = parse_args()
+    manifest = BuildManifest(full=args.full)
+    profiler.enabled = bool(args.profile)
+
     print('🔨 Building site...\n')
-    generate_benedict_reviews()
-    posts = generate_blog_posts()
-    update_blog_post_files(posts)
-    update_homepage(posts)
-    generate_book_chapters()
+    search_cache = build_site(args, manifest)
+    writer.report()
+    if args.profile:
+        profiler.report(args.profile_top)
+        with open(args.profile, 'w', encoding='utf-8') as f:
+            json.dump(profiler.to_json(args.profile_top), f, indent=2)
+            f.write('\n')
+        print(f'📊 Wrote profile to {args.profile}\n')
     print('✅ Build complete!\n')
+
+    if args.watch:
+        import dev_server
+        dev_server.watch_and_serve(
+            lambda collections, search_cache: build_site(args, manifest, collections, search_cache),
+            writer,
+            search_cache,
+            COLLECTIONS,
+            port=args.port,
+            interval=args.interval,
+            host=args.host
+        )
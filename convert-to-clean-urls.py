@@ -1,142 +1,276 @@
 #!/usr/bin/env python3
+"""Move .html pages to directory-style clean URLs.
+
+The migration runs as a transaction journalled under .clean-urls-journal/:
+
+1. Plan every move (posts/slug.html -> posts/slug/index.html) and in-place
+   link update up front.
+2. Stage: rewrite every file in a thread pool, backing up the originals and
+   writing each result next to its source as <source>.clean-urls.tmp.
+   Nothing visible has changed yet.
+3. Commit: move staged files into place one by one, logging each step.
+
+An interrupted run can be finished with --resume or undone with --rollback.
+Running again on an already-converted tree finds nothing to do.
+"""
 
 import os
+import sys
+import json
 import shutil
-import re
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-# Directories to process
-directories = ['posts', 'benedict', 'work']
+from link_rewriter import (HOMEPAGE_REWRITER, PUBLISH_FORM_REWRITER, ROOT_PAGE_REWRITER,
+                           SUBDIRECTORY_REWRITERS)
 
-def convert_to_clean_url(dir_name):
-    if not os.path.exists(dir_name):
-        print(f"Directory {dir_name} does not exist, skipping...")
-        return
+# Directories to process. work/ is left alone: its .html pages are standalone
+# dashboards linked by their .html URLs (work-items.js, the DRR email
+# workflow) and fetch data relative to themselves.
+directories = ['posts', 'benedict']
 
-    files = os.listdir(dir_name)
-
-    for file in files:
-        if file.endswith('.html') and file != 'index.html':
-            file_path = os.path.join(dir_name, file)
-            file_name = file.replace('.html', '')
-            new_dir = os.path.join(dir_name, file_name)
-            new_file_path = os.path.join(new_dir, 'index.html')
-
-            # Create new directory
-            os.makedirs(new_dir, exist_ok=True)
-
-            # Read the content
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Update internal links in the content
-            if dir_name == 'posts':
-                # Posts are one level deeper now (posts/slug/index.html instead of posts/slug.html)
-                content = content.replace('href="../style.css"', 'href="../../style.css"')
-                content = content.replace('href="../index.html"', 'href="../../"')
-                content = content.replace('href="../blog.html"', 'href="../../blog/"')
-                content = content.replace('href="../work.html"', 'href="../../work/"')
-                content = content.replace('href="../benedict.html"', 'href="../../benedict/"')
-            elif dir_name in ['benedict', 'work']:
-                # These files are also one level deeper now
-                content = content.replace('href="../style.css"', 'href="../../style.css"')
-                content = content.replace('href="../index.html"', 'href="../../"')
-                content = content.replace('href="../blog.html"', 'href="../../blog/"')
-                content = content.replace('href="../work.html"', 'href="../../work/"')
-                content = content.replace('href="../benedict.html"', 'href="../../benedict/"')
-                content = content.replace('href="benedict.html"', 'href="../../benedict/"')
-
-            # Write to new location
-            with open(new_file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"Converted: {file_path} -> {new_file_path}")
-
-            # Delete old file
-            os.remove(file_path)
-            print(f"Deleted: {file_path}")
-
-# Convert root HTML files
+# Root pages that move into their own directory
 root_files = ['blog.html', 'work.html', 'benedict.html']
-for file in root_files:
-    file_name = file.replace('.html', '')
-    new_dir = file_name
-    new_file_path = os.path.join(new_dir, 'index.html')
-
-    if not os.path.exists(file):
-        print(f"{file} does not exist, skipping...")
-        continue
-
-    # Create directory
-    os.makedirs(new_dir, exist_ok=True)
-
-    # Read and update content
-    with open(file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Update links to remove .html
-    content = re.sub(r'href="index\.html"', 'href="/"', content)
-    content = re.sub(r'href="blog\.html"', 'href="/blog/"', content)
-    content = re.sub(r'href="work\.html"', 'href="/work/"', content)
-    content = re.sub(r'href="benedict\.html"', 'href="/benedict/"', content)
-
-    # Update CSS path
-    content = re.sub(r'href="style\.css"', 'href="/style.css"', content)
-
-    # Update post links
-    content = re.sub(r'href="posts/([^"]+)\.html"', r'href="/posts/\1/"', content)
-    content = re.sub(r'href="benedict/([^"]+)\.html"', r'href="/benedict/\1/"', content)
-    content = re.sub(r'href="work/([^"]+)\.html"', r'href="/work/\1/"', content)
-
-    # Write to new location
-    with open(new_file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f"Converted: {file} -> {new_file_path}")
 
-    # Delete old file
-    os.remove(file)
-    print(f"Deleted: {file}")
+publish_forms = ['publish-blog.html', 'publish-eggs.html', 'publish-work.html']
+
+REWRITERS = {
+    'root': ROOT_PAGE_REWRITER,
+    'homepage': HOMEPAGE_REWRITER,
+    'publish': PUBLISH_FORM_REWRITER,
+    **SUBDIRECTORY_REWRITERS
+}
 
-# Update index.html
-if os.path.exists('index.html'):
-    with open('index.html', 'r', encoding='utf-8') as f:
-        content = f.read()
+JOURNAL_DIR = '.clean-urls-journal'
+PLAN_PATH = os.path.join(JOURNAL_DIR, 'plan.json')
+DONE_PATH = os.path.join(JOURNAL_DIR, 'done.log')
+BACKUP_DIR = os.path.join(JOURNAL_DIR, 'backup')
+STAGED_SUFFIX = '.clean-urls.tmp'
 
-    # Update links
-    content = re.sub(r'href="index\.html"', 'href="/"', content)
-    content = re.sub(r'href="blog\.html"', 'href="/blog/"', content)
-    content = re.sub(r'href="work\.html"', 'href="/work/"', content)
-    content = re.sub(r'href="benedict\.html"', 'href="/benedict/"', content)
-    content = re.sub(r'href="posts/([^"]+)\.html"', r'href="/posts/\1/"', content)
+def read_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
 
-    with open('index.html', 'w', encoding='utf-8') as f:
+def write_file(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
         f.write(content)
-    print('Updated: index.html')
+        f.flush()
+        os.fsync(f.fileno())
 
-# Convert subdirectory files
-for directory in directories:
-    print(f"\nProcessing {directory}/...")
-    convert_to_clean_url(directory)
+def backup_path(path):
+    return os.path.join(BACKUP_DIR, path)
 
-# Update publish forms
-publish_forms = ['publish-blog.html', 'publish-eggs.html', 'publish-work.html']
-for file in publish_forms:
-    if not os.path.exists(file):
-        continue
+def plan_migration():
+    """List every move and in-place update, in the order they are committed"""
+    steps = []
 
-    with open(file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    def add(source, target, rewriter):
+        steps.append({'source': source, 'target': target, 'rewriter': rewriter})
 
-    # Update links
-    content = re.sub(r'href="index\.html"', 'href="/"', content)
-    content = re.sub(r'href="blog\.html"', 'href="/blog/"', content)
-    content = re.sub(r'href="work\.html"', 'href="/work/"', content)
-    content = re.sub(r'href="benedict\.html"', 'href="/benedict/"', content)
+    # Convert root HTML files
+    for file in root_files:
+        if os.path.exists(file):
+            add(file, os.path.join(file.replace('.html', ''), 'index.html'), 'root')
 
-    with open(file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f"Updated: {file}")
+    # Update index.html
+    if os.path.exists('index.html'):
+        add('index.html', 'index.html', 'homepage')
+
+    # Posts and benedict pages are one level deeper now
+    # (posts/slug/index.html instead of posts/slug.html)
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for file in sorted(os.listdir(directory)):
+            if file.endswith('.html') and file != 'index.html':
+                add(os.path.join(directory, file),
+                    os.path.join(directory, file.replace('.html', ''), 'index.html'), directory)
+
+    # Update publish forms
+    for file in publish_forms:
+        if os.path.exists(file):
+            add(file, file, 'publish')
+
+    return steps
+
+def stage_step(step, dry_run=False):
+    """Rewrite one file into its staged copy, backing up what the commit will replace.
+
+    Sets step['count'] and step['skip']; in-place updates that change nothing
+    are skipped.
+    """
+    content = read_file(step['source'])
+    new_content, step['count'] = REWRITERS[step['rewriter']].rewrite(content)
+    step['skip'] = step['source'] == step['target'] and new_content == content
+    if dry_run or step['skip']:
+        return step
+
+    for path in {step['source'], step['target']}:
+        if os.path.exists(path):
+            os.makedirs(os.path.dirname(backup_path(path)), exist_ok=True)
+            shutil.copy2(path, backup_path(path))
+
+    write_file(step['source'] + STAGED_SUFFIX, new_content)
+    return step
+
+def stage_all(steps, workers, dry_run=False):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda step: stage_step(step, dry_run), steps))
+
+def save_plan(steps, phase):
+    tmp_path = PLAN_PATH + '.tmp'
+    write_file(tmp_path, json.dumps({'phase': phase, 'steps': steps}, indent=2))
+    os.replace(tmp_path, PLAN_PATH)
+
+def load_journal():
+    with open(PLAN_PATH, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    done = set()
+    if os.path.exists(DONE_PATH):
+        with open(DONE_PATH, 'r', encoding='utf-8') as f:
+            done = {int(line) for line in f if line.strip()}
+    return plan, done
+
+def commit_step(step):
+    """Move a staged file into place; safe to repeat after an interruption"""
+    staged = step['source'] + STAGED_SUFFIX
+    if os.path.exists(staged):
+        os.makedirs(os.path.dirname(step['target']) or '.', exist_ok=True)
+        os.replace(staged, step['target'])
+
+    if step['source'] == step['target']:
+        print(f"Updated: {step['target']} ({step['count']} links)")
+        return
+
+    print(f"Converted: {step['source']} -> {step['target']} ({step['count']} links)")
+    if os.path.exists(step['source']):
+        os.remove(step['source'])
+        print(f"Deleted: {step['source']}")
+
+def commit_all(steps, done=()):
+    with open(DONE_PATH, 'a', encoding='utf-8') as log:
+        for index, step in enumerate(steps):
+            if step['skip'] or index in done:
+                continue
+            commit_step(step)
+            log.write(f'{index}\n')
+            log.flush()
+            os.fsync(log.fileno())
+
+def rollback():
+    """Restore every file the journal touched and discard the journal"""
+    plan, _ = load_journal()
+    restored = 0
+
+    for step in reversed(plan['steps']):
+        source, target = step['source'], step['target']
+        staged = source + STAGED_SUFFIX
+        if os.path.exists(staged):
+            os.remove(staged)
+
+        # Without a backup the step was never staged, so nothing changed
+        if not os.path.exists(backup_path(source)):
+            continue
+
+        if source != target:
+            if os.path.exists(backup_path(target)):
+                shutil.copy2(backup_path(target), target)
+            elif os.path.exists(target):
+                os.remove(target)
+                target_dir = os.path.dirname(target)
+                if target_dir and not os.listdir(target_dir):
+                    os.rmdir(target_dir)
+
+        os.makedirs(os.path.dirname(source) or '.', exist_ok=True)
+        shutil.copy2(backup_path(source), source)
+        restored += 1
+        print(f"Restored: {source}")
+
+    shutil.rmtree(JOURNAL_DIR)
+    print(f'\n✅ Rolled back {restored} files')
+
+def resume(workers):
+    """Finish an interrupted migration from its journal"""
+    plan, done = load_journal()
+    steps = plan['steps']
+
+    if plan['phase'] == 'staging':
+        # Nothing was committed yet, so the sources are still untouched
+        print('Restaging interrupted run...')
+        steps = stage_all(steps, workers)
+        save_plan(steps, 'commit')
+        done = set()
+
+    print(f'Resuming: {len(done)} of {len(steps)} steps already committed')
+    commit_all(steps, done)
+    shutil.rmtree(JOURNAL_DIR)
+
+def migrate(workers, dry_run=False):
+    steps = plan_migration()
+
+    if dry_run:
+        for step in stage_all(steps, workers, dry_run=True):
+            if step['skip']:
+                continue
+            if step['source'] == step['target']:
+                print(f"Would update: {step['target']} ({step['count']} links)")
+            else:
+                print(f"Would convert: {step['source']} -> {step['target']} ({step['count']} links)")
+        return steps
+
+    os.makedirs(JOURNAL_DIR, exist_ok=True)
+    save_plan(steps, 'staging')
+    steps = stage_all(steps, workers)
+    save_plan(steps, 'commit')
+
+    commit_all(steps)
+    shutil.rmtree(JOURNAL_DIR)
+    return steps
+
+def main():
+    parser = argparse.ArgumentParser(description='Move .html pages to directory-style clean URLs')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='report per-file link replacement counts without writing anything')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='threads used to rewrite files (default: CPU count)')
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument('--resume', action='store_true', help='finish an interrupted migration')
+    action.add_argument('--rollback', action='store_true', help='undo an interrupted migration')
+    args = parser.parse_args()
+
+    journal_exists = os.path.exists(PLAN_PATH)
+    if args.resume or args.rollback:
+        if not journal_exists:
+            print(f'✗ No migration journal found in {JOURNAL_DIR}/')
+            sys.exit(1)
+        if args.rollback:
+            rollback()
+        else:
+            resume(args.workers)
+            print('\n✅ Conversion complete!')
+        return
+
+    if journal_exists:
+        print(f'✗ An interrupted migration was found in {JOURNAL_DIR}/; '
+              'run again with --resume or --rollback')
+        sys.exit(1)
+
+    steps = migrate(args.workers, args.dry_run)
+    pending = [step for step in steps if not step['skip']]
+
+    if args.dry_run:
+        print(f'\n✅ Dry run complete: {len(pending)} files would change, no files were written')
+        return
+
+    if not pending:
+        print('✅ Nothing to convert, the tree already uses clean URLs')
+        return
+
+    print('\n✅ Conversion complete!')
+    print('\nNext steps:')
+    print('1. Test the site locally')
+    print('2. Update blog-posts.js, benedict-reviews.js, and work-items.js to use clean URLs')
+    print('3. Commit and push to GitHub')
 
-print('\n✅ Conversion complete!')
-print('\nNext steps:')
-print('1. Test the site locally')
-print('2. Update blog-posts.js, benedict-reviews.js, and work-items.js to use clean URLs')
-print('3. Commit and push to GitHub')
+if __name__ == '__main__':
+    main()
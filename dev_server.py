@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Watch mode and local development server for build.py.
+
+Started by `python3 build.py --watch`. Polls the collection directories and
+index.html for changes, rebuilds only the affected collections, and serves the
+site with ETag/Last-Modified support. HTML pages get a small script that
+listens on an event stream and reloads the page after each rebuild.
+"""
+
+import io
+import os
+import time
+import threading
+from pathlib import Path
+from email.utils import parsedate_to_datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+LIVERELOAD_PATH = '/__livereload'
+
+LIVERELOAD_SCRIPT = (
+    b'<script>new EventSource("' + LIVERELOAD_PATH.encode() + b'")'
+    b'.addEventListener("reload", () => location.reload());</script>\n'
+)
+
+# Rebuilds slower than this are flagged in the log
+TARGET_REBUILD_MS = 200
+
+# Seconds between keep-alive comments on idle event streams
+KEEPALIVE_INTERVAL = 15
+
+class LiveReload:
+    """Generation counter that event-stream clients block on"""
+
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        """Block until the generation moves past generation or timeout expires"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    livereload = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] == LIVERELOAD_PATH:
+            self.stream_events()
+        else:
+            super().do_GET()
+
+    def send_head(self):
+        request_path = self.path.split('?', 1)[0].split('#', 1)[0]
+        path = self.translate_path(self.path)
+
+        if os.path.isdir(path):
+            index_path = os.path.join(path, 'index.html')
+            if not request_path.endswith('/') or not os.path.isfile(index_path):
+                # Redirects and directory listings
+                return super().send_head()
+            path = index_path
+
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        stat = os.stat(path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+        if self.is_not_modified(etag, stat.st_mtime):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return None
+
+        with open(path, 'rb') as f:
+            body = f.read()
+
+        content_type = self.guess_type(path)
+        if content_type == 'text/html':
+            body = inject_livereload(body)
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        return io.BytesIO(body)
+
+    def is_not_modified(self, etag, mtime):
+        if 'If-None-Match' in self.headers:
+            return etag in [tag.strip() for tag in self.headers['If-None-Match'].split(',')]
+
+        if 'If-Modified-Since' in self.headers:
+            try:
+                since = parsedate_to_datetime(self.headers['If-Modified-Since'])
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return since is not None and int(mtime) <= since.timestamp()
+
+        return False
+
+    def stream_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        generation = self.livereload.generation
+        try:
+            while True:
+                current = self.livereload.wait(generation, KEEPALIVE_INTERVAL)
+                if current == generation:
+                    self.wfile.write(b': keepalive\n\n')
+                else:
+                    generation = current
+                    self.wfile.write(b'event: reload\ndata: {}\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def inject_livereload(body):
+    """Insert the live-reload script before the closing </body> tag"""
+    position = body.lower().rfind(b'</body>')
+    if position == -1:
+        return body + LIVERELOAD_SCRIPT
+    return body[:position] + LIVERELOAD_SCRIPT + body[position:]
+
+def start_server(port, livereload, root='.', host='127.0.0.1'):
+    handler = type('Handler', (DevRequestHandler,), {'livereload': livereload})
+
+    def make_handler(*args, **kwargs):
+        return handler(*args, directory=str(root), **kwargs)
+
+    server = ThreadingHTTPServer((host, port), make_handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def snapshot(collections):
+    """Map every watched file to its (mtime, size)"""
+    state = {}
+    for collection in collections:
+        try:
+            entries = list(os.scandir(collection))
+        except OSError:
+            continue
+
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            index_path = f'{collection}/{entry.name}/index.html'
+            try:
+                stat = os.stat(index_path)
+            except OSError:
+                continue
+            state[index_path] = (stat.st_mtime_ns, stat.st_size)
+
+    try:
+        stat = os.stat('index.html')
+        state['index.html'] = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        pass
+
+    return state
+
+def affected_collections(before, after, collections):
+    """Return the collections with added, removed or modified files, in build order.
+
+    The homepage is generated from posts, so an edit to index.html rebuilds posts.
+    """
+    changed = {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+    affected = {'posts' if path == 'index.html' else Path(path).parts[0] for path in changed}
+    return tuple(collection for collection in collections if collection in affected)
+
+def watch_and_serve(rebuild, writer, search_cache=None, collections=('benedict', 'posts', 'books'),
+                    port=8000, interval=0.2, host='127.0.0.1'):
+    """Poll for source changes, rebuild affected collections and serve the site.
+
+    rebuild(collections, search_cache) runs the build and returns the search
+    cache for the next call. The server binds to host, loopback only by
+    default. Runs until interrupted.
+    """
+    livereload = LiveReload()
+    server = start_server(port, livereload, host=host)
+    print(f'👀 Watching {", ".join(collections)} and index.html')
+    print(f'🌐 Serving http://{host}:{port}/ (Ctrl+C to stop)\n')
+
+    state = snapshot(collections)
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot(collections)
+            affected = affected_collections(state, current, collections)
+            if not affected:
+                state = current
+                continue
+
+            start = time.perf_counter()
+            writer.status.clear()
+            try:
+                search_cache = rebuild(affected, search_cache)
+            except Exception as e:
+                print(f'  ✗ Rebuild failed: {e}\n')
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            # Absorb the build's own writes so they don't trigger another rebuild,
+            # without hiding edits made while it ran
+            for path in writer.changed():
+                if path in current:
+                    try:
+                        stat = os.stat(path)
+                        current[path] = (stat.st_mtime_ns, stat.st_size)
+                    except OSError:
+                        current.pop(path, None)
+            state = current
+
+            marker = '🔁' if elapsed_ms <= TARGET_REBUILD_MS else '⚠️'
+            print(f'{marker} Rebuilt {", ".join(affected)} in {elapsed_ms:.0f} ms '
+                  f'({len(writer.changed())} outputs changed)\n')
+            livereload.notify()
+    except KeyboardInterrupt:
+        print('\nStopping...')
+    finally:
+        server.shutdown()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Single-pass href rewriting for the clean-URL migration.
+
+A LinkRewriter compiles every link it knows about into one alternation, so
+a document is scanned once however many links are being rewritten:
+
+    links     exact href values mapped to their replacements
+    sections  directory prefixes whose "<prefix><slug>.html" pages move to
+              "<new prefix><slug>/"
+
+The tables below cover each kind of page convert-to-clean-urls.py touches.
+"""
+
+import re
+
+# Root pages linking to each other by file name
+ROOT_LINKS = {
+    'index.html': '/',
+    'blog.html': '/blog/',
+    'work.html': '/work/',
+    'benedict.html': '/benedict/'
+}
+
+# Pages one directory down that move one level deeper (posts/x.html -> posts/x/index.html)
+NESTED_LINKS = {
+    '../style.css': '../../style.css',
+    '../index.html': '../../',
+    '../blog.html': '../../blog/',
+    '../work.html': '../../work/',
+    '../benedict.html': '../../benedict/'
+}
+
+class LinkRewriter:
+    """Rewrite href="..." attributes from lookup tables in a single pass"""
+
+    def __init__(self, links=None, sections=None):
+        self.links = dict(links or {})
+        self.sections = dict(sections or {})
+
+        alternatives = []
+        if self.links:
+            # Longest first so no link is shadowed by a prefix of itself
+            literals = sorted(self.links, key=len, reverse=True)
+            alternatives.append('(?P<link>' + '|'.join(map(re.escape, literals)) + ')')
+        if self.sections:
+            prefixes = sorted(self.sections, key=len, reverse=True)
+            alternatives.append('(?P<section>' + '|'.join(map(re.escape, prefixes)) + r')(?P<slug>[^"]+)\.html')
+
+        self.pattern = re.compile('href="(?:' + '|'.join(alternatives) + ')"') if alternatives else None
+
+    def _replace(self, match):
+        link = match.group('link') if self.links else None
+        if link is not None:
+            return f'href="{self.links[link]}"'
+        return f'href="{self.sections[match.group("section")]}{match.group("slug")}/"'
+
+    def rewrite(self, content):
+        """Return (new_content, replacement_count)"""
+        if self.pattern is None:
+            return content, 0
+        return self.pattern.subn(self._replace, content)
+
+# One rewriter per kind of page
+ROOT_PAGE_REWRITER = LinkRewriter(
+    {**ROOT_LINKS, 'style.css': '/style.css'},
+    {'posts/': '/posts/', 'benedict/': '/benedict/'}
+)
+HOMEPAGE_REWRITER = LinkRewriter(ROOT_LINKS, {'posts/': '/posts/'})
+PUBLISH_FORM_REWRITER = LinkRewriter(ROOT_LINKS)
+
+SUBDIRECTORY_REWRITERS = {
+    'posts': LinkRewriter(NESTED_LINKS),
+    'benedict': LinkRewriter({**NESTED_LINKS, 'benedict.html': '../../benedict/'}),
+    'work': LinkRewriter({**NESTED_LINKS, 'benedict.html': '../../benedict/'})
+}
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Full-text search index for posts, benedict reviews and book chapters.
+
+build.py feeds documents in and writes the index under search/:
+
+    search/index.json        document table, shard list and tokeniser settings
+    search/terms-<p>.json    postings for every term starting with <p>
+
+A browser only needs index.json plus one shard per query term. Postings are
+flat integer lists per term: for each document, the doc id delta from the
+previous posting, the term count, then that many position deltas.
+
+Query offline with:
+
+    python3 search_index.py "eggs benedict"
+    python3 search_index.py '"parthian shot"' --limit 5
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import argparse
+from pathlib import Path
+
+INDEX_DIR = Path('search')
+INDEX_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+# Positions skipped between paragraphs so phrases never match across them
+PARAGRAPH_GAP = 1
+
+# (suffix, replacement) pairs, tried in order; the first that leaves a stem of
+# at least MIN_STEM characters wins
+STEM_RULES = (
+    ('ational', 'ate'),
+    ('ization', 'ize'),
+    ('fulness', 'ful'),
+    ('ousness', 'ous'),
+    ('iveness', 'ive'),
+    ('ingly', ''),
+    ('edly', ''),
+    ('sses', 'ss'),
+    ('ies', 'y'),
+    ('ing', ''),
+    ('ed', ''),
+    ('ly', ''),
+    ('s', '')
+)
+MIN_STEM = 3
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def stem(word):
+    """Light suffix-stripping stemmer, applied identically to documents and queries"""
+    if len(word) <= MIN_STEM or word.endswith(('ss', 'us', 'is')):
+        return word
+
+    for suffix, replacement in STEM_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            word = word[:-len(suffix)] + replacement
+            if suffix in ('ing', 'ed', 'ingly', 'edly') and len(word) > MIN_STEM \
+                    and word[-1] == word[-2] and word[-1] not in 'lsz':
+                word = word[:-1]
+            return word
+    return word
+
+def tokenize(text):
+    """Split text into lowercase stemmed terms"""
+    return [stem(token.replace("'", '')) for token in TOKEN_PATTERN.findall(text.lower())]
+
+def shard_key(term):
+    first = term[0]
+    return first if first.isascii() and first.isalnum() else '_'
+
+def document_terms(title, paragraphs):
+    """Tokenise a document's title and paragraphs into per-paragraph term lists"""
+    return [terms for terms in (tokenize(text) for text in [title] + list(paragraphs)) if terms]
+
+def build_index(documents):
+    """Build postings from documents.
+
+    documents is a list of dicts with url, title, collection and terms (as
+    returned by document_terms). Returns (docs, postings) where postings maps
+    each term to [(doc_id, [positions]), ...] in doc id order.
+    """
+    docs = []
+    postings = {}
+
+    for doc_id, document in enumerate(documents):
+        position = 0
+        doc_positions = {}
+        for terms in document['terms']:
+            for term in terms:
+                doc_positions.setdefault(term, []).append(position)
+                position += 1
+            position += PARAGRAPH_GAP
+
+        for term, positions in doc_positions.items():
+            postings.setdefault(term, []).append((doc_id, positions))
+
+        docs.append({
+            'url': document['url'],
+            'title': document['title'],
+            'collection': document['collection'],
+            'length': sum(len(terms) for terms in document['terms'])
+        })
+
+    return docs, postings
+
+def encode_postings(term_postings):
+    encoded = []
+    previous_doc = 0
+    for doc_id, positions in term_postings:
+        encoded.append(doc_id - previous_doc)
+        encoded.append(len(positions))
+        previous_position = 0
+        for position in positions:
+            encoded.append(position - previous_position)
+            previous_position = position
+        previous_doc = doc_id
+    return encoded
+
+def decode_postings(encoded):
+    postings = []
+    doc_id = 0
+    i = 0
+    while i < len(encoded):
+        doc_id += encoded[i]
+        count = encoded[i + 1]
+        i += 2
+        positions = []
+        position = 0
+        for delta in encoded[i:i + count]:
+            position += delta
+            positions.append(position)
+        i += count
+        postings.append((doc_id, positions))
+    return postings
+
+def dump_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+def write_index(docs, postings, write, out_dir=INDEX_DIR):
+    """Write index.json and the term shards through write(path, content).
+
+    Returns (shard_count, total_bytes). Stale shards are left for the caller
+    to remove; their names are listed in index.json.
+    """
+    shards = {}
+    for term in sorted(postings):
+        shards.setdefault(shard_key(term), {})[term] = encode_postings(postings[term])
+
+    total_bytes = 0
+    for key, terms in shards.items():
+        content = dump_json(terms)
+        write(Path(out_dir) / f'terms-{key}.json', content)
+        total_bytes += len(content.encode('utf-8'))
+
+    index = {
+        'version': INDEX_VERSION,
+        'paragraphGap': PARAGRAPH_GAP,
+        'avgLength': sum(doc['length'] for doc in docs) / len(docs) if docs else 0,
+        'shards': sorted(shards),
+        'docs': docs
+    }
+    content = dump_json(index)
+    write(Path(out_dir) / 'index.json', content)
+    total_bytes += len(content.encode('utf-8'))
+
+    return len(shards), total_bytes
+
+class SearchIndex:
+    """Query API over a written index, loading term shards on demand"""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        with open(self.index_dir / 'index.json', 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.docs = index['docs']
+        self.avg_length = index['avgLength'] or 1
+        self.shard_names = set(index['shards'])
+        self.shards = {}
+
+    def postings(self, term):
+        key = shard_key(term)
+        if key not in self.shard_names:
+            return []
+        if key not in self.shards:
+            with open(self.index_dir / f'terms-{key}.json', 'r', encoding='utf-8') as f:
+                self.shards[key] = json.load(f)
+        encoded = self.shards[key].get(term)
+        return decode_postings(encoded) if encoded else []
+
+    def search(self, query, limit=10):
+        """Return up to limit (score, doc) pairs matching every term and phrase.
+
+        Quoted parts of the query are phrases whose terms must appear at
+        consecutive positions. Results are ranked by BM25.
+        """
+        phrases = [tokenize(phrase) for phrase in re.findall(r'"([^"]*)"', query)]
+        phrases = [phrase for phrase in phrases if phrase]
+        terms = tokenize(re.sub(r'"[^"]*"', ' ', query))
+        for phrase in phrases:
+            terms.extend(phrase)
+        terms = list(dict.fromkeys(terms))
+        if not terms:
+            return []
+
+        term_postings = {term: dict(self.postings(term)) for term in terms}
+        candidates = set.intersection(*(set(docs) for docs in term_postings.values()))
+
+        for phrase in phrases:
+            candidates = {doc_id for doc_id in candidates
+                          if self._has_phrase(phrase, term_postings, doc_id)}
+
+        results = []
+        for doc_id in candidates:
+            doc = self.docs[doc_id]
+            score = 0.0
+            for term, docs_with_term in term_postings.items():
+                df = len(docs_with_term)
+                tf = len(docs_with_term[doc_id])
+                idf = math.log(1 + (len(self.docs) - df + 0.5) / (df + 0.5))
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc['length'] / self.avg_length)
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            results.append((score, doc))
+
+        results.sort(key=lambda result: (-result[0], result[1]['url']))
+        return results[:limit]
+
+    @staticmethod
+    def _has_phrase(phrase, term_postings, doc_id):
+        starts = set(term_postings[phrase[0]][doc_id])
+        for offset, term in enumerate(phrase[1:], start=1):
+            positions = set(term_postings[term][doc_id])
+            starts = {start for start in starts if start + offset in positions}
+            if not starts:
+                return False
+        return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the built search index')
+    parser.add_argument('query')
+    parser.add_argument('--index-dir', default=str(INDEX_DIR))
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = SearchIndex(args.index_dir)
+    loaded = time.perf_counter()
+    results = index.search(args.query, args.limit)
+    searched = time.perf_counter()
+
+    for score, doc in results:
+        print(f'{score:7.3f}  {doc["title"]}  {doc["url"]}')
+    if not results:
+        print('No matches')
+    print(f'\nload {1000 * (loaded - start):.1f} ms, '
+          f'query {1000 * (searched - loaded):.1f} ms, '
+          f'{len(index.shards)} shards read')
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,148 +1,203 @@
 #!/usr/bin/env python3
-"""Update all blog posts with navigation arrows and clickable titles"""
+"""Update all blog posts with navigation arrows and clickable titles.
+
+Each post is scanned once into a PostNav model (title, time element and
+prev/next slugs), read either from a legacy <nav class="post-nav"> block or
+from arrows a previous run already rendered. The header arrows and bottom
+nav are then rendered from the model, so posts already in the target shape
+come out unchanged and are not rewritten.
+
+Usage: python3 update_blog_nav.py [--root DIR] [-j WORKERS]
+"""
 
 import os
 import re
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# Header and legacy post-nav in one alternation, so each post is scanned once
+STRUCTURE_PATTERN = re.compile(
+    r'(?P<header><header class="post-header">(?P<header_body>.+?)</header>)'
+    r'|(?P<nav>\s*<nav class="post-nav">\s*(?P<nav_body>.+?)\s*</nav>)',
+    re.DOTALL
+)
+TITLE_PATTERN = re.compile(r'<h1>(?:<a[^>]*>)?(.+?)(?:</a>)?</h1>')
+TIME_PATTERN = re.compile(r'<time[^>]*>.*?</time>')
+LEGACY_PREV_PATTERN = re.compile(r'<a href="\.\./([^"]+)/">←')
+LEGACY_NEXT_PATTERN = re.compile(r'<a href="\.\./([^"]+)/">[^<]*→</a>')
+ARROW_PATTERN = re.compile(r'<a href="\.\./([^"]+)/" class="nav-arrow">(→|←)</a>')
+
+# A bottom nav rendered by an earlier run, exactly as render_bottom_nav() emits it
+BOTTOM_NAV_PATTERN = re.compile(r'\n {16}<div class="bottom-nav">.*?</div>\n {12}(?=</div>\s*</article>)', re.DOTALL)
+ARTICLE_END_PATTERN = re.compile(r'(</div>\s*</article>)')
+
+# Below this many posts a worker pool costs more than it saves
+MIN_POOL_FILES = 8
+
+class PostNav:
+    """Header and navigation structure of one post"""
+    __slots__ = ('title', 'time_elem', 'prev_link', 'next_link', 'header_span', 'nav_spans')
+
+    def __init__(self, title, time_elem, prev_link, next_link, header_span, nav_spans):
+        self.title = title
+        self.time_elem = time_elem
+        self.prev_link = prev_link
+        self.next_link = next_link
+        self.header_span = header_span
+        self.nav_spans = nav_spans
+
+def parse_post(content):
+    """Parse a post into a PostNav, or return an error message"""
+    header = None
+    nav_spans = []
+    legacy_nav = None
+
+    for match in STRUCTURE_PATTERN.finditer(content):
+        if match.group('header') is not None:
+            if header is None:
+                header = match
+        else:
+            nav_spans.append(match.span())
+            if legacy_nav is None:
+                legacy_nav = match.group('nav_body')
 
-def update_blog_post(file_path):
-    """Update a single blog post with new navigation structure"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Extract the current title from post-header section
-    header_section = re.search(r'<header class="post-header">(.+?)</header>', content, re.DOTALL)
-    if not header_section:
-        print(f"Warning: Could not find post-header in {file_path}")
-        return False
+    if header is None:
+        return 'Could not find post-header'
 
-    title_match = re.search(r'<h1>(?:<a[^>]*>)?(.+?)(?:</a>)?</h1>', header_section.group(1))
+    header_body = header.group('header_body')
+    title_match = TITLE_PATTERN.search(header_body)
     if not title_match:
-        print(f"Warning: Could not find title in post-header in {file_path}")
-        return False
-
-    title = title_match.group(1)
+        return 'Could not find title in post-header'
 
-    # Find the post-nav section to get prev/next links
-    nav_match = re.search(r'<nav class="post-nav">\s*(.+?)\s*</nav>', content, re.DOTALL)
+    time_match = TIME_PATTERN.search(header_body)
 
     prev_link = None
     next_link = None
-
-    if nav_match:
-        nav_content = nav_match.group(1)
-        # Find previous link (← at start) - extract just the folder name
-        prev_match = re.search(r'<a href="\.\./([^"]+)/">←', nav_content)
-        if prev_match:
-            prev_link = prev_match.group(1)
-            print(f"  Found prev: {prev_link}")
-
-        # Find next link (→ at end) - extract just the folder name
-        next_match = re.search(r'<a href="\.\./([^"]+)/">[^<]*→</a>', nav_content)
-        if next_match:
-            next_link = next_match.group(1)
-            print(f"  Found next: {next_link}")
-    else:
-        print(f"  No nav-match found in {file_path}")
-
-    # Build navigation arrows HTML
-    arrows_html = '<div class="nav-arrows">\n                    '
-
-    if next_link:
-        arrows_html += f'<a href="../{next_link}/" class="nav-arrow">→</a>\n                    '
-    else:
-        arrows_html += '<a href="#" class="nav-arrow disabled">→</a>\n                    '
-
-    if prev_link:
-        arrows_html += f'<a href="../{prev_link}/" class="nav-arrow">←</a>\n                '
+    if legacy_nav is not None:
+        prev_match = LEGACY_PREV_PATTERN.search(legacy_nav)
+        next_match = LEGACY_NEXT_PATTERN.search(legacy_nav)
+        prev_link = prev_match.group(1) if prev_match else None
+        next_link = next_match.group(1) if next_match else None
     else:
-        arrows_html += '<a href="#" class="nav-arrow disabled">←</a>\n                '
-
-    arrows_html += '</div>'
-
-    # Update the header section
-    old_header = re.search(
-        r'<header class="post-header">(.+?)</header>',
-        content,
-        re.DOTALL
-    )
-
-    if not old_header:
-        print(f"Warning: Could not find post-header in {file_path}")
-        return False
-
-    # Extract time element
-    time_match = re.search(r'<time[^>]*>.*?</time>', old_header.group(1))
-    time_elem = time_match.group(0) if time_match else ''
-
-    new_header = f'''<header class="post-header">
+        # Already converted: keep the arrows the header carries
+        for slug, arrow in ARROW_PATTERN.findall(header_body):
+            if arrow == '←':
+                prev_link = prev_link or slug
+            else:
+                next_link = next_link or slug
+
+    return PostNav(title_match.group(1), time_match.group(0) if time_match else '',
+                   prev_link, next_link, header.span(), nav_spans)
+
+def arrow(link, symbol):
+    if link:
+        return f'<a href="../{link}/" class="nav-arrow">{symbol}</a>'
+    return f'<a href="#" class="nav-arrow disabled">{symbol}</a>'
+
+def render_header(nav):
+    return f'''<header class="post-header">
                 <div>
-                    <h1><a href="../../blog/">{title}</a></h1>
-                    {time_elem}
+                    <h1><a href="../../blog/">{nav.title}</a></h1>
+                    {nav.time_elem}
+                </div>
+                <div class="nav-arrows">
+                    {arrow(nav.next_link, '→')}
+                    {arrow(nav.prev_link, '←')}
                 </div>
-                {arrows_html}
             </header>'''
 
-    # Build bottom navigation HTML (same arrows but horizontal)
-    bottom_nav_html = '\n                <div class="bottom-nav">\n                    '
+def render_bottom_nav(nav):
+    """Bottom navigation: the same arrows, laid out horizontally"""
+    return f'''
+                <div class="bottom-nav">
+                    {arrow(nav.prev_link, '←')}
+                    {arrow(nav.next_link, '→')}
+                </div>'''
+
+def render_post(content, nav):
+    """Return content with the header and bottom nav rendered from nav"""
+    # Splice the header in and drop legacy post-nav blocks, back to front
+    edits = sorted([(nav.header_span, render_header(nav))] + [(span, '') for span in nav.nav_spans],
+                   reverse=True)
+    for (start, end), replacement in edits:
+        content = content[:start] + replacement + content[end:]
+
+    # Re-render any bottom nav from an earlier run rather than stacking another
+    content = BOTTOM_NAV_PATTERN.sub('', content)
 
-    if prev_link:
-        bottom_nav_html += f'<a href="../{prev_link}/" class="nav-arrow">←</a>\n                    '
-    else:
-        bottom_nav_html += '<a href="#" class="nav-arrow disabled">←</a>\n                    '
+    # Add bottom navigation before the closing </div> of post-content
+    bottom_nav = render_bottom_nav(nav).replace('\\', r'\\')
+    return ARTICLE_END_PATTERN.sub(bottom_nav + r'\n            \1', content)
 
-    if next_link:
-        bottom_nav_html += f'<a href="../{next_link}/" class="nav-arrow">→</a>\n                '
-    else:
-        bottom_nav_html += '<a href="#" class="nav-arrow disabled">→</a>\n                '
+def write_if_changed(file_path, content, new_content):
+    """Atomically replace file_path if new_content differs; return whether it was written"""
+    if new_content == content:
+        return False
+    tmp_path = file_path.with_name(f'.{file_path.name}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(new_content)
+    os.replace(tmp_path, file_path)
+    return True
 
-    bottom_nav_html += '</div>'
+def update_blog_post(file_path):
+    """Update a single blog post; return (status, messages).
 
-    # Replace the old header with the new one
-    content = content.replace(old_header.group(0), new_header)
+    status is 'updated', 'unchanged' or 'failed'.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
 
-    # Remove the old post-nav section at the bottom
-    content = re.sub(r'\s*<nav class="post-nav">.*?</nav>', '', content, flags=re.DOTALL)
+    nav = parse_post(content)
+    if isinstance(nav, str):
+        return 'failed', [f'Warning: {nav} in {file_path}']
 
-    # Add bottom navigation before the closing </div> of post-content
-    content = re.sub(
-        r'(</div>\s*</article>)',
-        bottom_nav_html + r'\n            \1',
-        content
-    )
+    messages = []
+    if nav.prev_link:
+        messages.append(f'  Found prev: {nav.prev_link}')
+    if nav.next_link:
+        messages.append(f'  Found next: {nav.next_link}')
 
-    # Write the updated content
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    if write_if_changed(file_path, content, render_post(content, nav)):
+        return 'updated', messages
+    return 'unchanged', messages
 
-    return True
+def post_files(root):
+    posts_dir = Path(root) / 'posts'
+    return [post_dir / 'index.html' for post_dir in sorted(posts_dir.iterdir())
+            if post_dir.is_dir() and (post_dir / 'index.html').exists()]
 
 def main():
     """Update all blog posts"""
-    posts_dir = Path('/Users/joeldelaney/project-nightbeans/posts')
-
+    parser = argparse.ArgumentParser(description='Add navigation arrows and clickable titles to blog posts')
+    parser.add_argument('--root', default=Path(__file__).resolve().parent, type=Path,
+                        help='site root containing posts/ (default: this script\'s directory)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    posts_dir = args.root / 'posts'
     if not posts_dir.exists():
         print(f"Error: Posts directory not found: {posts_dir}")
         return
 
-    updated_count = 0
-    failed_count = 0
-
-    for post_dir in sorted(posts_dir.iterdir()):
-        if not post_dir.is_dir():
-            continue
-
-        index_file = post_dir / 'index.html'
-        if not index_file.exists():
-            continue
-
-        print(f"Updating {post_dir.name}...")
-        if update_blog_post(index_file):
-            updated_count += 1
-        else:
-            failed_count += 1
-
-    print(f"\nComplete! Updated {updated_count} posts, {failed_count} failed")
+    files = post_files(args.root)
+    if args.workers > 1 and len(files) >= MIN_POOL_FILES:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(update_blog_post, files, chunksize=8))
+    else:
+        results = [update_blog_post(file_path) for file_path in files]
+
+    counts = {'updated': 0, 'unchanged': 0, 'failed': 0}
+    for file_path, (status, messages) in zip(files, results):
+        counts[status] += 1
+        if status != 'unchanged':
+            print(f"Updating {file_path.parent.name}...")
+            for message in messages:
+                print(message)
+
+    print(f"\nComplete! Updated {counts['updated']} posts, "
+          f"{counts['unchanged']} already up to date, {counts['failed']} failed")
 
 if __name__ == '__main__':
     main()
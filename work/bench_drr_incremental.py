@@ -0,0 +1,100 @@
+"""Compare the incremental DRR metrics update with a full recompute.
+
+Builds a synthetic history (300 hubs x 365 days by default, with rows
+missing at random and some zero-availability and zero-rental days), feeds
+all but the last few days to IncrementalMetrics, then ingests the rest one
+day at a time and checks the summary against a full DRREngine recompute
+after each. Then times one day's update against recomputing everything
+from a binary store and from drr_data.json rows.
+
+    python3 work/bench_drr_incremental.py [--hubs 300] [--days 365] [--check-days 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_drr_store import best_of
+from check_drr_engine import synthetic_rows
+from drr_engine import DRREngine, drr_metrics, metrics_document
+from drr_incremental import IncrementalMetrics, verify
+from drr_store import DRRColumns, save_binary
+
+
+def messy_rows(hubs: int, days: int) -> list[dict]:
+    rng = random.Random(11)
+    rows = [r for r in synthetic_rows(hubs, days) if rng.random() > 0.05]
+    for r in rows:
+        if rng.random() < 0.02:
+            r["av"] = 0
+        if rng.random() < 0.02:
+            r["r24"] = r["rt"] = 0
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark incremental DRR metrics")
+    parser.add_argument("--hubs", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--check-days", type=int, default=5, help="days ingested one at a time and verified")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = messy_rows(args.hubs, args.days)
+    dates = sorted({r["date"] for r in rows})
+    # Start the trial part-way through so both windows are exercised
+    trial_start = dates[len(dates) // 3]
+    split = dates[-args.check_days]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = Path(tmp) / "drr_data.json"
+
+        def publish(upto: str) -> None:
+            data.write_text(json.dumps({"rows": [r for r in rows if r["date"] <= upto]}))
+
+        metrics = IncrementalMetrics(trial_start)
+        metrics.ingest([r for r in rows if r["date"] < split])
+        failures = 0
+        for day in dates[-args.check_days:]:
+            metrics.ingest([r for r in rows if r["date"] == day])
+            publish(day)
+            problems = verify(metrics, data)
+            failures += len(problems)
+            for problem in problems[:5]:
+                print(f"  ✗ {day}: {problem}")
+        if failures:
+            print(f"\n✗ {failures} differences from a full recompute")
+            sys.exit(1)
+        print(f"✓ {len(rows):,} rows ({args.hubs} hubs x {args.days} days): incremental metrics match "
+              f"a full recompute after each of the last {args.check_days} days\n")
+
+        store_dir = Path(tmp) / "drr_data.cols"
+        save_binary(DRRColumns.from_rows(rows), store_dir)
+        last_day = [r for r in rows if r["date"] == dates[-1]]
+        before = IncrementalMetrics(trial_start)
+        before.ingest([r for r in rows if r["date"] < dates[-1]])
+        state = Path(tmp) / "state.json"
+        before.save(state)
+
+        def incremental() -> None:
+            metrics = IncrementalMetrics.load(state)
+            metrics.ingest(last_day)
+            metrics_document(metrics.summary(), "bench")
+
+        full_rows = best_of(args.repeat, lambda: drr_metrics(DRREngine.from_file(data), trial_start, "bench"))
+        full_binary = best_of(args.repeat, lambda: drr_metrics(DRREngine.from_file(store_dir), trial_start, "bench"))
+        update = best_of(args.repeat, incremental)
+
+        print(f"  full recompute from drr_data.json rows:  {full_rows * 1000:8.1f} ms")
+        print(f"  full recompute from a binary store:      {full_binary * 1000:8.1f} ms")
+        print(f"  incremental day (load state + ingest):   {update * 1000:8.1f} ms  ({len(last_day)} rows)")
+
+
+if __name__ == "__main__":
+    main()
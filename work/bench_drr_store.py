@@ -0,0 +1,115 @@
+"""Time loading and appending DRR data in each storage format.
+
+Builds a synthetic drr_data.json (300 hubs x 365 days by default), converts
+it to columnar JSON and to a binary store, checks all three expand to the
+same rows, then times for each format:
+
+- parse: reading the file into rows or columns
+- engine: DRREngine.from_file, i.e. parse plus the hub x date arrays
+- append: adding one more day for every hub
+
+    python3 work/bench_drr_store.py [--hubs 300] [--days 365] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from check_drr_engine import synthetic_rows
+from drr_engine import DRREngine
+from drr_store import DRRColumns, append_binary, append_json, load, save_binary, save_json
+
+
+def best_of(repeat: int, fn, setup=None) -> float:
+    """Fastest of `repeat` runs of fn(), in seconds; setup() runs untimed before each."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.iterdir())
+    return path.stat().st_size
+
+
+def append_rows_file(path: Path, rows: list[dict]) -> None:
+    """What appending means for drr_data.json today: parse it all, write it all."""
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    document["rows"].extend(rows)
+    path.write_text(json.dumps(document, separators=(",", ":")))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark drr_data storage formats")
+    parser.add_argument("--hubs", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.hubs, args.days)
+    last = max(r["date"] for r in rows)
+    next_day = (date.fromisoformat(last) + timedelta(days=1)).isoformat()
+    new_rows = [dict(r, date=next_day) for r in rows if r["date"] == last]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        paths = {
+            "rows JSON": tmp / "drr_data.json",
+            "columnar JSON": tmp / "drr_data.columns.json",
+            "binary (mmap)": tmp / "drr_data.cols",
+        }
+        document = {"generated_at": "bench", "rows": rows}
+        store = DRRColumns.from_rows(rows, "bench")
+
+        def reset() -> None:
+            paths["rows JSON"].write_text(json.dumps(document, separators=(",", ":")))
+            save_json(store, paths["columnar JSON"])
+            save_binary(store, paths["binary (mmap)"])
+
+        reset()
+        for name, path in paths.items():
+            if load(path).to_rows() != rows:
+                print(f"✗ {name}: rows differ after conversion")
+                sys.exit(1)
+        print(f"✓ {len(rows):,} rows ({args.hubs} hubs x {args.days} days) identical in all formats\n")
+
+        def parse_rows() -> None:
+            with open(paths["rows JSON"], encoding="utf-8") as f:
+                json.load(f)
+
+        appenders = {
+            "rows JSON": lambda: append_rows_file(paths["rows JSON"], new_rows),
+            "columnar JSON": lambda: append_json(paths["columnar JSON"], new_rows),
+            "binary (mmap)": lambda: append_binary(paths["binary (mmap)"], new_rows),
+        }
+        parsers = {
+            "rows JSON": parse_rows,
+            "columnar JSON": lambda: load(paths["columnar JSON"]),
+            "binary (mmap)": lambda: load(paths["binary (mmap)"]),
+        }
+
+        print(f"  {'format':14} {'size':>10} {'parse':>10} {'engine':>10} {'append day':>11}")
+        for name, path in paths.items():
+            nbytes = size(path)
+            parse = best_of(args.repeat, parsers[name])
+            engine = best_of(args.repeat, lambda: DRREngine.from_file(path))
+            append = best_of(args.repeat, appenders[name], setup=reset)
+            print(f"  {name:14} {nbytes / 1024:8.0f}KB {parse * 1000:8.1f}ms {engine * 1000:8.1f}ms "
+                  f"{append * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
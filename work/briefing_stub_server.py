@@ -0,0 +1,146 @@
+"""Local stand-in for the Messages API, for exercising generate_briefing.py end to end.
+
+Answers POST /v1/messages with a minimal object that satisfies the request's
+json_schema output format, after an optional delay. Every Nth request can be
+failed with a 529 overloaded error, or answered with stop_reason max_tokens,
+so the retry path gets exercised too. Prints the peak number of concurrent
+requests on exit.
+
+    python3 briefing_stub_server.py --port 8765 --latency 0.2 --fail-every 5 &
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=stub \\
+        python3 generate_briefing.py data.json --per-region --no-cache
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+def sample(schema: dict) -> Any:
+    """Smallest value that satisfies the subset of JSON Schema BRIEFING_SCHEMA uses."""
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "anyOf" in schema:
+        return sample(schema["anyOf"][0])
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: sample(schema["properties"][key]) for key in schema.get("required", [])}
+    if kind == "array":
+        return [sample(schema["items"])]
+    if kind == "number":
+        return 0.0
+    if kind == "null":
+        return None
+    return "stub"
+
+
+class StubState:
+    def __init__(self, latency: float, fail_every: int, truncate_every: int) -> None:
+        self.latency = latency
+        self.fail_every = fail_every
+        self.truncate_every = truncate_every
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def enter(self) -> int:
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return self.requests
+
+    def leave(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state: StubState
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        if self.path.split("?", 1)[0] != "/v1/messages":
+            self.send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        number = self.state.enter()
+        try:
+            time.sleep(self.state.latency)
+            if self.state.fail_every and number % self.state.fail_every == 0:
+                self.send_json(529, {"type": "error", "error": {"type": "overloaded_error", "message": "stub"}})
+                return
+
+            schema = request.get("output_config", {}).get("format", {}).get("schema", {})
+            truncated = self.state.truncate_every and number % self.state.truncate_every == 0
+            text = json.dumps(sample(schema))
+            self.send_json(200, {
+                "id": f"msg_stub_{number}",
+                "type": "message",
+                "role": "assistant",
+                "model": request.get("model"),
+                "content": [{"type": "text", "text": text[:len(text) // 2] if truncated else text}],
+                "stop_reason": "max_tokens" if truncated else "end_turn",
+                "stop_sequence": None,
+                "usage": {
+                    "input_tokens": len(json.dumps(request)) // 4,
+                    "output_tokens": len(text) // 4,
+                    "cache_read_input_tokens": 0,
+                    "cache_creation_input_tokens": 0,
+                },
+            })
+        finally:
+            self.state.leave()
+
+    def send_json(self, status: int, body: dict) -> None:
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+def start_stub_server(port: int = 0, *, latency: float = 0.0, fail_every: int = 0,
+                      truncate_every: int = 0) -> tuple[ThreadingHTTPServer, StubState]:
+    """Serve the stub on a background thread; port 0 picks a free port."""
+    state = StubState(latency, fail_every, truncate_every)
+    handler = type("Handler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stub of the Messages API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with a 529")
+    parser.add_argument("--truncate-every", type=int, default=0,
+                        help="answer every Nth request with stop_reason max_tokens")
+    args = parser.parse_args()
+
+    server, state = start_stub_server(args.port, latency=args.latency, fail_every=args.fail_every,
+                                      truncate_every=args.truncate_every)
+    print(f"[stub] serving http://127.0.0.1:{server.server_port}/v1/messages (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"[stub] {state.requests} requests, peak {state.peak_in_flight} in flight")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""On-disk JSON cache and file helpers shared by the work/ scripts.
+
+generate_briefing.py caches briefings and run_queries.py caches query
+results with DiskCache, each under its own directory and entry name; both
+write their outputs with write_json_atomic and report through log.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, TextIO
+
+_log_lock = threading.Lock()
+
+
+def log(message: str, stream: TextIO = sys.stdout) -> None:
+    """Print one whole line, so concurrent workers don't interleave output."""
+    with _log_lock:
+        stream.write(message + "\n")
+        stream.flush()
+
+
+def write_json_atomic(path: Path, data: dict) -> None:
+    """Write `data` to `path` via a temp file, so readers never see a partial file."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(data, indent=2) + "\n")
+    os.replace(tmp_path, path)
+
+
+class DiskCache:
+    """On-disk cache of JSON values, one file per key.
+
+    Entries older than `ttl` seconds are treated as misses and removed. After
+    each store the least recently used entries are evicted until the cache
+    fits in `max_bytes`. A hit refreshes the entry's mtime, which is what
+    recency is measured by. Each entry stores its value under ENTRY, which
+    subclasses name after what they cache.
+    """
+
+    ENTRY = "value"
+
+    def __init__(self, directory: Path, *, ttl: float, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Any:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if time.time() - entry.get("stored_at", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        os.utime(path)
+        self.hits += 1
+        return entry[self.ENTRY]
+
+    def put(self, key: str, value: Any) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps({"stored_at": time.time(), self.ENTRY: value}), encoding="utf-8")
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = 0
+        live = []
+        for mtime, size, path in entries:
+            # mtime only moves forward on hits, so it bounds stored_at from above
+            if now - mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                self.evictions += 1
+            else:
+                live.append((mtime, size, path))
+                total += size
+
+        for mtime, size, path in sorted(live):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self.evictions += 1
+            total -= size
+
+    def stats(self) -> str:
+        return f"hits={self.hits} misses={self.misses} evictions={self.evictions}"
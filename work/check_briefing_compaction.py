@@ -0,0 +1,97 @@
+"""Pin compact_payload's token-budget trimming on the real scoreboard data.
+
+Pads the payload until its compact encoding is exactly token_budget *
+CHARS_PER_TOKEN characters long, the boundary where estimate_tokens() is one
+over budget while the character excess is zero, then sweeps every budget
+from nearly nothing up to the untrimmed size. Each compaction runs in a
+child process so a budget that never converges fails instead of hanging.
+Every result must fit its budget unless no droppable rows are left.
+
+    python3 work/check_briefing_compaction.py [--timeout 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import sys
+from pathlib import Path
+
+from generate_briefing import CHARS_PER_TOKEN, compact_payload, estimate_tokens
+
+DATA_PATH = Path(__file__).resolve().parent / "mopo_scoreboard_data.json"
+
+
+def boundary_payload(payload: dict) -> tuple[dict, int]:
+    """Pad window_start until the compact text sits exactly on a budget."""
+    payload = dict(payload)
+    start = str(payload.get("window_start", ""))
+    for pad in range(int(CHARS_PER_TOKEN * 2) + 1):
+        payload["window_start"] = start + " " * pad
+        text, _ = compact_payload(payload)
+        budget = len(text) / CHARS_PER_TOKEN
+        if budget == int(budget):
+            return payload, int(budget)
+    raise AssertionError("no padding puts the payload on a token boundary")
+
+
+def _compact(payload: dict, budget: int, results) -> None:
+    results.put(compact_payload(payload, budget))
+
+
+def check(payload: dict, budget: int, timeout: float) -> str | None:
+    """None when compaction finishes within budget or runs out of rows to drop."""
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_compact, args=(payload, budget, results))
+    process.start()
+    process.join(timeout)
+    if process.is_alive():
+        process.kill()
+        return f"did not finish in {timeout:g}s"
+    text, report = results.get()
+
+    droppable = {
+        "flagged_agents": len(payload.get("flagged_agents", [])),
+        "new_agents": len(payload.get("new_agents", {}).get("by_region", [])),
+    }
+    if estimate_tokens(text) > budget and report["omitted"] != {k: n for k, n in droppable.items() if n}:
+        return f"{estimate_tokens(text)} tokens with {report['omitted']} omitted"
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check compact_payload against token budgets")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    payload = json.loads(DATA_PATH.read_text())
+    payload.pop("briefing", None)
+    failures = 0
+
+    padded, budget = boundary_payload(payload)
+    text, _ = compact_payload(padded)
+    print(f"Exact boundary ({len(text)} chars, budget {budget}, estimate {estimate_tokens(text)}):")
+    problem = check(padded, budget, args.timeout)
+    print(f"  {'✗ ' + problem if problem else '✓ trimmed to fit'}")
+    failures += bool(problem)
+
+    full = estimate_tokens(compact_payload(payload)[0])
+    print(f"\nEvery budget from 1 to {full}:")
+    bad = []
+    for budget in range(1, full + 1):
+        problem = check(payload, budget, args.timeout)
+        if problem:
+            bad.append(budget)
+            print(f"  ✗ budget {budget}: {problem}")
+    if not bad:
+        print(f"  ✓ all {full} budgets trimmed to fit")
+    failures += len(bad)
+
+    if failures:
+        print(f"\n✗ {failures} failures")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
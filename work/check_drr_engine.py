@@ -0,0 +1,177 @@
+"""Pin drr_engine against the per-hub loops the DRR email workflow used to run.
+
+The legacy loop below is the workflow's original computation, kept verbatim
+apart from returning its values instead of rendering HTML. Both are run over
+work/drr_data.json and over variants with missing rows, zero-rental days and
+a hub absent on t-2; every value must match (floats to 1e-9, rounded display
+values exactly). Also times both on a synthetic 200-hub, 2-year dataset.
+
+    python3 work/check_drr_engine.py
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import math
+import random
+import sys
+import time
+
+from drr_engine import BASELINE_600, BASELINE_800, DATA_PATH, HUB_ORDER, TRIAL_START, DRREngine, email_rows
+
+
+def legacy_email_rows(rows: list[dict], hub_order: list[str] = HUB_ORDER) -> tuple[str, int, list[dict]]:
+    by_hub = {}
+    for r in rows:
+        by_hub.setdefault(r['hub_name'], []).append(r)
+
+    all_dates = sorted(set(r['date'] for r in rows))
+    t2_date = all_dates[-2] if len(all_dates) >= 2 else all_dates[-1]
+    trial_dates = [d for d in all_dates if d >= TRIAL_START and d <= t2_date]
+    trial_days = len(trial_dates)
+
+    def drr(r): return r['inc'] / r['av']
+    def avg(lst): return sum(lst)/len(lst) if lst else None
+
+    out = []
+    for hub in hub_order:
+        hub_rows = sorted(by_hub.get(hub, []), key=lambda r: r['date'])
+        if not hub_rows: continue
+        b600 = BASELINE_600.get(hub, 0)
+        b800 = BASELINE_800.get(hub, 0)
+
+        t2_rows = [r for r in hub_rows if r['date'] == t2_date]
+        if not t2_rows: continue
+        t2_row = t2_rows[0]
+
+        trial = [r for r in hub_rows if r['date'] >= TRIAL_START and r['date'] <= t2_date]
+
+        t2_drr_val = drr(t2_row)
+        trial_avg = avg([drr(r) for r in trial])
+        d600 = (trial_avg - b600) / b600 * 100 if trial_avg else None
+        d800 = (trial_avg - b800) / b800 * 100 if trial_avg else None
+        sh = round(t2_row['r24'] / t2_row['rt'] * 100) if t2_row['rt'] else None
+
+        out.append({'hub': hub, 't2_drr': t2_drr_val, 'trial_avg': trial_avg, 'd600': d600, 'd800': d800,
+                    'b600': b600, 'b800': b800, 'share': sh})
+    return t2_date, trial_days, out
+
+
+def same(a: object, b: object) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def display(row: dict) -> tuple:
+    """The rounded values the email actually shows."""
+    return (
+        round(row['t2_drr']),
+        round(row['trial_avg']) if row['trial_avg'] else '-',
+        None if row['d600'] is None else round(row['d600']),
+        None if row['d800'] is None else round(row['d800']),
+        row['share'],
+    )
+
+
+def compare(name: str, rows: list[dict]) -> int:
+    expected = legacy_email_rows(rows)
+    actual = email_rows(DRREngine.from_rows(rows))
+    failures = 0
+    if expected[:2] != actual[:2]:
+        print(f"  ✗ {name}: (t2_date, trial_days) {expected[:2]} != {actual[:2]}")
+        failures += 1
+    if [r['hub'] for r in expected[2]] != [r['hub'] for r in actual[2]]:
+        print(f"  ✗ {name}: hubs differ")
+        return failures + 1
+    for exp, act in zip(expected[2], actual[2]):
+        for key in exp:
+            if not same(exp[key], act[key]):
+                print(f"  ✗ {name}: {exp['hub']} {key} {exp[key]!r} != {act[key]!r}")
+                failures += 1
+        if display(exp) != display(act):
+            print(f"  ✗ {name}: {exp['hub']} display {display(exp)} != {display(act)}")
+            failures += 1
+    if not failures:
+        print(f"  ✓ {name}: {len(actual[2])} hubs identical (t-2 {actual[0]}, trial day {actual[1]})")
+    return failures
+
+
+def variants(rows: list[dict]) -> dict[str, list[dict]]:
+    rng = random.Random(7)
+    dates = sorted({r['date'] for r in rows})
+    t2 = dates[-2]
+
+    sparse = [r for r in rows if rng.random() > 0.2 or r['date'] == t2]
+    zero_rentals = copy.deepcopy(rows)
+    for r in zero_rentals:
+        if rng.random() < 0.1 or (r['date'] == t2 and r['hub_name'] == HUB_ORDER[0]):
+            r['r24'] = r['rt'] = r['r6'] = r['r12'] = 0
+    absent_hub = [r for r in rows if not (r['hub_name'] == HUB_ORDER[1] and r['date'] == t2)]
+    shuffled = rows[:]
+    rng.shuffle(shuffled)
+    return {
+        'drr_data.json': rows,
+        'random rows missing': sparse,
+        'zero-rental days': zero_rentals,
+        'hub absent on t-2': absent_hub,
+        'rows shuffled': shuffled,
+    }
+
+
+def synthetic_rows(hubs: int, days: int) -> list[dict]:
+    rng = random.Random(3)
+    start = 738_000  # an ordinal in 2021; dates just need to be ISO strings
+    from datetime import date
+    rows = []
+    for h in range(hubs):
+        name = HUB_ORDER[h] if h < len(HUB_ORDER) else f'Hub {h}'
+        for d in range(days):
+            rt = rng.randint(0, 60)
+            rows.append({'hub_name': name, 'hub_id': h, 'date': date.fromordinal(start + d).isoformat(),
+                         'r6': 0, 'r12': 0, 'r24': rng.randint(0, rt), 'rt': rt,
+                         'inc': rt * 450, 'av': rng.randint(100, 400)})
+    return rows
+
+
+def time_both(rows: list[dict], hub_order: list[str], repeat: int = 3) -> tuple[float, float, float]:
+    """(legacy loop, engine load, engine compute) seconds per run."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        legacy_email_rows(rows, hub_order)
+    legacy = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        engine = DRREngine.from_rows(rows)
+    load = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        engine.trial_summary(engine.latest_dates()[1])
+    compute = (time.perf_counter() - start) / repeat
+    return legacy, load, compute
+
+
+def main() -> None:
+    with open(DATA_PATH, encoding='utf-8') as f:
+        rows = json.load(f)['rows']
+
+    print('Equivalence with the workflow loop:')
+    failures = sum(compare(name, variant) for name, variant in variants(rows).items())
+    if failures:
+        print(f'\n✗ {failures} mismatches')
+        sys.exit(1)
+
+    synthetic = synthetic_rows(200, 730)
+    hub_order = list(dict.fromkeys(r['hub_name'] for r in synthetic))
+    legacy, load, compute = time_both(synthetic, hub_order)
+    print(f'\nSynthetic 200 hubs x 730 days ({len(synthetic)} rows), all hubs summarised:')
+    print(f'  per-hub loops:      {legacy * 1000:8.1f} ms')
+    print(f'  drr_engine load:    {load * 1000:8.1f} ms')
+    print(f'  drr_engine compute: {compute * 1000:8.1f} ms  ({legacy / compute:.0f}x the loops)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Pin rollup_queries.sql against queries.sql on local SQLite fixtures.
+
+Each fixture is a run_queries.py stand-in with awkward rows added: a day
+with no official NGN rate, a day with a zero KES rate, duplicated raw
+rollup rows and agents with two open assignments to the same hub. The
+rollups are built in full as of the day before, then refreshed to today,
+which must rebuild only the newest day; every block must then return the
+same rows from the rollups as from the raw tables. Finally times each
+block both ways.
+
+    python3 work/check_scoreboard_rollups.py [--hubs 300] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from run_queries import QUERIES_PATH, SQLiteStandIn, load_queries, run_queries
+from scoreboard_rollups import ROLLUP_QUERIES_PATH, refresh_rollups
+
+TODAY = date(2026, 7, 23)
+
+
+def add_awkward_rows(path: Path, today: date) -> None:
+    connection = sqlite3.connect(path)
+    day = lambda n: (today - timedelta(days=n)).isoformat()
+    connection.executescript(f"""
+        DELETE FROM currency_rates_history WHERE currency_id = 1 AND date = '{day(3)}' AND is_parallel_rate = 0;
+        UPDATE currency_rates_history SET rate_usd = 0 WHERE currency_id = 2 AND date = '{day(2)}';
+        INSERT INTO agent_performance_rollups_daily
+          SELECT * FROM agent_performance_rollups_daily WHERE rowid % 97 = 0;
+        INSERT INTO agent_hub_assignment_history (agent_id, hub_id, created_at, deleted_at)
+          SELECT agent_id, hub_id, datetime(created_at, '+3 days'), NULL
+          FROM agent_hub_assignment_history WHERE id % 50 = 0;
+    """)
+    connection.commit()
+    connection.close()
+
+
+def compare(name: str, raw: list[dict], rolled: list[dict]) -> str | None:
+    """None when the rows match; rows may differ only in the order of ties."""
+    if raw == rolled:
+        return None
+    key = lambda row: [(k, str(v)) for k, v in row.items()]
+    if sorted(raw, key=key) == sorted(rolled, key=key):
+        return None
+    for i, (a, b) in enumerate(zip(raw, rolled)):
+        if a != b:
+            return f"row {i}: raw {a} != rollup {b}"
+    return f"raw has {len(raw)} rows, rollup {len(rolled)}"
+
+
+def check_fixture(directory: Path, hubs: int, seed: int) -> tuple[int, SQLiteStandIn]:
+    standin = SQLiteStandIn(TODAY, hubs=hubs, seed=seed, directory=directory)
+    standin.ensure()
+    add_awkward_rows(standin.path, TODAY)
+
+    connection = sqlite3.connect(standin.path)
+    refresh_rollups(connection, TODAY - timedelta(days=1), translate=standin.translate, full=True)
+    built = refresh_rollups(connection, TODAY, translate=standin.translate)
+    connection.close()
+
+    failures = 0
+    newest = (TODAY - timedelta(days=1)).isoformat()
+    if built != [newest]:
+        print(f"  ✗ seed {seed}: refresh rebuilt {built}, expected only {newest}")
+        failures += 1
+
+    raw = run_queries(load_queries(QUERIES_PATH), standin, today=TODAY, workers=1)
+    rolled = {r.name: r for r in run_queries(load_queries(ROLLUP_QUERIES_PATH), standin, today=TODAY, workers=1)}
+    for result in raw:
+        other = rolled.get(result.name)
+        problem = result.error or (other.error if other else "missing from rollup_queries.sql")
+        if problem is None:
+            problem = compare(result.name, result.rows, other.rows)
+        if problem:
+            print(f"  ✗ seed {seed} {result.name}: {problem}")
+            failures += 1
+    if not failures:
+        counts = ", ".join(f"{r.name} {len(r.rows)}" for r in raw)
+        print(f"  ✓ seed {seed}: all {len(raw)} blocks identical ({counts} rows)")
+    return failures, standin
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check rollup_queries.sql against queries.sql")
+    parser.add_argument("--hubs", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("Equivalence with the raw queries:")
+        failures = 0
+        for seed in (1, 2, 3):
+            fixture_failures, standin = check_fixture(Path(tmp), args.hubs, seed)
+            failures += fixture_failures
+        if failures:
+            print(f"\n✗ {failures} mismatches")
+            sys.exit(1)
+
+        print(f"\nPer-block time, {args.hubs} hubs (best of {args.repeat}, one at a time):")
+        print(f"  {'query':18} {'raw':>10} {'rollup':>10}")
+        timings = {}
+        for label, path in (("raw", QUERIES_PATH), ("rollup", ROLLUP_QUERIES_PATH)):
+            for query in load_queries(path):
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    run_queries([query], standin, today=TODAY, workers=1)
+                    best = min(best, time.perf_counter() - start)
+                timings.setdefault(query.name, {})[label] = best
+        for name, t in timings.items():
+            print(f"  {name:18} {t['raw'] * 1000:8.1f}ms {t['rollup'] * 1000:8.1f}ms")
+        raw_total = sum(t["raw"] for t in timings.values())
+        rollup_total = sum(t["rollup"] for t in timings.values())
+        print(f"  {'total':18} {raw_total * 1000:8.1f}ms {rollup_total * 1000:8.1f}ms  "
+              f"({raw_total / rollup_total:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""Columnar DRR engine for the ASP 600 NGN trial hubs.
+
+Loads work/drr_data.json rows into hub x date NumPy arrays once, then
+computes daily DRR (inc / av), trial averages, baseline deltas and 24h
+rental share for every hub in vectorised passes. Used by the DRR Trial
+Email workflow and to produce work/.drr_metrics.json:
+
+    python3 work/drr_engine.py                     # writes work/.drr_metrics.json
+    python3 work/drr_engine.py --output -          # prints it instead
+
+Missing (hub, date) cells are NaN and ignored by the averages, matching the
+per-hub row filtering the email used to do.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from drr_store import DRRColumns, load_binary
+
+DATA_PATH = Path(__file__).resolve().parent / "drr_data.json"
+METRICS_PATH = Path(__file__).resolve().parent / ".drr_metrics.json"
+
+TRIAL_START = "2026-04-22"
+
+# Daily DRR baselines (NGN per available battery) under the previous policies
+BASELINE_600 = {"Ibiade Ogun": 118, "Iwopin Ogun": 107, "Kajola Ondo": 97, "Oba Akoko Ondo": 152, "Sobe Edo": 113, "Ute Ondo": 204}
+BASELINE_800 = {"Ibiade Ogun": 94, "Iwopin Ogun": 45, "Kajola Ondo": 69, "Oba Akoko Ondo": 110, "Sobe Edo": 55, "Ute Ondo": 101}
+HUB_ORDER = ["Ibiade Ogun", "Iwopin Ogun", "Kajola Ondo", "Oba Akoko Ondo", "Sobe Edo", "Ute Ondo"]
+
+COLUMNS = ("inc", "av", "r24", "rt")
+
+
+def _nanmean(values: np.ndarray) -> np.ndarray:
+    """Row means over non-NaN cells; NaN for rows with none (without warnings)."""
+    counts = np.sum(~np.isnan(values), axis=1)
+    sums = np.nansum(values, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise numerator / denominator, NaN where the denominator is 0 or missing."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _value(x: float) -> float | None:
+    return None if np.isnan(x) else float(x)
+
+
+class DRREngine:
+    """Hub x date arrays of inc, av, r24 and rt, with derived DRR metrics.
+
+    `hubs` and `dates` label the rows and columns; dates are ISO strings in
+    ascending order, so string comparison is date comparison.
+    """
+
+    def __init__(self, hubs: list[str], hub_ids: list[int | None], dates: list[str],
+                 columns: dict[str, np.ndarray]) -> None:
+        self.hubs = list(hubs)
+        self.hub_ids = list(hub_ids)
+        self.dates = np.array(dates)
+        self.hub_index = {hub: i for i, hub in enumerate(self.hubs)}
+        self.inc = columns["inc"]
+        self.av = columns["av"]
+        self.r24 = columns["r24"]
+        self.rt = columns["rt"]
+        self.drr = _ratio(self.inc, self.av)
+        self.share_24h = _ratio(self.r24, self.rt)
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> DRREngine:
+        """Build the arrays from drr_data.json rows; each (hub, date) may appear once."""
+        hub_index = {}
+        hub_ids = []
+        for r in rows:
+            if r["hub_name"] not in hub_index:
+                hub_index[r["hub_name"]] = len(hub_index)
+                hub_ids.append(r.get("hub_id"))
+        dates = sorted({r["date"] for r in rows})
+        date_index = {date: j for j, date in enumerate(dates)}
+
+        rows_i = np.array([hub_index[r["hub_name"]] for r in rows], dtype=np.intp)
+        cols_j = np.array([date_index[r["date"]] for r in rows], dtype=np.intp)
+        cells = rows_i * len(dates) + cols_j
+        if np.bincount(cells).max(initial=0) > 1:
+            raise ValueError("drr_data rows contain duplicate (hub_name, date) pairs")
+
+        columns = {}
+        for name in COLUMNS:
+            grid = np.full((len(hub_index), len(dates)), np.nan)
+            grid[rows_i, cols_j] = [r[name] for r in rows]
+            columns[name] = grid
+        return cls(list(hub_index), hub_ids, dates, columns)
+
+    @classmethod
+    def from_columns(cls, store: DRRColumns) -> DRREngine:
+        """Build the arrays straight from a drr_store column set, without row dicts."""
+        hub = np.asarray(store.columns["hub"], dtype=np.intp)
+        days, cols_j = np.unique(store.columns["day"], return_inverse=True)
+        cells = hub * len(days) + cols_j
+        if np.bincount(cells).max(initial=0) > 1:
+            raise ValueError("drr_data rows contain duplicate (hub_name, date) pairs")
+
+        columns = {}
+        for name in COLUMNS:
+            grid = np.full((len(store.hubs), len(days)), np.nan)
+            grid[hub, cols_j] = store.columns[name]
+            columns[name] = grid
+        return cls([name for name, _ in store.hubs], [hub_id for _, hub_id in store.hubs],
+                   store.day_dates(days).tolist(), columns)
+
+    @classmethod
+    def from_file(cls, path: Path = DATA_PATH) -> DRREngine:
+        """Load drr_data.json rows, columnar JSON or a binary store directory."""
+        path = Path(path)
+        if not path.is_dir():
+            with open(path, encoding="utf-8") as f:
+                document = json.load(f)
+            if "format" in document:
+                return cls.from_columns(DRRColumns.from_document(document))
+            return cls.from_rows(document["rows"])
+        return cls.from_columns(load_binary(path))
+
+    def window(self, start: str | None = None, end: str | None = None) -> np.ndarray:
+        """Boolean date mask for start <= date <= end (either bound optional)."""
+        mask = np.ones(len(self.dates), dtype=bool)
+        if start is not None:
+            mask &= self.dates >= start
+        if end is not None:
+            mask &= self.dates <= end
+        return mask
+
+    def column(self, date: str) -> int | None:
+        j = int(np.searchsorted(self.dates, date))
+        return j if j < len(self.dates) and self.dates[j] == date else None
+
+    def latest_dates(self) -> tuple[str, str]:
+        """(t-1, t-2): the latest date in the data and the one before it."""
+        t1 = str(self.dates[-1])
+        t2 = str(self.dates[-2]) if len(self.dates) >= 2 else t1
+        return t1, t2
+
+    def trial_summary(self, as_of: str, trial_start: str = TRIAL_START) -> dict:
+        """Every hub's metrics as of `as_of`, with the trial running trial_start..as_of.
+
+        Returns {"as_of", "trial_days", "hubs": {hub_name: {...}}}. Hubs with no
+        row on `as_of` are left out. Per hub: as_of_drr, prior_drr (the previous
+        date), trial_avg_drr, pre_trial_avg_drr, delta_600 / delta_800 (fractions
+        vs BASELINE_600 / BASELINE_800), share_24h and trial_avg_share_24h.
+        """
+        trial = self.window(trial_start, as_of)
+        pre_trial = self.dates < trial_start
+        j = self.column(as_of)
+
+        trial_avg = _nanmean(self.drr[:, trial])
+        pre_avg = _nanmean(self.drr[:, pre_trial])
+        trial_share = _nanmean(self.share_24h[:, trial])
+        b600 = np.array([BASELINE_600.get(hub, np.nan) for hub in self.hubs], dtype=float)
+        b800 = np.array([BASELINE_800.get(hub, np.nan) for hub in self.hubs], dtype=float)
+        delta_600 = _ratio(trial_avg - b600, b600)
+        delta_800 = _ratio(trial_avg - b800, b800)
+
+        if j is None:
+            as_of_drr = prior_drr = share = np.full(len(self.hubs), np.nan)
+            present = np.zeros(len(self.hubs), dtype=bool)
+        else:
+            as_of_drr = self.drr[:, j]
+            prior_drr = self.drr[:, j - 1] if j > 0 else np.full(len(self.hubs), np.nan)
+            share = self.share_24h[:, j]
+            present = ~np.isnan(self.inc[:, j])
+
+        hubs = {}
+        for i, hub in enumerate(self.hubs):
+            if not present[i]:
+                continue
+            hubs[hub] = {
+                "hub_id": self.hub_ids[i],
+                "as_of_drr": _value(as_of_drr[i]),
+                "prior_drr": _value(prior_drr[i]),
+                "trial_avg_drr": _value(trial_avg[i]),
+                "pre_trial_avg_drr": _value(pre_avg[i]),
+                "delta_600": _value(delta_600[i]),
+                "delta_800": _value(delta_800[i]),
+                "baseline_600": BASELINE_600.get(hub, 0),
+                "baseline_800": BASELINE_800.get(hub, 0),
+                "share_24h": _value(share[i]),
+                "trial_avg_share_24h": _value(trial_share[i]),
+            }
+        return {"as_of": as_of, "trial_days": int(np.sum(trial)), "hubs": hubs}
+
+
+def email_rows(engine: DRREngine, trial_start: str = TRIAL_START) -> tuple[str, int, list[dict]]:
+    """Table rows for the daily email: (t2_date, trial_days, rows in HUB_ORDER).
+
+    Each row carries the hub's t-2 DRR, trial average, percentage deltas vs
+    both baselines (None when there is no trial average) and the t-2 24h
+    share as a rounded percentage (None when there were no rentals).
+    """
+    _, t2_date = engine.latest_dates()
+    summary = engine.trial_summary(t2_date, trial_start)
+    rows = []
+    for hub in HUB_ORDER:
+        metrics = summary["hubs"].get(hub)
+        if metrics is None:
+            continue
+        trial_avg = metrics["trial_avg_drr"]
+        rows.append({
+            "hub": hub,
+            "t2_drr": metrics["as_of_drr"],
+            "trial_avg": trial_avg,
+            "d600": metrics["delta_600"] * 100 if trial_avg and metrics["delta_600"] is not None else None,
+            "d800": metrics["delta_800"] * 100 if trial_avg and metrics["delta_800"] is not None else None,
+            "b600": metrics["baseline_600"],
+            "b800": metrics["baseline_800"],
+            "share": round(metrics["share_24h"] * 100) if metrics["share_24h"] is not None else None,
+        })
+    return t2_date, summary["trial_days"], rows
+
+
+def _round(value: float | None, digits: int) -> float | None:
+    return None if value is None else round(value, digits)
+
+
+def metrics_document(summary: dict, generated_at: str | None = None) -> dict:
+    """The .drr_metrics.json document for a trial_summary()-shaped summary, by hub id."""
+    hubs = []
+    for hub, m in sorted(summary["hubs"].items(), key=lambda item: (item[1]["hub_id"] is None, item[1]["hub_id"])):
+        swing = None
+        if m["as_of_drr"] is not None and m["prior_drr"]:
+            swing = m["as_of_drr"] / m["prior_drr"] - 1
+        pre_delta = None
+        if m["trial_avg_drr"] is not None and m["pre_trial_avg_drr"]:
+            pre_delta = m["trial_avg_drr"] / m["pre_trial_avg_drr"] - 1
+        hubs.append({
+            "hub_name": hub,
+            "hub_id": m["hub_id"],
+            "yesterday_drr": _round(m["as_of_drr"], 2),
+            "trial_avg_drr": _round(m["trial_avg_drr"], 2),
+            "pre_asp_avg_drr": _round(m["pre_trial_avg_drr"], 2),
+            "delta_vs_baseline": _round(m["delta_600"], 4),
+            "delta_vs_pre_avg": _round(pre_delta, 4),
+            "yesterday_24h_share": _round(m["share_24h"], 4),
+            "trial_avg_24h_share": _round(m["trial_avg_share_24h"], 4),
+            "drr_day_on_day_swing": _round(swing, 4),
+        })
+    return {
+        "generated_at": generated_at or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "yesterday_date": summary["as_of"],
+        "trial_days": summary["trial_days"],
+        "hubs": hubs,
+    }
+
+
+def drr_metrics(engine: DRREngine, trial_start: str = TRIAL_START, generated_at: str | None = None) -> dict:
+    """The .drr_metrics.json document: each hub as of the latest date, by hub id."""
+    yesterday, _ = engine.latest_dates()
+    return metrics_document(engine.trial_summary(yesterday, trial_start), generated_at)
+
+
+def write_metrics(metrics: dict, output: str | Path) -> None:
+    """Write a metrics document to a path (atomically), or to stdout for '-'."""
+    text = json.dumps(metrics, indent=2) + "\n"
+    if str(output) == "-":
+        sys.stdout.write(text)
+        return
+    output = Path(output)
+    tmp_path = output.with_name(f".{output.name}.tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, output)
+    print(f"[drr] wrote {output} ({len(metrics['hubs'])} hubs, as of {metrics['yesterday_date']})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write DRR trial metrics from drr_data.json")
+    parser.add_argument("--data", type=Path, default=DATA_PATH,
+                        help="drr_data.json, columnar JSON or a binary store (see drr_store.py)")
+    parser.add_argument("--output", default=str(METRICS_PATH), help="metrics path, or - for stdout")
+    args = parser.parse_args()
+
+    write_metrics(drr_metrics(DRREngine.from_file(args.data)), args.output)
+
+
+if __name__ == "__main__":
+    main()
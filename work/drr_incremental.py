@@ -0,0 +1,273 @@
+"""Incremental DRR trial metrics for work/.drr_metrics.json.
+
+Instead of recomputing every average from the full row history, keeps
+running sums and counts per hub for the pre-trial and trial windows, plus
+each hub's last two days, in work/.drr_metrics_state.json. Ingesting a new
+day touches only that day's rows, so a daily update is O(hubs) however
+long the trial has run. The baseline deltas follow from the trial average
+and the fixed baselines.
+
+    python3 work/drr_incremental.py rebuild             # state from the full history
+    python3 work/drr_incremental.py update              # ingest days newer than the state
+    python3 work/drr_incremental.py update --verify     # ... and check against a full recompute
+
+Both commands write .drr_metrics.json. Data can be drr_data.json or
+either drr_store.py columnar format; with a binary store, update reads
+only the rows past the state's last date. Days must arrive in order:
+rows dated on or before the last ingested day are rejected, so a
+corrected history needs a rebuild.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from drr_engine import (BASELINE_600, BASELINE_800, DATA_PATH, METRICS_PATH, TRIAL_START, DRREngine,
+                        metrics_document, write_metrics)
+from drr_store import VALUE_COLUMNS, load
+
+STATE_PATH = Path(__file__).resolve().parent / ".drr_metrics_state.json"
+STATE_VERSION = 1
+
+# Summary fields compared by verify(); the rest are copied from constants
+VERIFIED_FIELDS = ("hub_id", "as_of_drr", "prior_drr", "trial_avg_drr", "pre_trial_avg_drr",
+                   "delta_600", "delta_800", "share_24h", "trial_avg_share_24h")
+
+
+def _ratio(numerator: float, denominator: float) -> float | None:
+    return numerator / denominator if denominator > 0 else None
+
+
+def _mean(total: float, count: int) -> float | None:
+    return total / count if count else None
+
+
+def _delta(value: float | None, baseline: float | None) -> float | None:
+    if value is None or not baseline:
+        return None
+    return (value - baseline) / baseline
+
+
+class HubTotals:
+    """Running sums for one hub; days with no DRR (av 0) or share (rt 0) are not counted."""
+
+    __slots__ = ("hub_id", "pre_drr_sum", "pre_drr_count", "trial_drr_sum", "trial_drr_count",
+                 "trial_share_sum", "trial_share_count", "recent")
+
+    def __init__(self, hub_id: int | None) -> None:
+        self.hub_id = hub_id
+        self.pre_drr_sum = 0.0
+        self.pre_drr_count = 0
+        self.trial_drr_sum = 0.0
+        self.trial_drr_count = 0
+        self.trial_share_sum = 0.0
+        self.trial_share_count = 0
+        # [date, drr, share] for the hub's last two days, oldest first
+        self.recent: list[list] = []
+
+    def add(self, day: str, trial: bool, drr: float | None, share: float | None) -> None:
+        if trial:
+            if drr is not None:
+                self.trial_drr_sum += drr
+                self.trial_drr_count += 1
+            if share is not None:
+                self.trial_share_sum += share
+                self.trial_share_count += 1
+        elif drr is not None:
+            self.pre_drr_sum += drr
+            self.pre_drr_count += 1
+        self.recent = self.recent[-1:] + [[day, drr, share]]
+
+    def to_json(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_json(cls, data: dict) -> HubTotals:
+        totals = cls(data["hub_id"])
+        for name in cls.__slots__:
+            setattr(totals, name, data[name])
+        return totals
+
+
+class IncrementalMetrics:
+    """Per-hub running totals plus the last two dates seen across all hubs."""
+
+    def __init__(self, trial_start: str = TRIAL_START) -> None:
+        self.trial_start = trial_start
+        self.hubs: dict[str, HubTotals] = {}
+        self.dates: list[str] = []
+        self.trial_days = 0
+
+    @property
+    def last_date(self) -> str | None:
+        return self.dates[-1] if self.dates else None
+
+    def ingest(self, rows: list[dict]) -> int:
+        """Add rows for one or more new days, oldest day first; returns the number of days."""
+        last = self.last_date
+        by_date: dict[str, list[dict]] = {}
+        for r in rows:
+            if last is not None and r["date"] <= last:
+                raise ValueError(f"cannot ingest {r['hub_name']} {r['date']}: metrics already run to {last}")
+            by_date.setdefault(r["date"], []).append(r)
+
+        for day in sorted(by_date):
+            trial = day >= self.trial_start
+            seen = set()
+            for r in by_date[day]:
+                if r["hub_name"] in seen:
+                    raise ValueError(f"duplicate row for {r['hub_name']} {day}")
+                seen.add(r["hub_name"])
+                totals = self.hubs.get(r["hub_name"])
+                if totals is None:
+                    totals = self.hubs[r["hub_name"]] = HubTotals(r.get("hub_id"))
+                totals.add(day, trial, _ratio(r["inc"], r["av"]), _ratio(r["r24"], r["rt"]))
+            self.dates = self.dates[-1:] + [day]
+            self.trial_days += trial
+        return len(by_date)
+
+    def summary(self) -> dict:
+        """The latest day's metrics, shaped like DRREngine.trial_summary()."""
+        as_of = self.last_date
+        prior_date = self.dates[0] if len(self.dates) == 2 else None
+        hubs = {}
+        for hub, totals in self.hubs.items():
+            if not totals.recent or totals.recent[-1][0] != as_of:
+                continue
+            _, as_of_drr, share = totals.recent[-1]
+            prior_drr = None
+            if len(totals.recent) == 2 and totals.recent[0][0] == prior_date:
+                prior_drr = totals.recent[0][1]
+            trial_avg = _mean(totals.trial_drr_sum, totals.trial_drr_count)
+            hubs[hub] = {
+                "hub_id": totals.hub_id,
+                "as_of_drr": as_of_drr,
+                "prior_drr": prior_drr,
+                "trial_avg_drr": trial_avg,
+                "pre_trial_avg_drr": _mean(totals.pre_drr_sum, totals.pre_drr_count),
+                "delta_600": _delta(trial_avg, BASELINE_600.get(hub)),
+                "delta_800": _delta(trial_avg, BASELINE_800.get(hub)),
+                "baseline_600": BASELINE_600.get(hub, 0),
+                "baseline_800": BASELINE_800.get(hub, 0),
+                "share_24h": share,
+                "trial_avg_share_24h": _mean(totals.trial_share_sum, totals.trial_share_count),
+            }
+        return {"as_of": as_of, "trial_days": self.trial_days, "hubs": hubs}
+
+    def save(self, path: Path = STATE_PATH) -> None:
+        state = {
+            "version": STATE_VERSION,
+            "trial_start": self.trial_start,
+            "dates": self.dates,
+            "trial_days": self.trial_days,
+            "hubs": {hub: totals.to_json() for hub, totals in self.hubs.items()},
+        }
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(state, separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path = STATE_PATH) -> IncrementalMetrics:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"{path} is not a version {STATE_VERSION} metrics state; rebuild it")
+        metrics = cls(state["trial_start"])
+        metrics.dates = state["dates"]
+        metrics.trial_days = state["trial_days"]
+        metrics.hubs = {hub: HubTotals.from_json(data) for hub, data in state["hubs"].items()}
+        return metrics
+
+
+def rows_after(data: Path, after: str | None) -> list[dict]:
+    """Rows from any drr_store format dated after `after` (all rows for None)."""
+    store = load(data)
+    if after is None:
+        return store.to_rows()
+    days = np.asarray(store.columns["day"])
+    cutoff = (np.datetime64(after, "D") - np.datetime64(store.start_date, "D")).astype(int)
+    index = np.flatnonzero(days > cutoff)
+    hubs = store.hubs
+    dates = store.day_dates(days[index]).tolist()
+    values = [np.asarray(store.columns[name])[index].tolist() for name in VALUE_COLUMNS]
+    hub_column = np.asarray(store.columns["hub"])[index].tolist()
+    return [
+        {"hub_name": hubs[h][0], "hub_id": hubs[h][1], "date": d, **dict(zip(VALUE_COLUMNS, row))}
+        for h, d, *row in zip(hub_column, dates, *values)
+    ]
+
+
+def _same(a: object, b: object) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def verify(metrics: IncrementalMetrics, data: Path) -> list[str]:
+    """Differences between the running totals and a full recompute of data."""
+    engine = DRREngine.from_file(data)
+    expected = engine.trial_summary(engine.latest_dates()[0], metrics.trial_start)
+    actual = metrics.summary()
+    problems = []
+    for key in ("as_of", "trial_days"):
+        if expected[key] != actual[key]:
+            problems.append(f"{key}: full {expected[key]!r}, incremental {actual[key]!r}")
+    for hub in sorted(set(expected["hubs"]) | set(actual["hubs"])):
+        if hub not in expected["hubs"] or hub not in actual["hubs"]:
+            problems.append(f"{hub}: only in the {'full' if hub in expected['hubs'] else 'incremental'} metrics")
+            continue
+        for field in VERIFIED_FIELDS:
+            full, incremental = expected["hubs"][hub][field], actual["hubs"][hub][field]
+            if not _same(full, incremental):
+                problems.append(f"{hub} {field}: full {full!r}, incremental {incremental!r}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Update DRR trial metrics incrementally")
+    parser.add_argument("command", choices=("rebuild", "update"))
+    parser.add_argument("--data", type=Path, default=DATA_PATH,
+                        help="drr_data.json, columnar JSON or a binary store (see drr_store.py)")
+    parser.add_argument("--state", type=Path, default=STATE_PATH)
+    parser.add_argument("--output", default=str(METRICS_PATH), help="metrics path, or - for stdout")
+    parser.add_argument("--verify", action="store_true", help="check the result against a full recompute")
+    args = parser.parse_args()
+
+    if args.command == "update" and args.state.exists():
+        metrics = IncrementalMetrics.load(args.state)
+    else:
+        if args.command == "update":
+            print(f"[drr] no state at {args.state}, rebuilding from the full history", file=sys.stderr)
+        metrics = IncrementalMetrics()
+
+    try:
+        days = metrics.ingest(rows_after(args.data, metrics.last_date))
+    except ValueError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"[drr] ingested {days} day(s), metrics as of {metrics.last_date}", file=sys.stderr)
+
+    if args.verify:
+        problems = verify(metrics, args.data)
+        if problems:
+            for problem in problems:
+                print(f"  ✗ {problem}", file=sys.stderr)
+            print(f"✗ incremental metrics differ from a full recompute in {len(problems)} places", file=sys.stderr)
+            sys.exit(1)
+        print(f"✓ matches a full recompute ({len(metrics.hubs)} hubs)", file=sys.stderr)
+
+    metrics.save(args.state)
+    write_metrics(metrics_document(metrics.summary()), args.output)
+
+
+if __name__ == "__main__":
+    main()
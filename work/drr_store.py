@@ -0,0 +1,334 @@
+"""Columnar storage for the DRR trial data in work/drr_data.json.
+
+drr_data.json repeats hub_name, hub_id, date and every count on each
+hub-day row. The columnar form stores each field once per row as an
+array, with hubs as indexes into a hub dictionary and dates as day
+offsets from start_date:
+
+    {"format": "drr-columnar", "version": 1, "generated_at": "...",
+     "start_date": "2026-04-01",
+     "hubs": [{"hub_name": "Kajola Ondo", "hub_id": 274}, ...],
+     "columns": {"hub": [0, 0, ...], "day": [0, 1, ...], "r6": [...], ...}}
+
+The binary variant is a directory holding the same document minus the
+column arrays (meta.json) plus one little-endian file per column
+(<column>.bin), which np.memmap can map without parsing. meta.json records
+the row count, so an append only writes the new rows to the end of each
+column file and then replaces meta.json; a crash in between leaves extra
+bytes that the next append truncates and readers never see.
+
+Rows keep their original order, so converting and expanding back gives
+the same rows. Appended rows must all be dated after the latest stored
+day; stored history is never rewritten.
+
+    python3 work/drr_store.py convert                   # drr_data.json -> drr_data.columns.json
+    python3 work/drr_store.py convert --binary          # ... -> drr_data.cols/
+    python3 work/drr_store.py append drr_data.cols new_rows.json
+    python3 work/drr_store.py info drr_data.cols
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+WORK_DIR = Path(__file__).resolve().parent
+ROWS_PATH = WORK_DIR / "drr_data.json"
+COLUMNAR_PATH = WORK_DIR / "drr_data.columns.json"
+BINARY_DIR = WORK_DIR / "drr_data.cols"
+
+FORMAT = "drr-columnar"
+VERSION = 1
+
+# Column name -> on-disk dtype; hub and day are the dictionary index and date offset
+DTYPES = {
+    "hub": "<i4",
+    "day": "<i4",
+    "r6": "<i4",
+    "r12": "<i4",
+    "r24": "<i4",
+    "rt": "<i4",
+    "inc": "<i8",
+    "av": "<i4",
+}
+VALUE_COLUMNS = ("r6", "r12", "r24", "rt", "inc", "av")
+ROW_KEYS = ("hub_name", "hub_id", "date") + VALUE_COLUMNS
+
+
+def _integers(values: list, name: str) -> np.ndarray:
+    if not all(type(v) is int for v in values):
+        raise ValueError(f"drr_data column {name!r} has non-integer values")
+    return np.array(values, dtype=DTYPES[name])
+
+
+def _row_columns(rows: list[dict], hub_index: dict[str, int], start_date: str) -> dict[str, np.ndarray]:
+    start = date.fromisoformat(start_date)
+    columns = {
+        "hub": np.array([hub_index[r["hub_name"]] for r in rows], dtype=DTYPES["hub"]),
+        "day": np.array([(date.fromisoformat(r["date"]) - start).days for r in rows], dtype=DTYPES["day"]),
+    }
+    for name in VALUE_COLUMNS:
+        columns[name] = _integers([r[name] for r in rows], name)
+    return columns
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class DRRColumns:
+    """Hub dictionary plus one array per column, in row order.
+
+    `hubs` is a list of (hub_name, hub_id) in first-appearance order;
+    columns["hub"] indexes into it and columns["day"] counts days from
+    start_date.
+    """
+
+    def __init__(self, hubs: list[tuple[str, int | None]], start_date: str,
+                 columns: dict[str, np.ndarray], generated_at: str | None = None) -> None:
+        self.hubs = list(hubs)
+        self.start_date = start_date
+        self.columns = columns
+        self.generated_at = generated_at
+
+    def __len__(self) -> int:
+        return len(self.columns["hub"])
+
+    def __repr__(self) -> str:
+        return f"<DRRColumns {len(self)} rows, {len(self.hubs)} hubs, {self.start_date}..{self.last_date()}>"
+
+    def day_dates(self, days: np.ndarray) -> np.ndarray:
+        """ISO date strings for day offsets."""
+        return (np.datetime64(self.start_date, "D") + np.asarray(days, dtype="timedelta64[D]")).astype(str)
+
+    def last_date(self) -> str | None:
+        if not len(self):
+            return None
+        return str(self.day_dates(self.columns["day"].max()))
+
+    @classmethod
+    def from_rows(cls, rows: list[dict], generated_at: str | None = None) -> DRRColumns:
+        """Columns for drr_data.json rows; values must be integers."""
+        if not rows:
+            raise ValueError("drr_data has no rows")
+        hubs = {}
+        for r in rows:
+            hubs.setdefault(r["hub_name"], r.get("hub_id"))
+        start_date = min(r["date"] for r in rows)
+        hub_index = {name: i for i, name in enumerate(hubs)}
+        return cls(list(hubs.items()), start_date, _row_columns(rows, hub_index, start_date), generated_at)
+
+    def to_rows(self) -> list[dict]:
+        """The drr_data.json rows, in stored order."""
+        hubs = self.hubs
+        dates = self.day_dates(self.columns["day"]).tolist()
+        values = [self.columns[name].tolist() for name in VALUE_COLUMNS]
+        return [
+            dict(zip(ROW_KEYS, (*hubs[h], d, *row)))
+            for h, d, *row in zip(self.columns["hub"].tolist(), dates, *values)
+        ]
+
+    def meta(self) -> dict:
+        return {
+            "format": FORMAT,
+            "version": VERSION,
+            "generated_at": self.generated_at,
+            "start_date": self.start_date,
+            "rows": len(self),
+            "hubs": [{"hub_name": name, "hub_id": hub_id} for name, hub_id in self.hubs],
+        }
+
+    def to_document(self) -> dict:
+        return {**self.meta(), "columns": {name: self.columns[name].tolist() for name in DTYPES}}
+
+    @classmethod
+    def from_document(cls, document: dict) -> DRRColumns:
+        if document.get("format") != FORMAT or document.get("version") != VERSION:
+            raise ValueError(f"not a {FORMAT} v{VERSION} document")
+        columns = {name: np.array(document["columns"][name], dtype=DTYPES[name]) for name in DTYPES}
+        return cls([(h["hub_name"], h["hub_id"]) for h in document["hubs"]], document["start_date"],
+                   columns, document.get("generated_at"))
+
+    def appended(self, rows: list[dict], generated_at: str | None = None) -> tuple[DRRColumns, dict]:
+        """These columns with rows added, and the new rows' columns on their own.
+
+        Every new row must be dated after the latest stored date, and each
+        (hub, date) may appear once. Unknown hubs are added to the dictionary.
+        """
+        last = self.last_date()
+        hubs = dict(self.hubs)
+        keys = set()
+        for r in rows:
+            if last is not None and r["date"] <= last:
+                raise ValueError(f"cannot append {r['hub_name']} {r['date']}: data already runs to {last}")
+            if (r["hub_name"], r["date"]) in keys:
+                raise ValueError(f"duplicate row for {r['hub_name']} {r['date']}")
+            keys.add((r["hub_name"], r["date"]))
+            hubs.setdefault(r["hub_name"], r.get("hub_id"))
+
+        hub_index = {name: i for i, name in enumerate(hubs)}
+        tail = _row_columns(rows, hub_index, self.start_date)
+
+        columns = {name: np.concatenate([self.columns[name], tail[name]]) for name in DTYPES}
+        return DRRColumns(list(hubs.items()), self.start_date, columns, generated_at or self.generated_at), tail
+
+
+def save_json(store: DRRColumns, path: Path = COLUMNAR_PATH) -> None:
+    _write_atomic(Path(path), json.dumps(store.to_document(), separators=(",", ":")))
+
+
+def save_binary(store: DRRColumns, directory: Path = BINARY_DIR) -> None:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, dtype in DTYPES.items():
+        with open(directory / f"{name}.bin", "wb") as f:
+            f.write(store.columns[name].astype(dtype, copy=False).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+    _write_atomic(directory / "meta.json", json.dumps(store.meta(), indent=2) + "\n")
+
+
+def load_binary(directory: Path = BINARY_DIR, mmap: bool = True) -> DRRColumns:
+    """Open a binary store; with mmap the columns are read-only memory maps."""
+    directory = Path(directory)
+    with open(directory / "meta.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT or meta.get("version") != VERSION:
+        raise ValueError(f"{directory} is not a {FORMAT} v{VERSION} store")
+
+    count = meta["rows"]
+    columns = {}
+    for name, dtype in DTYPES.items():
+        path = directory / f"{name}.bin"
+        if mmap and count:
+            columns[name] = np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+        else:
+            columns[name] = np.fromfile(path, dtype=dtype, count=count)
+    return DRRColumns([(h["hub_name"], h["hub_id"]) for h in meta["hubs"]], meta["start_date"],
+                      columns, meta.get("generated_at"))
+
+
+def append_binary(directory: Path, rows: list[dict], generated_at: str | None = None) -> DRRColumns:
+    """Append rows to a binary store, writing only the new rows."""
+    directory = Path(directory)
+    store = load_binary(directory, mmap=False)
+    updated, tail = store.appended(rows, generated_at)
+
+    for name, dtype in DTYPES.items():
+        with open(directory / f"{name}.bin", "r+b") as f:
+            # Drop bytes from an append that never reached meta.json
+            f.truncate(len(store) * np.dtype(dtype).itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(tail[name].tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+    _write_atomic(directory / "meta.json", json.dumps(updated.meta(), indent=2) + "\n")
+    return updated
+
+
+def append_json(path: Path, rows: list[dict], generated_at: str | None = None) -> DRRColumns:
+    """Append rows to a columnar JSON file (JSON cannot grow in place, so it is rewritten).
+
+    Refuses drr_data.json-style rows files, which other tools write and read,
+    rather than quietly rewriting them as columnar.
+    """
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    if "format" not in document:
+        raise ValueError(f"{path} is not a {FORMAT} store; convert it first with `drr_store.py convert`")
+    updated, _ = DRRColumns.from_document(document).appended(rows, generated_at)
+    save_json(updated, path)
+    return updated
+
+
+def load(path: Path = ROWS_PATH, mmap: bool = True) -> DRRColumns:
+    """Load any of the three formats: a binary store directory, columnar JSON or drr_data.json rows."""
+    path = Path(path)
+    if path.is_dir():
+        return load_binary(path, mmap)
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    if "format" in document:
+        return DRRColumns.from_document(document)
+    return DRRColumns.from_rows(document["rows"], document.get("generated_at"))
+
+
+def load_rows(path: Path) -> list[dict]:
+    """drr_data.json-style rows from any format."""
+    path = Path(path)
+    if not path.is_dir():
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        if "rows" in document:
+            return document["rows"]
+    return load(path).to_rows()
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.iterdir())
+    return path.stat().st_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert, append to and inspect columnar DRR data")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="convert drr_data.json rows to the columnar format")
+    convert.add_argument("source", nargs="?", type=Path, default=ROWS_PATH)
+    convert.add_argument("--binary", action="store_true", help="write the memory-mappable directory form")
+    convert.add_argument("--output", type=Path, help=f"default: {COLUMNAR_PATH.name} or {BINARY_DIR.name}/")
+
+    append = commands.add_parser("append", help="append new days of rows to a columnar store")
+    append.add_argument("store", type=Path)
+    append.add_argument("rows", type=Path, help="JSON file with a list of rows, or a drr_data.json document")
+
+    info = commands.add_parser("info", help="summarise a store in any format")
+    info.add_argument("store", type=Path, nargs="?", default=ROWS_PATH)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        store = load(args.source)
+        if store.to_rows() != load_rows(args.source):
+            print(f"✗ {args.source}: columnar round trip does not reproduce the rows")
+            sys.exit(1)
+        output = args.output or (BINARY_DIR if args.binary else COLUMNAR_PATH)
+        if args.binary:
+            save_binary(store, output)
+        else:
+            save_json(store, output)
+        print(f"✓ {args.source.name} ({_size(args.source):,} bytes) -> {output} ({_size(output):,} bytes), {store!r}")
+
+    elif args.command == "append":
+        with open(args.rows, encoding="utf-8") as f:
+            document = json.load(f)
+        rows = document["rows"] if isinstance(document, dict) else document
+        generated_at = document.get("generated_at") if isinstance(document, dict) else None
+        try:
+            if args.store.is_dir():
+                store = append_binary(args.store, rows, generated_at)
+            else:
+                store = append_json(args.store, rows, generated_at)
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        print(f"✓ appended {len(rows)} rows to {args.store}: {store!r}")
+
+    else:
+        store = load(args.store)
+        print(f"{args.store}: {store!r}, {_size(args.store):,} bytes, generated {store.generated_at}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,25 @@ as today, call `add_briefing(data)` before writing the JSON file, done.
 Auth: set ANTHROPIC_API_KEY in the environment.
 Install: pip install anthropic
 
+Response cache: briefings are cached on disk under .briefing-cache/ next to
+this file, keyed on a hash of the payload (minus `briefing`), the model, the
+system prompt and the schema. Re-running on unchanged scoreboard data reuses
+the cached briefing instead of calling the API. Entries expire after
+CACHE_TTL_SECONDS and the least recently used are evicted once the cache
+exceeds CACHE_MAX_BYTES. Pass --no-cache to always call the API.
+
+Per-region mode (--per-region): the overview (headline, worst regions,
+deteriorating, focus) and each region's questions are generated as separate
+requests through an async client, at most --concurrency in flight, each
+retried with exponential backoff, and merged back into BRIEFING_SCHEMA. A
+truncated region only costs that region a retry. briefing_stub_server.py
+stands in for the API to exercise this end to end.
+
+Batch mode: pass several scoreboard files and they are briefed -j at a time
+over one pooled client (with --per-region, as tasks on one event loop sharing
+one async client), each written back atomically as it finishes. Paths that
+fail are listed in briefing-retry.txt; re-run them with --retry.
+
 Cost: ~10K input tokens + ~2K output tokens on Sonnet 4.6 = roughly $0.06 per run.
 Cache note: prompt-caching markers are included as requested but provide no real
 benefit on a weekly cadence (cache TTL is 1 hour max). If you increase frequency
@@ -15,16 +34,59 @@ small write premium with no reads. Harmless either way.
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import hashlib
 import json
+import random
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
 
-import anthropic
+from cache_utils import DiskCache, log, write_json_atomic
+
+if TYPE_CHECKING:
+    import anthropic
 
 
 MODEL = "claude-sonnet-4-6"
 
+CACHE_DIR = Path(__file__).resolve().parent / ".briefing-cache"
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_BYTES = 5 * 1024 * 1024
+# Bump when the request shape changes in a way the key doesn't capture
+CACHE_VERSION = 1
+
+# Per-region mode: smaller requests, run concurrently and retried individually
+DEFAULT_CONCURRENCY = 4
+OVERVIEW_MAX_TOKENS = 4096
+REGION_MAX_TOKENS = 2048
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 1.0
+# Rate limits, server errors and overload
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Batch mode: scoreboard files briefed at once over one pooled client
+DEFAULT_BATCH_WORKERS = 4
+
+# Payload compaction: the keys and table columns the prompt actually uses.
+# Tables are sent as {"columns": [...], "rows": [[...], ...]}.
+PAYLOAD_KEYS = ("window_start", "window_end", "wig_current", "wig_prior", "lead_relative", "lead_earnings")
+TABLE_COLUMNS = {
+    "regions": ("region", "hubs", "drr_usd", "prior_drr_usd"),
+    "flagged_agents": (
+        "agent_name", "hub_name", "region", "hub_drr", "hub_best_drr", "agent_drr",
+        "rel_perf", "weekly_ngn", "days_in_role",
+    ),
+    "new_agents": ("region", "new_agents", "avg_drr", "above_target", "progressing", "below_baseline"),
+}
+DEFAULT_TOKEN_BUDGET = 4000
+# Rough chars-per-token for JSON; only used to size the payload against the budget
+CHARS_PER_TOKEN = 3.5
+
 
 BRIEFING_SCHEMA = {
     "type": "object",
@@ -79,6 +141,16 @@ BRIEFING_SCHEMA = {
 }
 
 
+# Per-region mode asks for everything but region_questions in one request...
+OVERVIEW_SCHEMA = {
+    **BRIEFING_SCHEMA,
+    "properties": {k: v for k, v in BRIEFING_SCHEMA["properties"].items() if k != "region_questions"},
+    "required": [k for k in BRIEFING_SCHEMA["required"] if k != "region_questions"],
+}
+# ...and one region_questions entry per region
+REGION_QUESTIONS_SCHEMA = BRIEFING_SCHEMA["properties"]["region_questions"]["items"]
+
+
 SYSTEM_PROMPT = """You are a senior operations analyst at MOPO, writing the Monday morning briefing for the regional manager who oversees Nigeria MOPO50 hubs.
 
 CONTEXT
@@ -88,11 +160,14 @@ CONTEXT
 - Your job: surface where to focus and what to ask each regional team lead.
 
 INPUT (in the user message as JSON)
-- regions[]: each region's current drr_usd, hub count, and prior_drr_usd (last week)
+- Tables are sent compactly as {"columns": [...], "rows": [[...], ...]}: each row lists its values in the order of `columns`, and a column missing from every row is left out. Read each row against its table's columns.
+- regions: each region's current drr_usd, hub count, and prior_drr_usd (last week)
 - lead_relative / lead_earnings: agent-level lead measures (below 35% of hub-best DRR; below regional P25 earnings floor)
-- flagged_agents[]: agents flagged on both lead measures, with hub_drr, hub_best_drr, agent_drr, rel_perf %, weekly NGN earnings, days_in_role
-- new_agents.by_region[]: 30-day intake performance per region (above_target / progressing / below_baseline counts)
+- flagged_agents: agents flagged on both lead measures, with hub_drr, hub_best_drr, agent_drr, rel_perf %, weekly NGN earnings, days_in_role
+- new_agents: 30-day intake performance per region (new_agents count, avg_drr, above_target / progressing / below_baseline counts)
 - window_start, window_end: data window for this report
+- omitted (only when present): how many rows were left out of flagged_agents (least severe first) or new_agents (smallest intake first) to fit the input budget. Regions are never omitted. Don't guess at omitted rows; where it matters, say the list is partial.
+- With compaction turned off, the same data arrives uncompacted: regions[], flagged_agents[] and new_agents.by_region[] as arrays of objects, with no omitted counts.
 
 OUTPUT (matches the enforced schema)
 - headline: ONE sentence framing the week. Lead with the dominant signal.
@@ -108,25 +183,401 @@ TONE
 - Never invent numbers, names, or hubs not present in the input data."""
 
 
-def add_briefing(data: dict, *, model: str = MODEL, client: anthropic.Anthropic | None = None) -> dict:
+def cache_key(payload: dict, model: str, **options: Any) -> str:
+    """Canonical hash of everything that determines the briefing.
+
+    `options` are request settings such as mode or token budget; ones left at
+    None don't contribute, so the default request keeps a stable key.
+    """
+    inputs = {
+        "version": CACHE_VERSION,
+        "model": model,
+        "system": SYSTEM_PROMPT,
+        "schema": BRIEFING_SCHEMA,
+        "payload": payload,
+    }
+    inputs.update({name: value for name, value in options.items() if value is not None})
+    canonical = json.dumps(
+        inputs,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class BriefingCache(DiskCache):
+    """On-disk briefing cache under CACHE_DIR; see DiskCache for expiry and eviction."""
+
+    ENTRY = "briefing"
+
+    def __init__(self, directory: Path = CACHE_DIR, *, ttl: float = CACHE_TTL_SECONDS,
+                 max_bytes: int = CACHE_MAX_BYTES) -> None:
+        super().__init__(directory, ttl=ttl, max_bytes=max_bytes)
+
+
+def region_payload(payload: dict, region: str) -> dict:
+    """The slice of the scoreboard payload that one region's questions draw on.
+
+    Same shape as the full payload, with every table filtered to `region`.
+    """
+    return {
+        "window_start": payload.get("window_start"),
+        "window_end": payload.get("window_end"),
+        "wig_current": payload.get("wig_current"),
+        "wig_prior": payload.get("wig_prior"),
+        "regions": [r for r in payload.get("regions", []) if r.get("region") == region] or [{"region": region}],
+        "flagged_agents": [a for a in payload.get("flagged_agents", []) if a.get("region") == region],
+        "new_agents": {
+            "by_region": [r for r in payload.get("new_agents", {}).get("by_region", []) if r.get("region") == region]
+        },
+    }
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def _table(rows: list[dict], columns: tuple[str, ...]) -> dict:
+    present = [c for c in columns if any(c in row for row in rows)]
+    return {"columns": present, "rows": [[row.get(c) for c in present] for row in rows]}
+
+
+def _dumps_compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_payload(payload: dict, token_budget: int | None = None) -> tuple[str, dict]:
+    """Encode `payload` as compact tabular JSON, trimming rows to fit `token_budget`.
+
+    Only PAYLOAD_KEYS and TABLE_COLUMNS are kept. Over budget, flagged agents
+    are dropped least severe first (highest rel_perf), then new-agent rows
+    with the smallest intake; regions are never dropped. Row order is kept,
+    and an `omitted` count tells the model what was left out.
+
+    Returns (text, report) where report has before/after token estimates and
+    the omitted counts.
+    """
+    tables = {
+        "regions": list(payload.get("regions", [])),
+        "flagged_agents": list(payload.get("flagged_agents", [])),
+        "new_agents": list(payload.get("new_agents", {}).get("by_region", [])),
+    }
+    # Lowest priority last
+    priority = {
+        "flagged_agents": lambda row: row.get("rel_perf") if row.get("rel_perf") is not None else 0,
+        "new_agents": lambda row: -(row.get("new_agents") or 0),
+    }
+    keep = {name: [True] * len(rows) for name, rows in tables.items()}
+
+    def encode() -> str:
+        compact = {key: payload[key] for key in PAYLOAD_KEYS if key in payload}
+        omitted = {}
+        for name, rows in tables.items():
+            kept = [row for row, keep_row in zip(rows, keep[name]) if keep_row]
+            compact[name] = _table(kept, TABLE_COLUMNS[name])
+            if len(kept) < len(rows):
+                omitted[name] = len(rows) - len(kept)
+        if omitted:
+            compact["omitted"] = omitted
+        return _dumps_compact(compact)
+
+    text = encode()
+    if token_budget is not None:
+        for name in ("flagged_agents", "new_agents"):
+            if estimate_tokens(text) <= token_budget:
+                break
+            rows = tables[name]
+            row_chars = [len(_dumps_compact([row.get(c) for c in TABLE_COLUMNS[name]])) + 1 for row in rows]
+            order = sorted(range(len(rows)), key=lambda i: priority[name](rows[i]), reverse=True)
+            dropped = 0
+            while estimate_tokens(text) > token_budget and dropped < len(order):
+                # Measured in the same whole tokens as the loop condition, so
+                # every pass over budget drops at least one row
+                excess = (estimate_tokens(text) - token_budget) * CHARS_PER_TOKEN
+                while excess > 0 and dropped < len(order):
+                    keep[name][order[dropped]] = False
+                    excess -= row_chars[order[dropped]]
+                    dropped += 1
+                text = encode()
+
+    report = {
+        "before": estimate_tokens(json.dumps(payload, indent=2)),
+        "after": estimate_tokens(text),
+        "omitted": {name: keep[name].count(False) for name in keep if False in keep[name]},
+    }
+    return text, report
+
+
+TABULAR_NOTE = (
+    'Tables are encoded as {"columns": [...], "rows": [[...], ...]}; "omitted" counts rows '
+    "left out to fit the input budget, which you must not guess at."
+)
+
+
+def encode_payload(payload: dict, compact: bool, token_budget: int | None = None) -> tuple[str, dict | None]:
+    """The payload text for a prompt, plus a compaction report when compacting."""
+    if not compact:
+        return json.dumps(payload, indent=2), None
+    text, report = compact_payload(payload, token_budget)
+    return f"{TABULAR_NOTE}\n\n{text}", report
+
+
+def _payload_report(report: dict | None) -> str:
+    if report is None:
+        return ""
+    text = f"; payload ~{report['before']} -> ~{report['after']} tokens"
+    if report["omitted"]:
+        text += " (omitted " + ", ".join(f"{n} {name}" for name, n in report["omitted"].items()) + ")"
+    return text
+
+
+def _system() -> list[dict]:
+    return [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+
+class TruncatedError(RuntimeError):
+    """A response hit max_tokens; per-region requests retry with a larger budget."""
+
+
+def _response_json(response: Any) -> dict:
+    if response.stop_reason == "refusal":
+        raise RuntimeError("Claude refused the briefing request")
+    if response.stop_reason == "max_tokens":
+        raise TruncatedError("Briefing truncated at max_tokens — bump max_tokens")
+    text = next(b.text for b in response.content if b.type == "text")
+    return json.loads(text)
+
+
+class Usage:
+    """Token counts summed over every request that made up a briefing."""
+
+    FIELDS = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+    def __init__(self) -> None:
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+        self.requests = 0
+        self.retries = 0
+
+    def add(self, usage: Any) -> None:
+        self.requests += 1
+        for field in self.FIELDS:
+            self.counts[field] += getattr(usage, field, None) or 0
+
+    def __str__(self) -> str:
+        c = self.counts
+        text = (
+            f"input={c['input_tokens']} output={c['output_tokens']} "
+            f"cache_read={c['cache_read_input_tokens']} cache_write={c['cache_creation_input_tokens']}"
+        )
+        if self.requests > 1 or self.retries:
+            text += f" requests={self.requests} retries={self.retries}"
+        return text
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Truncation, connection errors, rate limits and server errors are worth retrying."""
+    if isinstance(exc, TruncatedError):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in RETRY_STATUS_CODES
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+async def _create_json(client: Any, semaphore: asyncio.Semaphore, usage: Usage, *, model: str,
+                       schema: dict, content: str, max_tokens: int) -> dict:
+    """One structured-output request, retried with exponential backoff and jitter.
+
+    A truncated response is retried with double the token budget.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            async with semaphore:
+                response = await client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    system=_system(),
+                    output_config={"format": {"type": "json_schema", "schema": schema}},
+                    messages=[{"role": "user", "content": content}],
+                )
+            usage.add(response.usage)
+            return _response_json(response)
+        except Exception as exc:
+            if attempt == MAX_ATTEMPTS or not _is_retryable(exc):
+                raise
+            if isinstance(exc, TruncatedError):
+                max_tokens *= 2
+            usage.retries += 1
+            delay = BACKOFF_BASE_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            log(f"[briefing] retrying after {type(exc).__name__} in {delay:.1f}s", sys.stderr)
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def _generate_per_region(payload: dict, model: str, client: Any, concurrency: int,
+                               usage: Usage, compact: bool = True, token_budget: int | None = None) -> tuple[dict, dict | None]:
+    """Overview plus one region_questions request per region, at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    regions = [r["region"] for r in payload.get("regions", [])]
+    window = f"Data window {payload.get('window_start')} to {payload.get('window_end')}.\n"
+    overview_text, report = encode_payload(payload, compact, token_budget)
+
+    overview = _create_json(
+        client, semaphore, usage,
+        model=model,
+        schema=OVERVIEW_SCHEMA,
+        max_tokens=OVERVIEW_MAX_TOKENS,
+        content=(
+            f"{window}Generate the Monday briefing for this scoreboard data, "
+            f"leaving out region_questions (they are generated separately):\n\n"
+            f"{overview_text}"
+        ),
+    )
+    questions = [
+        _create_json(
+            client, semaphore, usage,
+            model=model,
+            schema=REGION_QUESTIONS_SCHEMA,
+            max_tokens=REGION_MAX_TOKENS,
+            content=(
+                f"{window}Generate only the region_questions entry for {region}. "
+                f"Its data:\n\n{encode_payload(region_payload(payload, region), compact)[0]}"
+            ),
+        )
+        for region in regions
+    ]
+    results = await asyncio.gather(overview, *questions)
+    return merge_briefing(results[0], regions, results[1:]), report
+
+
+def merge_briefing(overview: dict, regions: list[str], questions: list[dict]) -> dict:
+    """Combine the overview and per-region answers into a BRIEFING_SCHEMA object.
+
+    region_questions follow the payload's region order, each labelled with the
+    region it was requested for.
+    """
+    briefing = {key: overview[key] for key in OVERVIEW_SCHEMA["required"]}
+    briefing["region_questions"] = [
+        {"region": region, "wow_delta": entry.get("wow_delta"), "questions": entry.get("questions", [])}
+        for region, entry in zip(regions, questions)
+    ]
+    missing = set(BRIEFING_SCHEMA["required"]) - briefing.keys()
+    if missing:
+        raise RuntimeError(f"Merged briefing is missing {sorted(missing)}")
+    return briefing
+
+
+def _briefing_key(payload: dict, model: str, cache: BriefingCache | None, per_region: bool,
+                  compact: bool, token_budget: int | None) -> str | None:
+    if not cache:
+        return None
+    return cache_key(
+        payload, model,
+        mode="per-region" if per_region else None,
+        compact=(token_budget or "unlimited") if compact else None,
+    )
+
+
+def _serve_cached(data: dict, cache: BriefingCache | None, key: str | None) -> bool:
+    """Attach a cached briefing to `data`; False on a miss."""
+    if not cache:
+        return False
+    cached = cache.get(key)
+    if cached is None:
+        return False
+    data["briefing"] = cached
+    log(f"[briefing] tokens: none, served from response cache ({key[:12]}); response cache {cache.stats()}")
+    return True
+
+
+def _attach_briefing(data: dict, briefing: dict, model: str, cache: BriefingCache | None, key: str | None,
+                     usage: Usage, report: dict | None) -> dict:
+    briefing["model"] = f"Claude {model.replace('claude-', '').replace('-', ' ').title()}"
+    briefing["generated_at"] = datetime.now(timezone.utc).isoformat()
+
+    data["briefing"] = briefing
+    if cache:
+        cache.put(key, briefing)
+
+    log(
+        f"[briefing] tokens: {usage}{_payload_report(report)}"
+        + (f"; response cache {cache.stats()}" if cache else "")
+    )
+    return data
+
+
+def _async_client() -> Any:
+    import anthropic
+
+    # Retries are handled here, with backoff shared across the region requests
+    return anthropic.AsyncAnthropic(max_retries=0)
+
+
+async def _add_briefing_per_region(data: dict, *, model: str, client: Any, cache: BriefingCache | None,
+                                   concurrency: int, compact: bool, token_budget: int | None) -> dict:
+    """add_briefing with per_region=True, on the caller's event loop and async client."""
+    payload = {k: v for k, v in data.items() if k != "briefing"}
+    key = _briefing_key(payload, model, cache, True, compact, token_budget)
+    if _serve_cached(data, cache, key):
+        return data
+
+    usage = Usage()
+    briefing, report = await _generate_per_region(payload, model, client, concurrency, usage, compact, token_budget)
+    return _attach_briefing(data, briefing, model, cache, key, usage, report)
+
+
+def add_briefing(data: dict, *, model: str = MODEL, client: anthropic.Anthropic | None = None,
+                 cache: BriefingCache | bool = True, per_region: bool = False,
+                 concurrency: int = DEFAULT_CONCURRENCY, compact: bool = True,
+                 token_budget: int | None = DEFAULT_TOKEN_BUDGET) -> dict:
     """Generate the Monday briefing for `data` and attach it as `data['briefing']`.
 
     Mutates `data` in place and returns it. Strips any prior `briefing` field
     before calling so re-runs are deterministic.
+
+    `client` is anything with an Anthropic-style `messages.create`, so a local
+    fake can stand in for the network; `anthropic` is only imported when no
+    client is given. `cache` is a BriefingCache, True for the default on-disk
+    cache or False to always call the API.
+
+    With `per_region=True` the overview and each region's questions are
+    separate, smaller requests run concurrently (at most `concurrency` at a
+    time) with retry and backoff, then merged; `client` must then be async,
+    e.g. anthropic.AsyncAnthropic.
+
+    With `compact` (the default) the payload is sent as compact tabular JSON
+    limited to the fields the prompt uses and trimmed to about `token_budget`
+    input tokens (None for no limit); see compact_payload.
     """
-    client = client or anthropic.Anthropic()
+    if cache is True:
+        cache = BriefingCache()
+
+    if per_region:
+        async def run() -> dict:
+            return await _add_briefing_per_region(
+                data, model=model, client=client or _async_client(), cache=cache,
+                concurrency=concurrency, compact=compact, token_budget=token_budget,
+            )
+
+        return asyncio.run(run())
+
     payload = {k: v for k, v in data.items() if k != "briefing"}
+    key = _briefing_key(payload, model, cache, False, compact, token_budget)
+    if _serve_cached(data, cache, key):
+        return data
+
+    if client is None:
+        import anthropic
 
+        client = anthropic.Anthropic()
+
+    usage = Usage()
+    payload_text, report = encode_payload(payload, compact, token_budget)
     response = client.messages.create(
         model=model,
         max_tokens=8192,
-        system=[
-            {
-                "type": "text",
-                "text": SYSTEM_PROMPT,
-                "cache_control": {"type": "ephemeral"},
-            }
-        ],
+        system=_system(),
         output_config={"format": {"type": "json_schema", "schema": BRIEFING_SCHEMA}},
         messages=[
             {
@@ -134,38 +585,153 @@ def add_briefing(data: dict, *, model: str = MODEL, client: anthropic.Anthropic
                 "content": (
                     f"Data window {payload.get('window_start')} to {payload.get('window_end')}.\n"
                     f"Generate the Monday briefing for this scoreboard data:\n\n"
-                    f"{json.dumps(payload, indent=2)}"
+                    f"{payload_text}"
                 ),
             }
         ],
     )
+    briefing = _response_json(response)
+    usage.add(response.usage)
+    return _attach_briefing(data, briefing, model, cache, key, usage, report)
 
-    if response.stop_reason == "refusal":
-        raise RuntimeError("Claude refused the briefing request")
-    if response.stop_reason == "max_tokens":
-        raise RuntimeError("Briefing truncated at max_tokens — bump max_tokens")
 
-    text = next(b.text for b in response.content if b.type == "text")
-    briefing = json.loads(text)
-    briefing["model"] = f"Claude {model.replace('claude-', '').replace('-', ' ').title()}"
-    briefing["generated_at"] = datetime.now(timezone.utc).isoformat()
+def _brief_file(path: Path, brief: Callable[[dict], None]) -> float:
+    start = time.perf_counter()
+    data = json.loads(path.read_text())
+    brief(data)
+    write_json_atomic(path, data)
+    return time.perf_counter() - start
 
-    data["briefing"] = briefing
 
-    u = response.usage
-    print(
-        f"[briefing] tokens: input={u.input_tokens} output={u.output_tokens} "
-        f"cache_read={u.cache_read_input_tokens} cache_write={u.cache_creation_input_tokens}"
+async def _generate_batch_per_region(paths: list[Path], workers: int, client: Any, cache: BriefingCache | None,
+                                     report: Callable[[int, Path, float | None, Exception | None], None],
+                                     **options: Any) -> None:
+    """Per-region batch: every file on this one event loop and one async client."""
+    client = client or _async_client()
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run(path: Path) -> tuple[Path, float | None, Exception | None]:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                data = json.loads(path.read_text())
+                await _add_briefing_per_region(data, client=client, cache=cache, **options)
+                write_json_atomic(path, data)
+            except Exception as exc:
+                return path, None, exc
+            return path, time.perf_counter() - start, None
+
+    for done, finished in enumerate(asyncio.as_completed([run(path) for path in paths]), start=1):
+        report(done, *await finished)
+
+
+def generate_batch(paths: list[Path], *, workers: int = DEFAULT_BATCH_WORKERS, client: Any = None,
+                   cache: BriefingCache | bool = True, **options: Any) -> list[Path]:
+    """Add a briefing to every scoreboard file in `paths`, `workers` files at a time.
+
+    Files share one pooled client (and one response cache) and each is
+    written back atomically as soon as its briefing is ready, with progress
+    printed as files finish. A failed file doesn't stop the others. Returns
+    the paths that failed, for a retry list. `options` go to add_briefing.
+
+    Plain requests run on a thread pool over one sync client. With
+    per_region=True the files instead run as tasks on a single event loop
+    sharing one async client, since an async client's connection pool can't
+    be shared across threads and loops.
+    """
+    if cache is True:
+        cache = BriefingCache()
+
+    failed = []
+
+    def report(done: int, path: Path, seconds: float | None, exc: Exception | None) -> None:
+        if exc is None:
+            log(f"[batch] {done}/{len(paths)} wrote {path} ({seconds:.1f}s)")
+        else:
+            failed.append(path)
+            log(f"[batch] {done}/{len(paths)} FAILED {path}: {type(exc).__name__}: {exc}", sys.stderr)
+
+    start = time.perf_counter()
+    if options.pop("per_region", False):
+        options.setdefault("model", MODEL)
+        options.setdefault("concurrency", DEFAULT_CONCURRENCY)
+        options.setdefault("compact", True)
+        options.setdefault("token_budget", DEFAULT_TOKEN_BUDGET)
+        asyncio.run(_generate_batch_per_region(paths, workers, client, cache, report, **options))
+    else:
+        if client is None:
+            import anthropic
+
+            client = anthropic.Anthropic()
+        brief = lambda data: add_briefing(data, client=client, cache=cache, **options)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_brief_file, path, brief): path for path in paths}
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    report(done, futures[future], future.result(), None)
+                except Exception as exc:
+                    report(done, futures[future], None, exc)
+
+    elapsed = time.perf_counter() - start
+    log(
+        f"[batch] {len(paths) - len(failed)}/{len(paths)} files in {elapsed:.1f}s "
+        f"({len(paths) / elapsed:.2f} files/s, {workers} workers), {len(failed)} failed"
     )
-    return data
+    return sorted(failed, key=paths.index)
 
 
 def main() -> None:
-    path = Path(sys.argv[1] if len(sys.argv) > 1 else "mopo_scoreboard_data.json")
-    data = json.loads(path.read_text())
-    add_briefing(data)
-    path.write_text(json.dumps(data, indent=2) + "\n")
-    print(f"[briefing] wrote {path}")
+    parser = argparse.ArgumentParser(description="Attach a Monday briefing to scoreboard data")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="scoreboard JSON files (default: mopo_scoreboard_data.json)")
+    parser.add_argument("--no-cache", action="store_true", help="always call the API")
+    parser.add_argument("--per-region", action="store_true",
+                        help="generate each region's questions as a separate concurrent request")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"max requests in flight with --per-region (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--no-compact", action="store_true",
+                        help="send the payload as indented JSON with every field, as before")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help=f"approximate payload token budget when compacting, 0 for none "
+                             f"(default: {DEFAULT_TOKEN_BUDGET})")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_BATCH_WORKERS,
+                        help=f"files briefed at once (default: {DEFAULT_BATCH_WORKERS}; 1 runs one at a time)")
+    parser.add_argument("--retry-file", type=Path, default=Path("briefing-retry.txt"),
+                        help="where failed paths are listed (default: briefing-retry.txt)")
+    parser.add_argument("--retry", action="store_true", help="re-run the files listed in --retry-file")
+    args = parser.parse_args()
+
+    paths = list(args.paths)
+    if args.retry:
+        if not args.retry_file.exists():
+            log(f"[batch] no retry list at {args.retry_file}, nothing to retry")
+            return
+        paths += [Path(line) for line in args.retry_file.read_text().splitlines() if line.strip()]
+    paths = list(dict.fromkeys(paths)) or [Path("mopo_scoreboard_data.json")]
+
+    options = {
+        "per_region": args.per_region,
+        "concurrency": args.concurrency,
+        "compact": not args.no_compact,
+        "token_budget": args.token_budget or None,
+    }
+
+    if len(paths) == 1:
+        data = json.loads(paths[0].read_text())
+        add_briefing(data, cache=not args.no_cache, **options)
+        write_json_atomic(paths[0], data)
+        print(f"[briefing] wrote {paths[0]}")
+        if args.retry:
+            args.retry_file.unlink(missing_ok=True)
+        return
+
+    failed = generate_batch(paths, workers=args.workers, cache=not args.no_cache, **options)
+    if failed:
+        args.retry_file.write_text("".join(f"{path}\n" for path in failed))
+        print(f"[batch] {len(failed)} failed; re-run them with --retry (listed in {args.retry_file})")
+        sys.exit(1)
+    args.retry_file.unlink(missing_ok=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,204 @@
+-- MOPO scoreboard data queries, read from the precomputed rollups
+--
+-- Same blocks, names and result columns as queries.sql, but over the daily
+-- rollup tables scoreboard_rollups.py maintains instead of 14-30 day raw
+-- scans of agent_performance_rollups_daily joined to the rate tables:
+--
+--   agent_drr_daily  one row per agent, hub and day
+--     rev_usd          SUM(rental_income / rate_usd) over rows with an official rate
+--     rev_local        SUM(rental_income) over the same rows
+--     available_rated  SUM(available) over the same rows (NULL when the day had no rate)
+--     available        SUM(available) over all rows
+--   hub_drr_daily    the rated agent rows summed per hub and day
+--
+-- A rollup row with available_rated NULL stands for raw rows the queries.sql
+-- rate join drops, so DRR subqueries filter them out. Scope filters
+-- (country_code, product_type, is_test_hub) still join hubs, which is small.
+-- check_scoreboard_rollups.py pins every block against queries.sql.
+
+
+-- name=country_drr
+-- Returns: ONE row {drr_current, drr_prior}
+SELECT
+  ROUND(SUM(CASE WHEN d.date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN d.rev_usd END)
+        / NULLIF(SUM(CASE WHEN d.date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN d.available_rated END), 0), 4) AS drr_current,
+  ROUND(SUM(CASE WHEN d.date <= DATE_SUB(CURDATE(), INTERVAL 8 DAY) THEN d.rev_usd END)
+        / NULLIF(SUM(CASE WHEN d.date <= DATE_SUB(CURDATE(), INTERVAL 8 DAY) THEN d.available_rated END), 0), 4) AS drr_prior
+FROM hub_drr_daily d
+JOIN hubs h ON h.hub_id = d.hub_id
+WHERE h.country_code = 'NG' AND h.product_type = 1 AND h.is_test_hub = 0
+  AND d.date BETWEEN DATE_SUB(CURDATE(), INTERVAL 14 DAY) AND DATE_SUB(CURDATE(), INTERVAL 1 DAY);
+
+
+-- name=regions
+-- Returns: rows of {region, hubs, drr_usd, prior_drr_usd}
+SELECT
+  r.name AS region,
+  hub_count.hubs,
+  ROUND(SUM(CASE WHEN d.date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN d.rev_usd END)
+        / NULLIF(SUM(CASE WHEN d.date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN d.available_rated END), 0), 4) AS drr_usd,
+  ROUND(SUM(CASE WHEN d.date <= DATE_SUB(CURDATE(), INTERVAL 8 DAY) THEN d.rev_usd END)
+        / NULLIF(SUM(CASE WHEN d.date <= DATE_SUB(CURDATE(), INTERVAL 8 DAY) THEN d.available_rated END), 0), 4) AS prior_drr_usd
+FROM hub_drr_daily d
+JOIN hubs h ON h.hub_id = d.hub_id
+JOIN region r ON r.id = h.region_id
+JOIN (
+  SELECT region_id, COUNT(DISTINCT hub_id) AS hubs
+  FROM hubs
+  WHERE country_code = 'NG' AND product_type = 1 AND is_test_hub = 0
+  GROUP BY region_id
+) hub_count ON hub_count.region_id = h.region_id
+WHERE h.country_code = 'NG' AND h.product_type = 1 AND h.is_test_hub = 0
+  AND d.date BETWEEN DATE_SUB(CURDATE(), INTERVAL 14 DAY) AND DATE_SUB(CURDATE(), INTERVAL 1 DAY)
+GROUP BY r.name, hub_count.hubs
+ORDER BY drr_usd DESC;
+
+
+-- name=lead_relative
+-- Returns: ONE row {total_agents, above_threshold, flagged_agents}
+-- Flagged = agent DRR < 35% of their hub's best DRR (>14 day tenure)
+SELECT
+  COUNT(*) AS total_agents,
+  SUM(CASE WHEN ad.drr_usd >= 0.35 * hb.best_drr THEN 1 ELSE 0 END) AS above_threshold,
+  SUM(CASE WHEN ad.drr_usd < 0.35 * hb.best_drr THEN 1 ELSE 0 END) AS flagged_agents
+FROM (
+  SELECT d.agent_id, d.hub_id,
+    SUM(d.rev_usd) / NULLIF(SUM(d.available_rated), 0) AS drr_usd
+  FROM agent_drr_daily d
+  JOIN hubs h ON d.hub_id = h.hub_id
+  JOIN agent_hub_assignment_history ahah ON ahah.agent_id = d.agent_id AND ahah.hub_id = d.hub_id AND ahah.deleted_at IS NULL
+  WHERE h.country_code = 'NG' AND h.product_type = 1 AND h.is_test_hub = 0
+    AND d.date BETWEEN DATE_SUB(CURDATE(), INTERVAL 7 DAY) AND DATE_SUB(CURDATE(), INTERVAL 1 DAY)
+    AND d.available_rated IS NOT NULL
+    AND DATEDIFF(CURDATE(), ahah.created_at) > 14
+  GROUP BY d.agent_id, d.hub_id
+) ad
+JOIN (
+  SELECT inner_ad.hub_id, MAX(inner_ad.drr_usd) AS best_drr
+  FROM (
+    SELECT d2.agent_id, d2.hub_id,
+      SUM(d2.rev_usd) / NULLIF(SUM(d2.available_rated), 0) AS drr_usd
+    FROM agent_drr_daily d2
+    JOIN hubs h2 ON d2.hub_id = h2.hub_id
+    WHERE h2.country_code = 'NG' AND h2.product_type = 1 AND h2.is_test_hub = 0
+      AND d2.date BETWEEN DATE_SUB(CURDATE(), INTERVAL 7 DAY) AND DATE_SUB(CURDATE(), INTERVAL 1 DAY)
+      AND d2.available_rated IS NOT NULL
+    GROUP BY d2.agent_id, d2.hub_id
+  ) inner_ad
+  GROUP BY inner_ad.hub_id
+) hb ON hb.hub_id = ad.hub_id;
+
+
+-- name=lead_earnings
+-- Placeholder until the regional P25 floor table is wired in (see queries.sql).
+-- Counts agents with any rows in the week, rated or not, as the raw query does.
+SELECT
+  COUNT(*) AS total_agents,
+  COUNT(*) AS above_floor,
+  0 AS below_floor
+FROM (
+  SELECT d.agent_id, d.hub_id
+  FROM agent_drr_daily d
+  JOIN hubs h ON d.hub_id = h.hub_id
+  JOIN agent_hub_assignment_history ahah ON ahah.agent_id = d.agent_id AND ahah.hub_id = d.hub_id AND ahah.deleted_at IS NULL
+  WHERE h.country_code = 'NG' AND h.product_type = 1 AND h.is_test_hub = 0
+    AND d.date BETWEEN DATE_SUB(CURDATE(), INTERVAL 7 DAY) AND DATE_SUB(CURDATE(), INTERVAL 1 DAY)
+    AND DATEDIFF(CURDATE(), ahah.created_at) > 14
+  GROUP BY d.agent_id, d.hub_id
+) agents_observed;
+
+
+-- name=flagged_agents
+-- Returns: rows of {hub_name, region, hub_drr, agent_name, agent_drr, rel_perf, hub_best_drr, weekly_ngn, days_in_role}
+-- Limited to 60 rows (worst-performing first) — the dashboard's focus list shows the priority hubs.
+SELECT
+  h.name AS hub_name,
+  r.name AS region,
+  ROUND(hub_drr_calc.hub_drr, 4) AS hub_drr,
+  a.name AS agent_name,
+  ROUND(ad.drr_usd, 4) AS agent_drr,
+  ROUND(100 * ad.drr_usd / NULLIF(hb.best_drr, 0), 0) AS rel_perf,
+  ROUND(hb.best_drr, 4) AS hub_best_drr,
+  ROUND(ad.weekly_ngn, 0) AS weekly_ngn,
+  DATEDIFF(CURDATE(), MIN(ahah.created_at)) AS days_in_role
+FROM (
+  SELECT d.agent_id, d.hub_id,
+    SUM(d.rev_usd) / NULLIF(SUM(d.available_rated), 0) AS drr_usd,
+    SUM(d.rev_local) AS weekly_ngn
+  FROM agent_drr_daily d
+  JOIN hubs h2 ON d.hub_id = h2.hub_id
+  WHERE h2.country_code = 'NG' AND h2.product_type = 1 AND h2.is_test_hub = 0
+    AND d.date BETWEEN DATE_SUB(CURDATE(), INTERVAL 7 DAY) AND DATE_SUB(CURDATE(), INTERVAL 1 DAY)
+    AND d.available_rated IS NOT NULL
+  GROUP BY d.agent_id, d.hub_id
+) ad
+JOIN (
+  SELECT inner_ad.hub_id, MAX(inner_ad.drr_usd) AS best_drr
+  FROM (
+    SELECT d2.agent_id, d2.hub_id,
+      SUM(d2.rev_usd) / NULLIF(SUM(d2.available_rated), 0) AS drr_usd
+    FROM agent_drr_daily d2
+    JOIN hubs h3 ON d2.hub_id = h3.hub_id
+    WHERE h3.country_code = 'NG' AND h3.product_type = 1 AND h3.is_test_hub = 0
+      AND d2.date BETWEEN DATE_SUB(CURDATE(), INTERVAL 7 DAY) AND DATE_SUB(CURDATE(), INTERVAL 1 DAY)
+      AND d2.available_rated IS NOT NULL
+    GROUP BY d2.agent_id, d2.hub_id
+  ) inner_ad
+  GROUP BY inner_ad.hub_id
+) hb ON hb.hub_id = ad.hub_id
+JOIN (
+  SELECT d3.hub_id,
+    SUM(d3.rev_usd) / NULLIF(SUM(d3.available_rated), 0) AS hub_drr
+  FROM hub_drr_daily d3
+  JOIN hubs h4 ON d3.hub_id = h4.hub_id
+  WHERE h4.country_code = 'NG' AND h4.product_type = 1 AND h4.is_test_hub = 0
+    AND d3.date BETWEEN DATE_SUB(CURDATE(), INTERVAL 7 DAY) AND DATE_SUB(CURDATE(), INTERVAL 1 DAY)
+  GROUP BY d3.hub_id
+) hub_drr_calc ON hub_drr_calc.hub_id = ad.hub_id
+JOIN hubs h ON h.hub_id = ad.hub_id
+JOIN region r ON r.id = h.region_id
+JOIN agents a ON a.agent_id = ad.agent_id
+JOIN agent_hub_assignment_history ahah ON ahah.agent_id = ad.agent_id AND ahah.hub_id = ad.hub_id AND ahah.deleted_at IS NULL
+WHERE ad.drr_usd < 0.35 * hb.best_drr
+  AND DATEDIFF(CURDATE(), ahah.created_at) > 14
+GROUP BY h.name, r.name, hub_drr_calc.hub_drr, a.name, ad.drr_usd, hb.best_drr, ad.weekly_ngn
+ORDER BY hub_drr ASC, rel_perf ASC
+LIMIT 60;
+
+
+-- name=new_agents
+-- Returns: rows of {region, new_agents, avg_drr_usd, above_target, progressing, below_baseline}
+SELECT
+  r.name AS region,
+  COUNT(DISTINCT ahah.agent_id) AS new_agents,
+  ROUND(AVG(agent_drr.drr_usd), 2) AS avg_drr_usd,
+  SUM(CASE WHEN agent_drr.drr_usd >= 0.18 THEN 1 ELSE 0 END) AS above_target,
+  SUM(CASE WHEN agent_drr.drr_usd >= 0.13 AND agent_drr.drr_usd < 0.18 THEN 1 ELSE 0 END) AS progressing,
+  SUM(CASE WHEN agent_drr.drr_usd < 0.13 THEN 1 ELSE 0 END) AS below_baseline
+FROM agent_hub_assignment_history ahah
+JOIN hubs h ON h.hub_id = ahah.hub_id
+JOIN region r ON h.region_id = r.id
+JOIN (
+  SELECT
+    d.agent_id, d.hub_id,
+    ROUND(SUM(d.rev_usd) / NULLIF(SUM(d.available_rated), 0), 4) AS drr_usd
+  FROM agent_drr_daily d
+  JOIN hubs h2 ON d.hub_id = h2.hub_id
+  WHERE h2.country_code = 'NG' AND h2.product_type = 1 AND h2.is_test_hub = 0
+    AND d.date BETWEEN DATE_SUB(CURDATE(), INTERVAL 30 DAY) AND DATE_SUB(CURDATE(), INTERVAL 1 DAY)
+    AND d.available_rated IS NOT NULL
+  GROUP BY d.agent_id, d.hub_id
+) agent_drr ON agent_drr.agent_id = ahah.agent_id AND agent_drr.hub_id = ahah.hub_id
+WHERE h.country_code = 'NG' AND h.product_type = 1 AND h.is_test_hub = 0
+  AND ahah.created_at >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+  AND ahah.deleted_at IS NULL
+  AND DATEDIFF(CURDATE(), ahah.created_at) BETWEEN 7 AND 30
+GROUP BY r.name
+ORDER BY avg_drr_usd DESC;
+
+
+-- name=window_dates
+-- Returns: ONE row {window_start, window_end}
+SELECT
+  DATE_SUB(CURDATE(), INTERVAL 7 DAY) AS window_start,
+  DATE_SUB(CURDATE(), INTERVAL 1 DAY) AS window_end;
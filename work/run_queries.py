@@ -0,0 +1,492 @@
+"""Run the named blocks in work/queries.sql locally, concurrently, with timings.
+
+queries.sql holds the MOPO scoreboard queries as `-- name=...` blocks. This
+parses the blocks and runs them against a backend:
+
+- SQLiteStandIn (default): a SQLite database seeded with synthetic hubs,
+  agents, assignments, daily rollups and currency rates, shaped like the
+  tables the queries read. It is built once per seed and date under
+  .query-cache/ and reused after that. The MySQL date functions the queries
+  use are translated to SQLite built-ins.
+- SQLiteBackend (--sqlite PATH): an existing SQLite file with these tables.
+- DBAPIBackend: any DB-API connection factory (e.g. a MySQL driver), for
+  running the same blocks against a real database from Python.
+
+CURDATE() is pinned to --today (default: today) before anything runs, so a
+run always covers one date window. Independent queries run -j at a time,
+each worker on its own connection. Results are cached under .query-cache/,
+keyed on the backend, the query text and the date window, so an unchanged
+query over the same window is not re-run. The timing table lists the
+slowest queries first and marks any over --slow-ms.
+
+    python3 work/run_queries.py                          # all blocks, stand-in data
+    python3 work/run_queries.py flagged_agents regions -j 2 --no-cache
+    python3 work/run_queries.py --output results.json    # rows by query name
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from cache_utils import DiskCache, log, write_json_atomic
+
+QUERIES_PATH = Path(__file__).resolve().parent / "queries.sql"
+QUERY_CACHE_DIR = Path(__file__).resolve().parent / ".query-cache"
+QUERY_CACHE_TTL_SECONDS = 30 * 24 * 3600
+QUERY_CACHE_MAX_BYTES = 20 * 1024 * 1024
+# Bump when result encoding changes in a way the key doesn't capture
+QUERY_CACHE_VERSION = 1
+
+DEFAULT_WORKERS = 4
+DEFAULT_SLOW_MS = 250.0
+
+NAME_PATTERN = re.compile(r"^--\s*name=(\S+)\s*$", re.MULTILINE)
+CURDATE_PATTERN = re.compile(r"\bCURDATE\(\)", re.IGNORECASE)
+INTERVAL_PATTERN = re.compile(r"\bINTERVAL\s+(\d+)\s+DAY\b", re.IGNORECASE)
+
+
+class Query:
+    """One `-- name=...` block: its name, leading comment lines and SQL."""
+
+    __slots__ = ("name", "description", "sql")
+
+    def __init__(self, name: str, description: str, sql: str) -> None:
+        self.name = name
+        self.description = description
+        self.sql = sql
+
+    def __repr__(self) -> str:
+        return f"<Query {self.name}>"
+
+
+def parse_queries(text: str) -> list[Query]:
+    """Split queries.sql into its named blocks, in file order."""
+    matches = list(NAME_PATTERN.finditer(text))
+    queries = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        lines = text[match.end():end].strip().splitlines()
+        comments = []
+        while lines and lines[0].lstrip().startswith("--"):
+            comments.append(lines.pop(0).lstrip()[2:].strip())
+        sql = "\n".join(lines).strip().rstrip(";").strip()
+        if not sql:
+            raise ValueError(f"query block {match.group(1)!r} has no SQL")
+        queries.append(Query(match.group(1), "\n".join(comments), sql))
+
+    names = [q.name for q in queries]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate query names: {', '.join(duplicates)}")
+    return queries
+
+
+def load_queries(path: Path = QUERIES_PATH) -> list[Query]:
+    return parse_queries(path.read_text(encoding="utf-8"))
+
+
+def pin_date(sql: str, today: date) -> str:
+    """Replace CURDATE() with a date literal, fixing the query's window."""
+    return CURDATE_PATTERN.sub(f"'{today.isoformat()}'", sql)
+
+
+class Backend:
+    """Where queries run. Subclasses provide connections and any SQL translation."""
+
+    def connect(self) -> Any:
+        raise NotImplementedError
+
+    def translate(self, sql: str) -> str:
+        return sql
+
+    def cache_id(self) -> str | None:
+        """Identifies the data the backend serves; None disables result caching."""
+        return None
+
+
+class DBAPIBackend(Backend):
+    """A database reached through a DB-API connection factory, queried as written."""
+
+    def __init__(self, connect: Callable[[], Any], cache_id: str | None = None) -> None:
+        self._connect = connect
+        self._cache_id = cache_id
+
+    def connect(self) -> Any:
+        return self._connect()
+
+    def cache_id(self) -> str | None:
+        return self._cache_id
+
+
+def _rewrite_calls(sql: str, name: str, render: Callable[[list[str]], str]) -> str:
+    """Replace every name(arg, ...) call with render(args), parsing nested parentheses."""
+    pattern = re.compile(rf"\b{name}\s*\(", re.IGNORECASE)
+    out = []
+    pos = 0
+    while True:
+        match = pattern.search(sql, pos)
+        if match is None:
+            return "".join(out) + sql[pos:]
+        depth, args, start, i = 1, [], match.end(), match.end()
+        while depth:
+            if i >= len(sql):
+                raise ValueError(f"unbalanced parentheses in {name}() call")
+            char = sql[i]
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif char == "," and depth == 1:
+                args.append(sql[start:i].strip())
+                start = i + 1
+            i += 1
+        args.append(sql[start:i - 1].strip())
+        out.append(sql[pos:match.start()] + render([_rewrite_calls(arg, name, render) for arg in args]))
+        pos = i
+
+
+def mysql_to_sqlite(sql: str) -> str:
+    """Translate the MySQL date functions queries.sql uses into SQLite built-ins.
+
+    DATE_SUB(d, INTERVAL n DAY) becomes date(d, '-n days') and DATEDIFF(a, b)
+    the whole-day difference of julianday(date(...)), so nothing calls back
+    into Python per row and concurrent queries don't contend for the GIL.
+    """
+    sql = INTERVAL_PATTERN.sub(r"\1", sql)
+    sql = _rewrite_calls(sql, "DATE_SUB", lambda args: f"date({args[0]}, '-' || ({args[1]}) || ' days')")
+    return _rewrite_calls(sql, "DATEDIFF",
+                          lambda args: f"CAST(julianday(date({args[0]})) - julianday(date({args[1]})) AS INTEGER)")
+
+
+REGIONS = ["Ekiti", "Ondo North", "Ondo South", "Ogun", "Oyo", "Osun", "Edo", "Kogi",
+           "Enugu", "Anambra", "Kwara", "Lagos"]
+FIRST_NAMES = ["Ada", "Bola", "Chidi", "Dayo", "Emeka", "Funmi", "Gbenga", "Halima", "Ike", "Joke",
+               "Kemi", "Lanre", "Musa", "Ngozi", "Ola", "Segun", "Tunde", "Uche", "Yemi", "Zainab"]
+LAST_NAMES = ["Adeyemi", "Bello", "Eze", "Okafor", "Ogunleye", "Ibrahim", "Nwosu", "Afolabi", "Ojo", "Ezeh"]
+
+STANDIN_SCHEMA = """
+CREATE TABLE region (id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE currencies (id INTEGER PRIMARY KEY, currency_code TEXT NOT NULL UNIQUE);
+CREATE TABLE hub_business_policies (hub_business_policy_id INTEGER PRIMARY KEY, currency_code TEXT NOT NULL);
+CREATE TABLE hubs (
+  hub_id INTEGER PRIMARY KEY, name TEXT NOT NULL, country_code TEXT NOT NULL, product_type INTEGER NOT NULL,
+  is_test_hub INTEGER NOT NULL, region_id INTEGER NOT NULL, hub_business_policy_id INTEGER NOT NULL
+);
+CREATE TABLE agents (agent_id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE agent_hub_assignment_history (
+  id INTEGER PRIMARY KEY, agent_id INTEGER NOT NULL, hub_id INTEGER NOT NULL,
+  created_at TEXT NOT NULL, deleted_at TEXT
+);
+CREATE TABLE currency_rates_history (
+  currency_id INTEGER NOT NULL, date TEXT NOT NULL, rate_usd REAL NOT NULL, is_parallel_rate INTEGER NOT NULL
+);
+CREATE TABLE agent_performance_rollups_daily (
+  agent_id INTEGER NOT NULL, hub_id INTEGER NOT NULL, date TEXT NOT NULL,
+  rental_income REAL NOT NULL, available INTEGER NOT NULL
+);
+CREATE INDEX aprd_date_hub ON agent_performance_rollups_daily (date, hub_id);
+CREATE INDEX crh_currency_date ON currency_rates_history (currency_id, date, is_parallel_rate);
+CREATE INDEX ahah_agent_hub ON agent_hub_assignment_history (agent_id, hub_id);
+"""
+
+
+class SQLiteBackend(Backend):
+    """A SQLite file, opened read-only, with queries run through mysql_to_sqlite().
+
+    Results are cached against the file's size and mtime.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path).resolve()
+
+    def cache_id(self) -> str:
+        stat = self.path.stat()
+        return f"sqlite:{self.path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def translate(self, sql: str) -> str:
+        return mysql_to_sqlite(sql)
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+
+class SQLiteStandIn(SQLiteBackend):
+    """Synthetic scoreboard tables in SQLite, ending the day before `today`.
+
+    About 5% of hubs are test hubs and 10% are outside NG, so the queries'
+    scope filters matter. Every hub's policy is in NGN, KES or UGX with a
+    daily official and parallel rate. Assignments start up to 200 days back,
+    so the tenure and new-agent filters both select something.
+    """
+
+    def __init__(self, today: date, *, hubs: int = 300, agents_per_hub: int = 4, days: int = 45,
+                 seed: int = 1, directory: Path = QUERY_CACHE_DIR) -> None:
+        self.today = today
+        self.params = {"today": today.isoformat(), "hubs": hubs, "agents_per_hub": agents_per_hub,
+                       "days": days, "seed": seed}
+        digest = hashlib.sha256(json.dumps(self.params, sort_keys=True).encode()).hexdigest()[:16]
+        super().__init__(Path(directory) / f"standin-{digest}.sqlite")
+        self._lock = threading.Lock()
+
+    def cache_id(self) -> str:
+        # The file name already identifies the seed, and the data never changes
+        return f"sqlite-standin:{self.path.name}"
+
+    def connect(self) -> sqlite3.Connection:
+        self.ensure()
+        return super().connect()
+
+    def ensure(self) -> None:
+        """Build the database file if this seed and date don't have one yet."""
+        with self._lock:
+            if self.path.exists():
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+            tmp_path.unlink(missing_ok=True)
+            start = time.perf_counter()
+            connection = sqlite3.connect(tmp_path)
+            try:
+                connection.executescript(STANDIN_SCHEMA)
+                rows = self._seed(connection)
+                connection.commit()
+            finally:
+                connection.close()
+            tmp_path.replace(self.path)
+            log(f"[queries] seeded {self.path.name}: {rows:,} rollup rows "
+                f"in {time.perf_counter() - start:.1f}s", sys.stderr)
+
+    def _seed(self, connection: sqlite3.Connection) -> int:
+        p = self.params
+        rng = random.Random(p["seed"])
+        today = self.today
+
+        currencies = [(1, "NGN", 1500.0), (2, "KES", 129.0), (3, "UGX", 3700.0)]
+        connection.executemany("INSERT INTO region VALUES (?, ?)", list(enumerate(REGIONS, start=1)))
+        connection.executemany("INSERT INTO currencies VALUES (?, ?)", [(i, code) for i, code, _ in currencies])
+        connection.executemany("INSERT INTO hub_business_policies VALUES (?, ?)",
+                               [(i, code) for i, code, _ in currencies])
+
+        rates = []
+        for day in range(p["days"] + 2):
+            when = (today - timedelta(days=day)).isoformat()
+            for currency_id, _, rate in currencies:
+                drift = 1 + rng.uniform(-0.02, 0.02)
+                rates.append((currency_id, when, rate * drift, 0))
+                rates.append((currency_id, when, rate * drift * 1.1, 1))
+        connection.executemany("INSERT INTO currency_rates_history VALUES (?, ?, ?, ?)", rates)
+
+        hubs = []
+        for hub_id in range(1, p["hubs"] + 1):
+            region_id = rng.randint(1, len(REGIONS))
+            nigerian = rng.random() > 0.1
+            hubs.append((hub_id, f"{REGIONS[region_id - 1]} Hub {hub_id}", "NG" if nigerian else "KE",
+                         1 if rng.random() > 0.05 else 2, int(rng.random() < 0.05), region_id,
+                         1 if nigerian else rng.choice((2, 3))))
+        connection.executemany("INSERT INTO hubs VALUES (?, ?, ?, ?, ?, ?, ?)", hubs)
+
+        agents, assignments, rollups = [], [], []
+        agent_id = 0
+        for hub_id, _, _, _, _, _, policy_id in hubs:
+            hub_skill = rng.uniform(0.5, 1.5)
+            rate = currencies[policy_id - 1][2]
+            for _ in range(p["agents_per_hub"]):
+                agent_id += 1
+                agents.append((agent_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"))
+                tenure = rng.randint(1, 200)
+                created = datetime.combine(today - timedelta(days=tenure), datetime.min.time())
+                created += timedelta(seconds=rng.randint(0, 86399))
+                deleted = None if rng.random() > 0.03 else (today - timedelta(days=rng.randint(0, tenure))).isoformat()
+                assignments.append((agent_id, hub_id, created.isoformat(sep=" "), deleted))
+
+                skill = hub_skill * (rng.uniform(0.05, 0.3) if rng.random() < 0.05 else rng.uniform(0.5, 1.3))
+                available = rng.randint(8, 40)
+                for day in range(1, min(p["days"], tenure) + 1):
+                    drr_usd = max(0.0, rng.gauss(0.14 * skill, 0.04))
+                    rollups.append((agent_id, hub_id, (today - timedelta(days=day)).isoformat(),
+                                    round(drr_usd * available * rate, 2), available))
+
+        connection.executemany("INSERT INTO agents VALUES (?, ?)", agents)
+        connection.executemany("INSERT INTO agent_hub_assignment_history (agent_id, hub_id, created_at, deleted_at) "
+                               "VALUES (?, ?, ?, ?)", assignments)
+        connection.executemany("INSERT INTO agent_performance_rollups_daily VALUES (?, ?, ?, ?, ?)", rollups)
+        connection.execute("ANALYZE")
+        return len(rollups)
+
+
+class QueryCache(DiskCache):
+    """Query results on disk, one JSON file per (backend, query, window) key."""
+
+    ENTRY = "result"
+
+
+def result_key(backend_id: str, query: Query, sql: str, today: date) -> str:
+    canonical = json.dumps({
+        "version": QUERY_CACHE_VERSION,
+        "backend": backend_id,
+        "name": query.name,
+        "sql": sql,
+        "today": today.isoformat(),
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class QueryResult:
+    """Rows (as dicts) from one query, or the error it raised, with its wall time."""
+
+    __slots__ = ("name", "columns", "rows", "seconds", "cached", "error")
+
+    def __init__(self, name: str, columns: list[str], rows: list[dict], seconds: float,
+                 cached: bool = False, error: str | None = None) -> None:
+        self.name = name
+        self.columns = columns
+        self.rows = rows
+        self.seconds = seconds
+        self.cached = cached
+        self.error = error
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "as_integer_ratio") and not isinstance(value, (int, float)):
+        return float(value)  # Decimal from MySQL drivers
+    return value
+
+
+def run_queries(queries: list[Query], backend: Backend, *, today: date, workers: int = DEFAULT_WORKERS,
+                cache: QueryCache | None = None) -> list[QueryResult]:
+    """Run queries `workers` at a time, each worker on its own connection.
+
+    Cached results are returned without touching the backend. A failing
+    query is reported in its result rather than stopping the others.
+    Results come back in the order of `queries`.
+    """
+    backend_id = backend.cache_id()
+    if backend_id is None:
+        cache = None
+    local = threading.local()
+    connections = []
+    connections_lock = threading.Lock()
+
+    def connection() -> Any:
+        if not hasattr(local, "connection"):
+            local.connection = backend.connect()
+            with connections_lock:
+                connections.append(local.connection)
+        return local.connection
+
+    def run(query: Query) -> QueryResult:
+        sql = backend.translate(pin_date(query.sql, today))
+        key = result_key(backend_id, query, sql, today) if cache else None
+        start = time.perf_counter()
+        if cache:
+            hit = cache.get(key)
+            if hit is not None:
+                return QueryResult(query.name, hit["columns"], hit["rows"], time.perf_counter() - start, cached=True)
+        try:
+            cursor = connection().cursor()
+            cursor.execute(sql)
+            columns = [d[0] for d in cursor.description or ()]
+            rows = [{c: _jsonable(v) for c, v in zip(columns, row)} for row in cursor.fetchall()]
+            cursor.close()
+        except Exception as exc:
+            return QueryResult(query.name, [], [], time.perf_counter() - start,
+                               error=f"{type(exc).__name__}: {exc}")
+        seconds = time.perf_counter() - start
+        if cache:
+            cache.put(key, {"columns": columns, "rows": rows})
+        return QueryResult(query.name, columns, rows, seconds)
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(run, query): query for query in queries}
+            for future in as_completed(futures):
+                result = future.result()
+                results[result.name] = result
+    finally:
+        for open_connection in connections:
+            open_connection.close()
+    return [results[query.name] for query in queries]
+
+
+def print_timings(results: list[QueryResult], elapsed: float, slow_ms: float) -> None:
+    print(f"  {'query':18} {'rows':>6} {'time':>10}")
+    for result in sorted(results, key=lambda r: r.seconds, reverse=True):
+        ms = result.seconds * 1000
+        if result.error:
+            note = f"✗ {result.error}"
+        elif result.cached:
+            note = "cached"
+        elif ms > slow_ms:
+            note = f"SLOW (> {slow_ms:.0f}ms)"
+        else:
+            note = ""
+        print(f"  {result.name:18} {len(result.rows):6} {ms:8.1f}ms  {note}".rstrip())
+    total = sum(r.seconds for r in results)
+    print(f"\n  {len(results)} queries in {elapsed * 1000:.0f}ms wall ({total * 1000:.0f}ms summed)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the named blocks in queries.sql with timings")
+    parser.add_argument("names", nargs="*", help="blocks to run (default: all)")
+    parser.add_argument("--queries", type=Path, default=QUERIES_PATH)
+    parser.add_argument("--today", type=date.fromisoformat, default=date.today(),
+                        help="date CURDATE() is pinned to (default: today)")
+    parser.add_argument("--sqlite", type=Path, help="run against this SQLite file instead of the stand-in")
+    parser.add_argument("--hubs", type=int, default=300, help="stand-in hubs (default: 300)")
+    parser.add_argument("--days", type=int, default=45, help="stand-in days of rollups (default: 45)")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"queries run at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--no-cache", action="store_true", help="always run the queries")
+    parser.add_argument("--slow-ms", type=float, default=DEFAULT_SLOW_MS,
+                        help=f"mark queries slower than this (default: {DEFAULT_SLOW_MS:.0f})")
+    parser.add_argument("--output", type=Path, help="write {name: rows} JSON here")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    if args.names:
+        unknown = sorted(set(args.names) - {q.name for q in queries})
+        if unknown:
+            print(f"✗ Unknown queries: {', '.join(unknown)} (have {', '.join(q.name for q in queries)})")
+            sys.exit(1)
+        queries = [q for q in queries if q.name in args.names]
+
+    if args.sqlite:
+        backend = SQLiteBackend(args.sqlite)
+    else:
+        backend = SQLiteStandIn(args.today, hubs=args.hubs, days=args.days)
+        backend.ensure()
+
+    cache = None if args.no_cache else QueryCache(QUERY_CACHE_DIR, ttl=QUERY_CACHE_TTL_SECONDS,
+                                                  max_bytes=QUERY_CACHE_MAX_BYTES)
+    start = time.perf_counter()
+    results = run_queries(queries, backend, today=args.today, workers=args.workers, cache=cache)
+    print_timings(results, time.perf_counter() - start, args.slow_ms)
+
+    if args.output:
+        write_json_atomic(args.output, {
+            "today": args.today.isoformat(),
+            "results": {r.name: r.rows for r in results if not r.error},
+            "errors": {r.name: r.error for r in results if r.error},
+        })
+        print(f"\n[queries] wrote {args.output}")
+    if any(r.error for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Daily DRR rollups for the MOPO scoreboard, and the scoreboard built from them.
+
+Every block in queries.sql re-scans 7-30 days of agent_performance_rollups_daily
+and joins hubs, policies, currencies and currency_rates_history to convert
+revenue to USD. This keeps two derived tables in the same database instead:
+
+- agent_drr_daily: per agent, hub and day, the USD and local revenue and the
+  availability of rows that have an official rate, plus all availability
+- hub_drr_daily: the rated agent rows summed per hub and day
+
+rollup_days records which days are built. A refresh builds any day in the
+last ROLLUP_DAYS that is missing and always rebuilds the newest day, since
+its raw rows may still have been arriving at the last refresh; in steady
+state that is one day of raw rows per run. Days that leave the window are
+dropped. The rollup SQL is written in MySQL dialect and goes through the
+backend's translation, like the queries.
+
+rollup_queries.sql answers every queries.sql block from the rollups, so the
+scoreboard is a handful of reads over small tables:
+
+    python3 work/scoreboard_rollups.py                       # stand-in data, prints the scoreboard
+    python3 work/scoreboard_rollups.py --sqlite db.sqlite --output mopo_scoreboard_data.json
+
+--output merges into an existing scoreboard file, keeping the keys the
+queries don't produce (portfolios) and dropping a stale briefing. The
+rollups assume at most one official rate per currency and day, which is
+what the rate join keys on.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from cache_utils import log, write_json_atomic
+from run_queries import (DEFAULT_WORKERS, Backend, QueryCache, QUERY_CACHE_DIR, QUERY_CACHE_MAX_BYTES,
+                         QUERY_CACHE_TTL_SECONDS, SQLiteBackend, SQLiteStandIn, load_queries, print_timings,
+                         run_queries)
+
+ROLLUP_QUERIES_PATH = Path(__file__).resolve().parent / "rollup_queries.sql"
+SCOREBOARD_PATH = Path(__file__).resolve().parent / "mopo_scoreboard_data.json"
+
+# The longest window any scoreboard query reads (new_agents: 30 days)
+ROLLUP_DAYS = 30
+
+ROLLUP_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS agent_drr_daily (
+      agent_id BIGINT NOT NULL, hub_id BIGINT NOT NULL, date DATE NOT NULL,
+      rev_usd DOUBLE, rev_local DOUBLE, available_rated BIGINT, available BIGINT,
+      PRIMARY KEY (date, agent_id, hub_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS hub_drr_daily (
+      hub_id BIGINT NOT NULL, date DATE NOT NULL, rev_usd DOUBLE, available_rated BIGINT,
+      PRIMARY KEY (date, hub_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS rollup_days (
+      date DATE NOT NULL PRIMARY KEY, refreshed_at VARCHAR(32) NOT NULL
+    )""",
+]
+
+# {day} is an ISO date literal; the joins mirror queries.sql's rate join, but
+# LEFT so days without a rate are kept (lead_earnings counts them)
+REFRESH_DAY = [
+    "DELETE FROM agent_drr_daily WHERE date = '{day}'",
+    "DELETE FROM hub_drr_daily WHERE date = '{day}'",
+    """INSERT INTO agent_drr_daily (agent_id, hub_id, date, rev_usd, rev_local, available_rated, available)
+    SELECT aprd.agent_id, aprd.hub_id, aprd.date,
+      SUM(aprd.rental_income / NULLIF(crh.rate_usd, 0)),
+      SUM(CASE WHEN crh.currency_id IS NOT NULL THEN aprd.rental_income END),
+      SUM(CASE WHEN crh.currency_id IS NOT NULL THEN aprd.available END),
+      SUM(aprd.available)
+    FROM agent_performance_rollups_daily aprd
+    JOIN hubs h ON aprd.hub_id = h.hub_id
+    LEFT JOIN hub_business_policies bp ON h.hub_business_policy_id = bp.hub_business_policy_id
+    LEFT JOIN currencies cur ON bp.currency_code = cur.currency_code
+    LEFT JOIN currency_rates_history crh ON crh.currency_id = cur.id AND crh.date = aprd.date AND crh.is_parallel_rate = 0
+    WHERE aprd.date = '{day}'
+    GROUP BY aprd.agent_id, aprd.hub_id, aprd.date""",
+    """INSERT INTO hub_drr_daily (hub_id, date, rev_usd, available_rated)
+    SELECT hub_id, date, SUM(rev_usd), SUM(available_rated)
+    FROM agent_drr_daily
+    WHERE date = '{day}' AND available_rated IS NOT NULL
+    GROUP BY hub_id, date""",
+    "DELETE FROM rollup_days WHERE date = '{day}'",
+    "INSERT INTO rollup_days (date, refreshed_at) VALUES ('{day}', '{now}')",
+]
+
+PRUNE = [
+    "DELETE FROM agent_drr_daily WHERE date < '{cutoff}'",
+    "DELETE FROM hub_drr_daily WHERE date < '{cutoff}'",
+    "DELETE FROM rollup_days WHERE date < '{cutoff}'",
+]
+
+
+def writable_connection(backend: Backend) -> Any:
+    """A connection the rollup tables can be written through."""
+    if isinstance(backend, SQLiteBackend):
+        if isinstance(backend, SQLiteStandIn):
+            backend.ensure()
+        return sqlite3.connect(backend.path)
+    return backend.connect()
+
+
+def refresh_rollups(connection: Any, today: date, *, translate: Callable[[str], str] = lambda sql: sql,
+                    days: int = ROLLUP_DAYS, full: bool = False) -> list[str]:
+    """Bring the rollups up to date for the window ending the day before `today`.
+
+    Builds missing days and the newest day (every day with `full`), drops
+    days older than the window, and returns the days it built.
+    """
+    window = [(today - timedelta(days=n)).isoformat() for n in range(days, 0, -1)]
+    cursor = connection.cursor()
+    for statement in ROLLUP_SCHEMA:
+        cursor.execute(translate(statement))
+    cursor.execute(translate(f"SELECT date FROM rollup_days WHERE date >= '{window[0]}'"))
+    built = {str(row[0])[:10] for row in cursor.fetchall()}
+
+    stale = window if full else [day for day in window[:-1] if day not in built] + window[-1:]
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    for day in stale:
+        for statement in REFRESH_DAY:
+            cursor.execute(translate(statement.format(day=day, now=now)))
+    for statement in PRUNE:
+        cursor.execute(translate(statement.format(cutoff=window[0])))
+    connection.commit()
+    cursor.close()
+    return stale
+
+
+def build_scoreboard(results: dict[str, list[dict]], previous: dict | None = None) -> dict:
+    """Scoreboard JSON from the query results, keeping other keys from `previous`."""
+    country = results["country_drr"][0]
+    window = results["window_dates"][0]
+    scoreboard = dict(previous or {})
+    scoreboard.update({
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "window_start": window["window_start"],
+        "window_end": window["window_end"],
+        "wig_current": country["drr_current"],
+        "wig_prior": country["drr_prior"],
+        "regions": results["regions"],
+        "lead_relative": results["lead_relative"][0],
+        "lead_earnings": results["lead_earnings"][0],
+        "flagged_agents": results["flagged_agents"],
+        "new_agents": {"by_region": [
+            {("avg_drr" if key == "avg_drr_usd" else key): value for key, value in row.items()}
+            for row in results["new_agents"]
+        ]},
+    })
+    # A briefing written for older numbers would describe the wrong week
+    scoreboard.pop("briefing", None)
+    return scoreboard
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh the scoreboard rollups and build the scoreboard from them")
+    parser.add_argument("--today", type=date.fromisoformat, default=date.today(),
+                        help="date CURDATE() is pinned to (default: today)")
+    parser.add_argument("--sqlite", type=Path, help="SQLite database with the raw tables (default: the stand-in)")
+    parser.add_argument("--hubs", type=int, default=300, help="stand-in hubs (default: 300)")
+    parser.add_argument("--full", action="store_true", help="rebuild every day in the rollup window")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--no-cache", action="store_true", help="always run the queries")
+    parser.add_argument("--output", type=Path, help="scoreboard JSON to write (merged into if it exists)")
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(args.sqlite) if args.sqlite else SQLiteStandIn(args.today, hubs=args.hubs)
+
+    start = time.perf_counter()
+    connection = writable_connection(backend)
+    try:
+        built = refresh_rollups(connection, args.today, translate=backend.translate, full=args.full)
+    finally:
+        connection.close()
+    log(f"[rollups] built {len(built)} day(s) ({built[0]}..{built[-1]}) in "
+        f"{(time.perf_counter() - start) * 1000:.0f}ms", sys.stderr)
+
+    cache = None if args.no_cache else QueryCache(QUERY_CACHE_DIR, ttl=QUERY_CACHE_TTL_SECONDS,
+                                                  max_bytes=QUERY_CACHE_MAX_BYTES)
+    start = time.perf_counter()
+    results = run_queries(load_queries(ROLLUP_QUERIES_PATH), backend, today=args.today,
+                          workers=args.workers, cache=cache)
+    elapsed = time.perf_counter() - start
+    errors = [r for r in results if r.error]
+    if errors:
+        print_timings(results, elapsed, 0)
+        sys.exit(1)
+    log(f"[rollups] {len(results)} scoreboard reads in {elapsed * 1000:.0f}ms", sys.stderr)
+
+    previous = None
+    if args.output and args.output.exists():
+        previous = json.loads(args.output.read_text())
+    scoreboard = build_scoreboard({r.name: r.rows for r in results}, previous)
+    if args.output:
+        write_json_atomic(args.output, scoreboard)
+        log(f"[rollups] wrote {args.output}", sys.stderr)
+    else:
+        print(json.dumps(scoreboard, indent=2))
+
+
+if __name__ == "__main__":
+    main()